@@ -0,0 +1,69 @@
+"""
+Accuracy regression against the stored `skyfield` reference positions (see
+`benchmarks.reference`). A benchmark fails if the documented tolerances of an
+accuracy tier are exceeded.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+from astropy.time import Time
+
+from sbplan.ephemerides import CometEphemeridesClass
+
+from .common import LOCATION, libDir
+from .reference import readReference, referenceCatalog
+
+# Documented tolerances (RA/DEC [mas], delta [au]) of the accuracy tiers
+TOLERANCES = {
+    "apparent": (1.0, 1e-8),
+    "astrometric": (25000.0, 2e-4),
+    "fast": (25000.0, 2e-4),
+}
+
+
+def _separation(ra1, dec1, ra2, dec2):
+    """
+    Angular separation [mas] of positions in [deg].
+    """
+
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1, dec1, ra2, dec2))
+    # Haversine form (well conditioned for small angles)
+    hav = np.sin((dec2 - dec1) / 2)**2 + np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2)**2
+
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1)))) * 3.6e6
+
+
+class Accuracy:
+
+    params = (list(TOLERANCES), )
+    param_names = ["accuracy"]
+
+    def setup(self, accuracy):
+        CometEphemeridesClass.LIB_DIR = libDir()
+        self.reference = readReference()
+        ephemerides = CometEphemeridesClass(
+            Time(self.reference["epochs_tt"], format="jd", scale="tt"), LOCATION)
+        _, self.result = ephemerides.get(
+            referenceCatalog(), ["RA", "DEC", "delta"], accuracy=accuracy, columnar=True)
+        rows = [self.result.index(pdes) for pdes in self.reference["designation"]]
+        self.position_error = _separation(
+            self.result["RA"][rows], self.result["DEC"][rows], 
+            np.array(self.reference["RA"]), np.array(self.reference["DEC"]))
+        self.delta_error = np.abs(self.result["delta"][rows] - np.array(self.reference["delta"]))
+
+    def track_position_error(self, accuracy):
+        error = float(np.max(self.position_error))
+        if error > TOLERANCES[accuracy][0]:
+            raise AssertionError(f"Position error {error} mas exceeds the tolerance.")
+        return error
+
+    track_position_error.unit = "mas"
+
+    def track_delta_error(self, accuracy):
+        error = float(np.max(self.delta_error))
+        if error > TOLERANCES[accuracy][1]:
+            raise AssertionError(f"Distance error {error} au exceeds the tolerance.")
+        return error
+
+    track_delta_error.unit = "au"
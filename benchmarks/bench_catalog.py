@@ -0,0 +1,121 @@
+"""
+Benchmarks of `toSkyfieldFormat`, `readCometEls` and `CometCatalogClass.get`.
+"""
+
+import io, os, gzip, shutil, tempfile
+
+# NumPy
+import numpy as np
+
+from sbplan.catalog import CometCatalogClass
+from sbplan.catalog.cache import catalogPaths, clearCache
+from sbplan.catalog.mpc import readCometEls
+from sbplan.catalog.utils import toSkyfieldFormat
+
+from .common import N_COMETS, syntheticCatalog
+
+
+def mpcCatalog(n):
+    """
+    Synthetic catalog in `skyfield.data.mpc` format, with 10% duplicated orbits.
+    """
+
+    catalog = toSkyfieldFormat(syntheticCatalog(n), "jpl")
+    designation = [
+        f"{pdes}/Synthetic" if pdes[0].isdigit() else f"{pdes} (Synthetic)"
+        for pdes in catalog["designation"]
+    ]
+    del catalog["designation"]
+    catalog["designation"] = designation
+    catalog["magnitude_k"] /= 2.5
+    rng = np.random.default_rng(1)
+
+    return catalog[np.concatenate([np.arange(n), rng.integers(0, n, n // 10)])]
+
+
+def cometEls(catalog):
+    """
+    MPC comet element file (`CometEls.txt` layout) of a catalog in 
+    `skyfield.data.mpc` format.
+    """
+
+    lines = [
+        f"{'':4s}C{'':7s}  {row['perihelion_year']:4d} {row['perihelion_month']:02d} "
+        f"{row['perihelion_day']:7.4f} {row['perihelion_distance_au']:9.6f}  "
+        f"{row['eccentricity']:8.6f}  {row['argument_of_perihelion_degrees']:8.4f}  "
+        f"{row['longitude_of_ascending_node_degrees']:8.4f}  {row['inclination_degrees']:8.4f}  "
+        f"20240101  {row['magnitude_g']:4.1f} {row['magnitude_k']:4.1f}  "
+        f"{row['designation']:<56s} MPC 12345"
+        for row in catalog
+    ]
+
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+class ToSkyfieldFormat:
+
+    params = (N_COMETS, ["jpl", "mpc"])
+    param_names = ["n_comets", "database"]
+
+    def setup(self, n_comets, database):
+        if database == "jpl":
+            self.catalog = syntheticCatalog(n_comets)
+        else:
+            self.catalog = mpcCatalog(n_comets)
+
+    def time_toSkyfieldFormat(self, n_comets, database):
+        toSkyfieldFormat(self.catalog.copy(), database)
+
+
+class ReadCometEls:
+
+    params = (N_COMETS, [False, True])
+    param_names = ["n_comets", "gzip"]
+
+    def setup(self, n_comets, compressed):
+        self.text = cometEls(mpcCatalog(n_comets))
+        if compressed:
+            self.text = gzip.compress(self.text)
+
+    def time_readCometEls(self, n_comets, compressed):
+        readCometEls(io.BytesIO(self.text))
+
+    def peakmem_readCometEls(self, n_comets, compressed):
+        readCometEls(io.BytesIO(self.text))
+
+
+class CatalogGet:
+
+    params = (N_COMETS, )
+    param_names = ["n_comets"]
+
+    def setup(self, n_comets):
+        self.catalog_dir = tempfile.mkdtemp(prefix="sbplan_bench_")
+        syntheticCatalog(n_comets).write(
+            catalogPaths(self.catalog_dir, "all")["csv"], format="ascii.csv")
+        self.catalogs = CometCatalogClass()
+        self.catalogs.CATALOG_DIR = self.catalog_dir
+        # Binary cache built once
+        self.catalogs.get("all")
+
+    def teardown(self, n_comets):
+        clearCache()
+        shutil.rmtree(self.catalog_dir, ignore_errors=True)
+
+    def time_get_cold(self, n_comets):
+        # Binary catalog rebuilt from the CSV
+        clearCache()
+        os.remove(catalogPaths(self.catalog_dir, "all")["npy"])
+        self.catalogs.get("all")
+
+    def time_get_mmap(self, n_comets):
+        # Memory-mapped binary catalog, nothing cached in the process
+        clearCache()
+        self.catalogs.get("all", copy=False)
+
+    def time_get_warm(self, n_comets):
+        self.catalogs.get("all")
+
+    def peakmem_get_cold(self, n_comets):
+        clearCache()
+        self.catalogs.get("all")
@@ -0,0 +1,58 @@
+"""
+Start-up time of the command line and import time of the packages, measured
+in fresh interpreters (`python -X importtime` would also list the modules).
+"""
+
+import os, sys, time, subprocess
+
+import sbplan
+
+# `src` of the package under test
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(sbplan.__file__)))
+
+
+def startUp(*args, repeat=3):
+    """
+    Best wall time [s] of a fresh `python` running `args`.
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, [SRC, os.environ.get("PYTHONPATH")])))
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-W", "ignore", *args], env=env, check=True, 
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+class StartUp:
+
+    def track_python(self):
+        # Baseline: interpreter alone
+        return startUp("-c", "pass")
+    track_python.unit = "s"
+
+    def track_help(self):
+        return startUp("-m", "sbplan", "--help")
+    track_help.unit = "s"
+
+    def track_catalog_changes(self):
+        # Catalog metadata only (no `astroquery`)
+        return startUp("-m", "sbplan", "catalog", "changes")
+    track_catalog_changes.unit = "s"
+
+
+class Import:
+
+    params = ["sbplan.catalog", "sbplan.ephemerides", "sbplan.scheduler", 
+              "sbplan.catalog.core", "sbplan.ephemerides.core"]
+    param_names = ["module"]
+
+    def track_import(self, module):
+        return startUp("-c", f"import {module}")
+    track_import.unit = "s"
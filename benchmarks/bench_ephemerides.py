@@ -0,0 +1,132 @@
+"""
+Benchmarks of `CometEphemeridesClass.get` and `CometEphemeridesClass.extrema`,
+and of reads from exported runs (`EphemerisRun`).
+"""
+
+import os, time, shutil, tempfile
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import Time
+
+from sbplan.catalog.utils import toSkyfieldFormat
+from sbplan.ephemerides import CometEphemeridesClass, EphemerisRun
+from sbplan.ephemerides.archive import writeRun
+from sbplan.ephemerides.observer import observer_states
+
+from .common import (
+    LOCATION, MAX_ELEMENTS, N_COMETS, N_TIMES, START, libDir, syntheticCatalog, timeGrid)
+
+PARAMS = ["RA", "DEC", "AZ", "EL", "delta", "r", "alpha", "elong", "lunar_elong", "Tmag"]
+
+
+class EphemeridesGet:
+    """
+    All parameters, all comets, one site.
+    """
+
+    params = (N_COMETS, N_TIMES, ["apparent", "fast"])
+    param_names = ["n_comets", "n_times", "accuracy"]
+    timeout = 600
+
+    def setup(self, n_comets, n_times, accuracy):
+        if n_comets * n_times > MAX_ELEMENTS:
+            # Skipped (too large to hold in memory at once, see `iter_get`)
+            raise NotImplementedError
+        CometEphemeridesClass.LIB_DIR = libDir()
+        self.catalog = toSkyfieldFormat(syntheticCatalog(n_comets), "jpl")
+        self.ephemerides = CometEphemeridesClass(timeGrid(n_times), LOCATION)
+        # Observer state is computed once per time grid and site
+        self.ephemerides.state
+
+    def time_get(self, n_comets, n_times, accuracy):
+        self.ephemerides.get(self.catalog, PARAMS, accuracy=accuracy, columnar=True)
+
+    def peakmem_get(self, n_comets, n_times, accuracy):
+        self.ephemerides.get(self.catalog, PARAMS, accuracy=accuracy, columnar=True)
+
+    def track_throughput(self, n_comets, n_times, accuracy):
+        start = time.perf_counter()
+        self.ephemerides.get(self.catalog, PARAMS, accuracy=accuracy, columnar=True)
+        return n_comets * n_times / (time.perf_counter() - start)
+
+    track_throughput.unit = "comet-epochs/s"
+
+
+class EphemeridesColdStart:
+    """
+    New instance, uncached observer state (first request of a time grid).
+    """
+
+    params = ([1, 100, 10000], )
+    param_names = ["n_times"]
+
+    def setup(self, n_times):
+        CometEphemeridesClass.LIB_DIR = libDir()
+        self.catalog = toSkyfieldFormat(syntheticCatalog(100), "jpl")
+        self.time_tag = timeGrid(n_times)
+
+    def time_instance_and_get(self, n_times):
+        observer_states.clear()
+        CometEphemeridesClass(self.time_tag, LOCATION).get(self.catalog, ["RA", "DEC"], columnar=True)
+
+
+class EphemeridesExtrema:
+    """
+    Peak brightness over a season (180 days, daily coarse grid) to 1 s, 
+    instead of a 1-s grid of 15 million epochs.
+    """
+
+    params = ([100, 1000], )
+    param_names = ["n_comets"]
+
+    def setup(self, n_comets):
+        CometEphemeridesClass.LIB_DIR = libDir()
+        self.catalog = toSkyfieldFormat(syntheticCatalog(n_comets), "jpl")
+        self.ephemerides = CometEphemeridesClass(Time(START) + np.arange(180) * u.d, LOCATION)
+        self.ephemerides.state
+
+    def time_extrema(self, n_comets):
+        self.ephemerides.extrema(self.catalog, "Tmag", "min", tolerance=1.0)
+
+    def track_evaluations(self, n_comets):
+        extrema = self.ephemerides.extrema(self.catalog, "Tmag", "min", tolerance=1.0)
+        return extrema.meta["evaluations"] / n_comets
+
+    track_evaluations.unit = "epochs/comet"
+
+
+class EphemerisRunRead:
+    """
+    Reads from an exported run (3 parameters, `n_times` epochs): a comet is
+    contiguous in the file, an epoch is strided over all comets.
+    """
+
+    params = ([1000, 10000], [100, 1000])
+    param_names = ["n_comets", "n_times"]
+
+    def setup(self, n_comets, n_times):
+        if n_comets * n_times > MAX_ELEMENTS:
+            raise NotImplementedError
+        CometEphemeridesClass.LIB_DIR = libDir()
+        catalog = toSkyfieldFormat(syntheticCatalog(n_comets), "jpl")
+        time_tag = timeGrid(100)
+        _, ephemerides = CometEphemeridesClass(time_tag, LOCATION).get(
+            catalog, ["RA", "DEC", "Tmag"], columnar=True)
+        self.directory = tempfile.mkdtemp(prefix="sbplan_bench_")
+        self.path = os.path.join(self.directory, "run.npz")
+        # Chunks of 100 epochs (the same ones: only the layout matters here)
+        writeRun(self.path, [(time_tag, ephemerides)] * (n_times // 100))
+        self.run = EphemerisRun(self.path)
+        self.pdes = self.run.designation[n_comets // 2]
+
+    def teardown(self, n_comets, n_times):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_comet(self, n_comets, n_times):
+        self.run.comet(self.pdes)
+
+    def time_epoch(self, n_comets, n_times):
+        self.run.epoch(n_times // 2)
@@ -0,0 +1,75 @@
+"""
+Benchmarks of the night scheduler (synthetic visibility, 1-min slots over a
+12-hour night).
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import Time
+
+from sbplan.scheduler import GreedyScheduler, PriorityScheduler, SchedulingProblem, schedule
+
+from .common import START
+
+N_TARGETS = [100, 1000, 10000]
+N_SLOTS = 720
+
+
+def syntheticNight(n, seed=0):
+    """
+    Targets rising and setting at random slots, moving slowly across the sky,
+    with 2-10 min exposures and priorities from 1 to 3.
+    """
+
+    rng = np.random.default_rng(seed)
+    slots = np.arange(N_SLOTS)
+
+    rise = rng.integers(-N_SLOTS // 2, N_SLOTS, n)
+    set_ = rise + rng.integers(30, N_SLOTS, n)
+    visible = (slots[None, :] >= rise[:, None]) & (slots[None, :] < set_[:, None])
+    # 2% of the slots are lost (e.g., to clouds)
+    visible &= rng.random((n, N_SLOTS)) > 0.02
+
+    ra = (rng.uniform(0, 360, n)[:, None] + 0.25 * slots[None, :] / 60) % 360
+    dec = np.repeat(np.degrees(np.arcsin(rng.uniform(-0.5, 1, n)))[:, None], N_SLOTS, axis=1)
+    EL = 90 - np.abs(slots[None, :] - (rise + set_)[:, None] / 2) / N_SLOTS * 90
+
+    return SchedulingProblem(
+        [f"T{k}" for k in range(n)], Time(START) + slots * u.min, visible,
+        exposure=rng.uniform(120, 600, n), priority=rng.integers(1, 4, n), ra=ra, dec=dec,
+        score=EL)
+
+
+class Schedule:
+
+    params = (N_TARGETS, ["greedy", "priority"])
+    param_names = ["n_targets", "scheduler"]
+
+    def setup(self, n_targets, scheduler):
+        self.problem = syntheticNight(n_targets)
+        self.scheduler = GreedyScheduler() if scheduler == "greedy" else PriorityScheduler()
+
+    def time_schedule(self, n_targets, scheduler):
+        schedule(self.problem, None, scheduler=self.scheduler)
+
+    def track_scheduled(self, n_targets, scheduler):
+        return len(schedule(self.problem, None, scheduler=self.scheduler))
+    track_scheduled.unit = "targets"
+
+
+class Problem:
+
+    params = (N_TARGETS, )
+    param_names = ["n_targets"]
+
+    def setup(self, n_targets):
+        self.problem = syntheticNight(n_targets)
+
+    def time_problem(self, n_targets):
+        # Observable start slots (cumulative sums over the visibility matrix)
+        p = self.problem
+        SchedulingProblem(
+            p.designation, p.time_tag, p.visible, p.exposure, priority=p.priority, ra=p.ra,
+            dec=p.dec, score=p.score)
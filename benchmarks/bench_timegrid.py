@@ -0,0 +1,31 @@
+"""
+Benchmarks of `timeTag` and `TimeGrid`.
+"""
+
+# AstroPy
+from astropy.time import Time
+
+from sbplan.ephemerides import TimeGrid
+from sbplan.ephemerides.utils import timeTag
+
+from .common import N_TIMES, START
+
+
+class TimeTag:
+
+    params = (N_TIMES + [1000000], )
+    param_names = ["n_times"]
+
+    def setup(self, n_times):
+        self.epoch = {
+            "start": START, "stop": (Time(START) + (n_times - 1) * 60 / 86400).isot, "step": "1m"}
+
+    def time_timeTag(self, n_times):
+        timeTag(self.epoch)
+
+    def time_TimeGrid_len(self, n_times):
+        len(TimeGrid.from_epoch(self.epoch))
+
+    def time_TimeGrid_chunks(self, n_times):
+        for _ in TimeGrid.from_epoch(self.epoch).chunks(1000):
+            pass
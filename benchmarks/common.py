@@ -0,0 +1,162 @@
+"""
+Synthetic inputs shared by the benchmarks (no network needed).
+
+- `syntheticKernel`: a small SPK kernel (type 2, Chebyshev) with circular
+  orbits for the Sun, the Earth-Moon system, Jupiter and Saturn. It has the
+  segments `CometEphemeridesClass` needs and is saved as `de421.bsp` in a
+  temporary library directory.
+- `syntheticCatalog`: reproducible comet catalogs in JPL (`sbdb_query`) format.
+"""
+
+import os, struct, tempfile
+
+# NumPy
+import numpy as np
+from numpy.polynomial import chebyshev
+# AstroPy
+import astropy.units as u
+from astropy.time import Time
+from astropy.table import Table
+from astropy.coordinates import EarthLocation
+# jplephem
+from jplephem.daf import DAF, FTPSTR
+from jplephem.spk import S_PER_DAY, T0
+
+# Sizes of the benchmarks
+N_COMETS = [100, 1000, 10000, 100000]
+N_TIMES = [1, 100, 10000]
+# Largest problem timed (comet-epochs), to keep peak memory below about 1 GB
+MAX_ELEMENTS = 2_000_000
+
+# Site of the benchmarks (Xinglong)
+LOCATION = EarthLocation.from_geodetic(117.575 * u.deg, 40.396 * u.deg, 900 * u.m)
+START = "2024-01-01"
+
+AU_KM = 149597870.700
+OBLIQUITY = np.radians(23.4392911)
+
+# (target, center, radius [km], period [d], phase [rad])
+BODIES = [
+    (10, 0, 7.5e5, 4332.59, 0.3),
+    (3, 0, AU_KM, 365.25636, 1.75),
+    (399, 3, 4671.0, 27.321661, 0.9 + np.pi),
+    (301, 3, 379729.0, 27.321661, 0.9),
+    (5, 0, 5.2026 * AU_KM, 4332.59, 0.3 + np.pi),
+    (6, 0, 9.5549 * AU_KM, 10759.22, 5.5),
+]
+# Span of the kernel [JD TDB] and Chebyshev records
+KERNEL_SPAN = (2451536.5, 2470000.5)
+INTERVAL = 16.0 # [d]
+DEGREE = 12
+
+_LIB_DIR = None
+
+
+def _circular(target, radius, period, phase, jd):
+    """
+    Circular orbit in the ecliptic, in ICRF [km].
+    """
+
+    angle = phase + 2 * np.pi * (jd - T0) / period
+    x, y = radius * np.cos(angle), radius * np.sin(angle)
+    # Small inclinations so that bodies are not exactly in the ecliptic
+    z = 0.0 if target in (3, 399, 10) else 0.02 * radius * np.sin(angle + 1.0)
+
+    return np.array([
+        x, y * np.cos(OBLIQUITY) - z * np.sin(OBLIQUITY), y * np.sin(OBLIQUITY) + z * np.cos(OBLIQUITY)
+    ])
+
+
+def syntheticKernel(path):
+    """
+    Write the synthetic SPK kernel.
+    """
+
+    nodes = np.cos(np.pi * (np.arange(DEGREE + 1) + 0.5) / (DEGREE + 1))
+    n_records = int((KERNEL_SPAN[1] - KERNEL_SPAN[0]) // INTERVAL)
+    init = (KERNEL_SPAN[0] - T0) * S_PER_DAY
+    intlen = INTERVAL * S_PER_DAY
+    rsize = 2 + 3 * (DEGREE + 1)
+
+    with open(path, "w+b") as f:
+        # File record, empty summary and name records
+        f.write(struct.pack(
+            "<8sII60sIII8s603s28s297s", b"DAF/SPK ", 2, 6, b"sbplan synthetic kernel".ljust(60),
+            2, 2, 3 * 128 + 1, b"LTL-IEEE", b"\0" * 603, FTPSTR, b"\0" * 297))
+        f.write(b"\0" * 1024)
+        f.write(b" " * 1024)
+        f.flush()
+        f.seek(0)
+        daf = DAF(f)
+
+        for target, center, radius, period, phase in BODIES:
+            records = np.empty((n_records, rsize))
+            for k in range(n_records):
+                mid = KERNEL_SPAN[0] + (k + 0.5) * INTERVAL
+                xyz = _circular(target, radius, period, phase, mid + nodes * INTERVAL / 2)
+                records[k, 0] = (mid - T0) * S_PER_DAY
+                records[k, 1] = intlen / 2
+                for axis in range(3):
+                    records[k, 2 + axis * (DEGREE + 1):2 + (axis + 1) * (DEGREE + 1)] = (
+                        chebyshev.chebfit(nodes, xyz[axis], DEGREE))
+            array = np.concatenate([records.ravel(), [init, intlen, rsize, n_records]])
+            name = f"SYNTHETIC {target} {center}".encode()
+            daf.add_array(name, (init, init + n_records * intlen, target, center, 1, 2), array)
+
+    return path
+
+
+def libDir():
+    """
+    Temporary library directory holding the synthetic kernel (as `de421.bsp`).
+    """
+
+    global _LIB_DIR
+
+    if _LIB_DIR is None:
+        _LIB_DIR = tempfile.mkdtemp(prefix="sbplan_bench_")
+        syntheticKernel(os.path.join(_LIB_DIR, "de421.bsp"))
+
+    return _LIB_DIR
+
+
+def syntheticCatalog(n, seed=0):
+    """
+    Reproducible comet catalog in JPL format (pdes, tp, q, e, w, om, i, M1, K1,
+    orbit_id). About 5% of the orbits are parabolic or hyperbolic.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    e = rng.uniform(0.05, 0.995, n)
+    open_orbits = rng.random(n) < 0.05
+    e[open_orbits] = rng.uniform(1.0, 1.05, open_orbits.sum())
+    numbered = np.arange(n) % 3 == 0
+    # Unique designations (e.g., "1P" and "C/2001 B2")
+    pdes = [
+        f"{k + 1}P" if numbered[k] else f"C/{2000 + k % 25} {chr(65 + k % 24)}{k + 1}"
+        for k in range(n)
+    ]
+
+    return Table(
+        {
+            "pdes": pdes,
+            "tp": Time(START).tdb.jd + rng.uniform(-2000, 2000, n),
+            "q": rng.uniform(0.3, 8.0, n),
+            "e": e,
+            "w": rng.uniform(0, 360, n),
+            "om": rng.uniform(0, 360, n),
+            "i": np.degrees(np.arccos(rng.uniform(-1, 1, n))),
+            "M1": rng.uniform(5, 18, n),
+            "K1": rng.uniform(5, 15, n),
+            "orbit_id": [f"JPL {k}" for k in range(n)],
+        }
+    )
+
+
+def timeGrid(n):
+    """
+    Hourly time grid of `n` epochs.
+    """
+
+    return Time(START) + np.arange(n) * u.h
@@ -0,0 +1,79 @@
+"""
+Reference positions for the accuracy benchmarks.
+
+The positions are computed comet by comet with `skyfield`'s own pipeline
+(`mpc.comet_orbit` and `.observe(...).apparent()`) on the synthetic kernel, and
+stored in `reference.json`. Regenerate them (only when the synthetic inputs
+change) with
+
+    python -m benchmarks.reference
+"""
+
+import os, json
+
+# NumPy
+import numpy as np
+
+from sbplan.catalog.utils import toSkyfieldFormat
+
+from .common import LOCATION, libDir, syntheticCatalog
+
+REFERENCE_PATH = os.path.join(os.path.dirname(__file__), "reference.json")
+
+# 60 comets at 12 epochs spread over 2024
+N_COMETS = 60
+EPOCHS = [2460310.5 + 30.5 * k + 0.1 * k for k in range(12)]
+
+
+def referenceCatalog():
+
+    return toSkyfieldFormat(syntheticCatalog(N_COMETS, seed=42), "jpl")
+
+
+def computeReference():
+    """
+    Apparent RA, DEC [deg] and delta [au] from `skyfield` (needs pandas).
+    """
+
+    # pandas
+    import pandas as pd
+    # skyfield
+    from skyfield.api import Loader, wgs84
+    from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+    from skyfield.data import mpc
+
+    load = Loader(libDir())
+    ts = load.timescale()
+    eph = load("de421.bsp")
+    t = ts.tt_jd(np.array(EPOCHS))
+
+    lon, lat, height = LOCATION.geodetic
+    observer = eph["earth"] + wgs84.latlon(
+        latitude_degrees=lat.deg, longitude_degrees=lon.deg, elevation_m=height.to_value("m"))
+    o = observer.at(t)
+
+    catalog = referenceCatalog()
+    reference = {"epochs_tt": EPOCHS, "designation": list(), "RA": list(), "DEC": list(), "delta": list()}
+    for row in catalog:
+        comet = eph["sun"] + mpc.comet_orbit(
+            pd.Series({name: row[name] for name in catalog.colnames}), ts, GM_SUN)
+        ra, dec, delta = o.observe(comet).apparent().radec()
+        reference["designation"].append(str(row["designation"]))
+        reference["RA"].append(ra._degrees.tolist())
+        reference["DEC"].append(dec.degrees.tolist())
+        reference["delta"].append(delta.au.tolist())
+
+    return reference
+
+
+def readReference():
+
+    with open(REFERENCE_PATH, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+
+    with open(REFERENCE_PATH, "w") as f:
+        json.dump(computeReference(), f)
+    print(f"Written to {REFERENCE_PATH}")
@@ -0,0 +1,92 @@
+"""
+Run the benchmarks without asv.
+
+    python -m benchmarks.run [--quick] [--bench PATTERN]
+
+`time_*` benchmarks report the best of `--repeat` runs, `peakmem_*` the peak
+memory allocated during one run (`tracemalloc`), and `track_*` their value.
+Exits with status 1 if a benchmark (e.g., an accuracy check) fails.
+"""
+
+import re, sys, time, argparse, importlib, itertools, tracemalloc
+
+MODULES = [
+    "bench_accuracy", "bench_timegrid", "bench_catalog", "bench_ephemerides", "bench_scheduler", 
+    "bench_cli"]
+
+
+def _benchmarks(pattern):
+
+    for module_name in MODULES:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        for class_name, cls in vars(module).items():
+            if (not isinstance(cls, type)) or (cls.__module__ != module.__name__):
+                continue
+            for name in sorted(vars(cls)):
+                if name.split("_")[0] in ("time", "peakmem", "track"):
+                    full_name = f"{module_name}.{class_name}.{name}"
+                    if re.search(pattern, full_name):
+                        yield full_name, cls, name
+
+
+def _params(cls, quick):
+
+    params = getattr(cls, "params", ())
+    if params and not isinstance(params, tuple):
+        params = (params, )
+    for values in itertools.product(*params):
+        if quick and any(isinstance(v, int) and v > 1000 for v in values):
+            continue
+        yield values
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Skip sizes above 1000.")
+    parser.add_argument("--bench", default="", help="Regular expression on benchmark names.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of `time_*` benchmarks.")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for full_name, cls, name in _benchmarks(args.bench):
+        for values in _params(cls, args.quick):
+            label = f"{full_name}({', '.join(map(str, values))})"
+            instance = cls()
+            try:
+                if hasattr(instance, "setup"):
+                    instance.setup(*values)
+            except NotImplementedError:
+                print(f"{label:80s} skipped")
+                continue
+            method = getattr(instance, name)
+            try:
+                if name.startswith("time"):
+                    best = float("inf")
+                    for _ in range(args.repeat):
+                        start = time.perf_counter()
+                        method(*values)
+                        best = min(best, time.perf_counter() - start)
+                    result = f"{best * 1e3:.3f} ms"
+                elif name.startswith("peakmem"):
+                    tracemalloc.start()
+                    method(*values)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    result = f"{peak / 2**20:.1f} MiB"
+                else:
+                    result = f"{method(*values):.6g} {getattr(method, 'unit', '')}"
+            except Exception as error:
+                failed += 1
+                result = f"FAILED ({type(error).__name__}: {error})"
+            finally:
+                if hasattr(instance, "teardown"):
+                    instance.teardown(*values)
+            print(f"{label:80s} {result}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
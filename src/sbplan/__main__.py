@@ -0,0 +1,9 @@
+"""
+`python -m sbplan` (see `sbplan.cli`).
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -5,13 +5,13 @@ Catalog
 :Author: Ruining ZHAO (rnzhao@nao.cas.cn)
 """
 import os
+import importlib as _importlib
 
 # AstroPy
 import astropy.config as _config
 
-from .core import CometCatalog, CometCatalogClass
-
-__all__ = ['CometCatalog', 'CometCatalogClass', 'conf']
+__all__ = ['CometCatalog', 'CometCatalogClass', 'AsteroidCatalog', 'AsteroidCatalogClass', 
+           'DesignationIndex', 'readCometEls', 'conf']
 
 
 class Conf(_config.ConfigNamespace):
@@ -33,6 +33,27 @@ class Conf(_config.ConfigNamespace):
         )
     )
 
+    retries = _config.ConfigItem(
+        3, cfgtype='integer', 
+        description=(
+            'Number of retries of a failed catalog download.'
+        )
+    )
+
+    retry_backoff = _config.ConfigItem(
+        1.0, cfgtype='float', 
+        description=(
+            'Delay [s] before the first retry (doubled after each retry).'
+        )
+    )
+
+    page_size = _config.ConfigItem(
+        50000, cfgtype='integer', 
+        description=(
+            'Number of rows per page of paged (asteroid) catalog downloads.'
+        )
+    )
+
     catalog_dir = _config.ConfigItem(
         os.path.join(os.path.dirname(__file__), 'lib'), cfgtype='string', 
         description=(
@@ -49,4 +70,26 @@ class Conf(_config.ConfigNamespace):
 
 conf = Conf()
 
-del _config
\ No newline at end of file
+# Heavy dependencies (astroquery, astropy tables) are imported on first use
+_LAZY = {
+    'CometCatalog': 'core', 'CometCatalogClass': 'core', 'AsteroidCatalog': 'asteroids', 
+    'AsteroidCatalogClass': 'asteroids', 'DesignationIndex': 'index', 'readCometEls': 'mpc', 
+}
+
+
+def __getattr__(name):
+
+    if name in _LAZY:
+        value = getattr(_importlib.import_module(f'.{_LAZY[name]}', __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(_LAZY))
+
+
+del _config
@@ -0,0 +1,273 @@
+"""
+Paged asteroid catalogs.
+
+The SBDB holds over a million asteroids, too many for a single response. The
+query is paged with "limit" and "limit-from": each page is decoded as it
+streams in and written to its own CSV file under `<catalog>.pages/`, next to
+a `progress.json` recording the pages done. An interrupted download resumes
+from the first missing page. Once the last (short) page is in, the pages are
+concatenated into `asteroid_catalog_<type>.csv`, which is then read through
+the same binary, memory-mapped cache as the comet catalogs.
+"""
+
+import os, re, json, shutil, hashlib
+
+# AstroPy
+from astropy.table import Table
+
+from . import conf
+from .core import CometCatalogClass
+from ..profiling import profiler
+from ..files import atomicWrite
+from .cache import readMeta, writeMeta
+
+__all__ = ["AsteroidCatalog", "AsteroidCatalogClass"]
+
+
+class AsteroidCatalogClass(CometCatalogClass):
+
+    CATALOG_TYPE = ["all"]
+    PAGE_SIZE = conf.page_size
+
+    # Kind of small bodies (prefix of the catalog files)
+    KIND = "asteroid"
+    FIELDS = "pdes,tp,q,e,w,om,i,H,G,orbit_id"
+
+
+    def get(self, cat_type="all", update=False, verbose=False, copy=True, max_H=None,
+            orbit_class=None):
+        """
+        Get an asteroid catalog.
+
+        Parameters
+        ----------
+        cat_type : str
+            Name of the catalog (letters, digits, "_" and "-").
+        update : bool, optional
+            If `True`, download the catalog first.
+        verbose : bool, optional
+            If `True`, print the progress of the download.
+        copy : bool, optional
+            If `False`, the columns are read-only views of the memory-mapped file.
+        max_H : float, optional
+            Only asteroids with H < `max_H` [mag].
+        orbit_class : str or list, optional
+            Only asteroids of these SBDB orbit classes (e.g., "MBA", or
+            ["ATE", "APO", "AMO"]).
+
+        The filters of a catalog are stored with it. The catalog is downloaded
+        again if filters differing from the stored ones are given.
+
+        Returns
+        -------
+        catalog : astropy.table.table.Table
+            Catalog.
+        """
+
+        self._check_cat_type_dtype(cat_type)
+        if not isinstance(cat_type, str):
+            raise TypeError("A `str` is required for `cat_type`.")
+        filters = self._check_filters_dtype(max_H, orbit_class)
+
+        paths = self._paths(cat_type)
+        stored = readMeta(paths["json"]).get("filters")
+        if (not os.path.exists(paths["csv"])) | update |\
+           ((filters is not None) and (filters != stored)):
+            self._update(cat_type=cat_type, verbose=verbose, filters=filters)
+
+        return self._get(cat_type=cat_type, copy=copy)
+
+
+    def update(self, cat_type="all", verbose=False, max_H=None, orbit_class=None, resume=True):
+        """
+        Download an asteroid catalog page by page.
+
+        Parameters
+        ----------
+        cat_type : str or list
+            Name(s) of the catalog(s).
+        verbose : bool, optional
+            If `True`, print the progress of the download.
+        max_H, orbit_class : optional
+            Filters (see `get`). Default to the stored filters of the catalog.
+        resume : bool, optional
+            If `True`, resume an interrupted download of the same query.
+        """
+
+        cat_types = self._check_cat_type_dtype(cat_type)
+        filters = self._check_filters_dtype(max_H, orbit_class)
+
+        for cat_type in cat_types:
+            self._update(cat_type=cat_type, verbose=verbose, filters=filters, resume=resume)
+
+        return None
+
+
+    def changes(self, cat_type, since=0):
+        """
+        Changes of a catalog after a revision.
+
+        Rows are not compared between downloads of paged catalogs (the catalog
+        "revision" only increments when its content changes), so a change
+        invalidates the whole catalog: "changed" and "removed" are `None`
+        (unknown rows) if the revision is past `since`, and empty otherwise.
+
+        Parameters
+        ----------
+        cat_type : str
+            Name of the catalog.
+        since : int, optional
+            Revision.
+
+        Returns
+        -------
+        changes : dict
+            Current "revision", and designations "changed" and "removed" after
+            `since` (see `CometCatalogClass.changes`).
+        """
+
+        self._check_cat_type_dtype(cat_type)
+
+        revision = readMeta(self._paths(cat_type)["json"]).get("revision", 0)
+        if revision > since:
+            return {"revision": revision, "changed": None, "removed": None}
+
+        return {"revision": revision, "changed": list(), "removed": list()}
+
+
+    def _update(self, cat_type, verbose, incremental=True, filters=None, resume=True):
+        """
+        Download, decode and write a catalog page by page. If profiling is
+        enabled, the time of each step is recorded in `self.stats[cat_type]`.
+        """
+
+        profile = profiler(f"catalog.update.{self.KIND}.{cat_type}")
+
+        paths = self._paths(cat_type)
+        meta = readMeta(paths["json"])
+        if filters is None:
+            filters = meta.get("filters", {"max_H": None, "orbit_class": None})
+        payload = self._args_to_payload(cat_type, filters)
+
+        # - Pages (a download of the same query and page size resumes)
+        pages_dir = os.path.splitext(paths["csv"])[0] + ".pages"
+        progress_path = os.path.join(pages_dir, "progress.json")
+        query = {"payload": payload, "page_size": self.PAGE_SIZE}
+        progress = readMeta(progress_path)
+        if (not resume) or any(progress.get(key) != value for key, value in query.items()):
+            shutil.rmtree(pages_dir, ignore_errors=True)
+            progress = dict(query, pages=0, rows=0, done=False)
+        os.makedirs(pages_dir, exist_ok=True)
+
+        while not progress["done"]:
+            page = progress["pages"]
+            with profile.stage("download"):
+                catalog_dict, columns = self._fetch(
+                    dict(payload, **{"limit": self.PAGE_SIZE, "limit-from": page * self.PAGE_SIZE}))
+            with profile.stage("decode"):
+                if columns:
+                    table = Table(columns, names=catalog_dict["fields"])
+                else:
+                    table = Table(names=catalog_dict["fields"], dtype=[str] * len(catalog_dict["fields"]))
+            with profile.stage("write", len(table)):
+                atomicWrite(
+                    self._pagePath(pages_dir, page), lambda f: table.write(f, format="ascii.csv"))
+            progress.update({
+                "pages": page + 1, "rows": progress["rows"] + len(table),
+                "done": len(table) < self.PAGE_SIZE, "signature": catalog_dict["signature"],
+            })
+            writeMeta(progress_path, progress)
+            if verbose: print(f"Page {page + 1}: {progress['rows']} rows")
+
+        # - Catalog (pages concatenated, one header)
+        digest = hashlib.sha1()
+        def write(f):
+            for page in range(progress["pages"]):
+                with open(self._pagePath(pages_dir, page), "r") as page_file:
+                    header = page_file.readline()
+                    if page == 0:
+                        f.write(header)
+                        digest.update(header.encode())
+                    for block in iter(lambda: page_file.read(2**20), ""):
+                        f.write(block)
+                        digest.update(block.encode())
+        with profile.stage("write"):
+            atomicWrite(paths["csv"], write)
+
+        meta.update({
+            "signature": progress["signature"], "filters": filters, "count": progress["rows"],
+            "revision": meta.get("revision", 0) + int(meta.get("digest") != digest.hexdigest()),
+            "digest": digest.hexdigest(),
+        })
+        writeMeta(paths["json"], meta)
+        shutil.rmtree(pages_dir, ignore_errors=True)
+        if verbose: print(f"{progress['signature']['source']} (version {progress['signature']['version']}): {progress['rows']} rows")
+
+        self.stats[cat_type] = profile.finish()
+
+        return None
+
+
+    @staticmethod
+    def _pagePath(pages_dir, page):
+
+        return os.path.join(pages_dir, f"page_{page:06d}.csv")
+
+
+    def _check_cat_type_dtype(self, cat_type):
+        """
+        """
+
+        cat_types = [cat_type] if isinstance(cat_type, str) else cat_type
+        if not isinstance(cat_types, list):
+            raise TypeError("A `str` or a `list` of catalog names is required.")
+        for cat_type_item in cat_types:
+            if (not isinstance(cat_type_item, str)) or (not re.fullmatch(r"[\w-]+", cat_type_item)):
+                raise ValueError(
+                    "Catalog names may only contain letters, digits, `_` and `-`.")
+
+        return cat_types
+
+
+    def _check_filters_dtype(self, max_H, orbit_class):
+        """
+        Filters (`None` if none is given).
+        """
+
+        if (max_H is None) and (orbit_class is None):
+            return None
+
+        if (max_H is not None) and (not isinstance(max_H, (int, float))):
+            raise TypeError("A `float` is required for `max_H`.")
+        if isinstance(orbit_class, str):
+            orbit_class = [orbit_class]
+        if orbit_class is not None:
+            if (not isinstance(orbit_class, (list, tuple))) or (len(orbit_class) == 0) or\
+               (not all(isinstance(item, str) and item.isalnum() for item in orbit_class)):
+                raise ValueError("A `str` or a `list` of SBDB orbit classes is required.")
+            orbit_class = sorted(set(orbit_class))
+
+        return {"max_H": None if max_H is None else float(max_H), "orbit_class": orbit_class}
+
+
+    def _args_to_payload(self, cat_type, filters=None):
+        """
+        """
+
+        payload = {
+            "fields": self.FIELDS,
+            "full-prec": 1,
+            "sb-kind": "a",
+        }
+
+        filters = filters or dict()
+        if filters.get("orbit_class"):
+            payload["sb-class"] = ",".join(filters["orbit_class"])
+        if filters.get("max_H") is not None:
+            payload["sb-cdata"] = json.dumps({"AND": [f"H|LT|{filters['max_H']}"]})
+
+        return payload
+
+
+# the default tool for users to interact with is an instance of the Class
+AsteroidCatalog = AsteroidCatalogClass()
@@ -0,0 +1,335 @@
+"""
+Binary, memory-mapped cache of the small-body catalogs.
+
+Next to each `<kind>_catalog_<type>.csv` (kind "comet" or "asteroid"), the
+catalog is stored as a NumPy structured array (`<kind>_catalog_<type>.npy`:
+fixed-width numeric and string columns of the same types as the CSV read by
+`Table.read`, designations always as strings, and a boolean "<name>.mask"
+field per masked column) that can be memory-mapped. `<kind>_catalog_<type>.json` keeps the signature of the
+JPL response and a per-row change log (the revision at which each row last
+changed); `<kind>_catalog_<type>.npy.json` keeps the state of the binary cache
+(CSV mtime and JPL signature version it was built from).
+"""
+
+import io, os, csv, json, threading
+
+# NumPy
+import numpy as np
+
+from ..files import atomicWrite
+
+__all__ = ["catalogPaths", "readMeta", "writeMeta", "readCatalog", "writeCatalog", 
+           "catalogChanges", "clearCache"]
+
+# Version of the binary layout
+FORMAT_VERSION = 3
+
+# In-process cache of memory-mapped catalogs keyed on (catalog_dir, kind, cat_type)
+_CATALOGS = dict()
+_LOCK = threading.Lock()
+
+
+def catalogPaths(catalog_dir, cat_type, kind="comet"):
+    """
+    Paths to the CSV, binary, metadata and cache stamp files of a catalog.
+    """
+
+    stem = os.path.join(catalog_dir, f"{kind}_catalog_{cat_type}")
+
+    return {
+        "csv": f"{stem}.csv", "npy": f"{stem}.npy", "json": f"{stem}.json", 
+        "stamp": f"{stem}.npy.json", 
+    }
+
+
+def readMeta(path):
+    """
+    Read catalog metadata (empty if missing or unreadable).
+    """
+
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+
+def writeMeta(path, meta):
+    """
+    Write catalog metadata atomically.
+    """
+
+    atomicWrite(path, lambda f: json.dump(meta, f, indent=2))
+
+
+def _signatureVersion(meta):
+
+    return meta.get("signature", dict()).get("version")
+
+
+def _toStructured(table):
+    """
+    Convert a table to a structured array. Columns keep their type; the mask
+    of a masked column is stored as a boolean field "<name>.mask".
+    """
+
+    dtype, masked = list(), list()
+    for name in table.colnames:
+        column = table[name]
+        if column.dtype.kind in "US":
+            length = max(int(np.char.str_len(np.ma.getdata(column).astype(str)).max(initial=1)), 1)
+            dtype.append((name, f"{column.dtype.kind}{length}"))
+        else:
+            dtype.append((name, column.dtype.str))
+        if getattr(column, "mask", None) is not None and np.any(column.mask):
+            masked.append(name)
+    dtype += [(f"{name}.mask", "?") for name in masked]
+
+    data = np.empty(len(table), dtype=dtype)
+    for name in table.colnames:
+        data[name] = np.ma.getdata(table[name])
+    for name in masked:
+        data[f"{name}.mask"] = np.ma.getmaskarray(table[name])
+
+    return data, masked
+
+
+def _fromStructured(data, masked, copy=True):
+    """
+    Convert a (memory-mapped) structured array to a table.
+    """
+
+    # AstroPy (imported here: reading the metadata alone must stay light)
+    from astropy.table import Table, MaskedColumn
+
+    names = [name for name in data.dtype.names if not name.endswith(".mask")]
+    columns = list()
+    for name in names:
+        values = np.array(data[name]) if copy else data[name]
+        if name in masked:
+            # Masks are small (and must be writable)
+            columns.append(MaskedColumn(
+                values, name=name, mask=np.array(data[f"{name}.mask"]), copy=False))
+        else:
+            columns.append(values)
+
+    return Table(columns, names=names, copy=False)
+
+
+def _load(paths):
+    """
+    Load the memory-mapped binary catalog, rebuilding it from the CSV if it is
+    missing or stale.
+
+    Returns
+    -------
+    data : numpy.ndarray or numpy.memmap
+        Structured array.
+    masked : list
+        Names of masked columns.
+    stamp : tuple
+        (CSV mtime, JPL signature version) the binary catalog is valid for.
+    """
+
+    meta = readMeta(paths["json"])
+    stamp = (os.stat(paths["csv"]).st_mtime_ns, _signatureVersion(meta))
+
+    # The stamp has its own file: the metadata belongs to `writeCatalog`, which
+    # may run concurrently
+    cache = readMeta(paths["stamp"])
+    if (cache.get("format") == FORMAT_VERSION) and\
+       ((cache.get("csv_mtime"), cache.get("signature_version")) == stamp) and\
+       os.path.exists(paths["npy"]):
+        try:
+            return np.load(paths["npy"], mmap_mode="r"), cache.get("masked", list()), stamp
+        except (OSError, ValueError):
+            pass
+
+    # AstroPy
+    from astropy.table import Table
+
+    table = Table.read(paths["csv"])
+    # Designations are strings, also when all are numbers (e.g., asteroids
+    # with a limit on H): cast after the read, as converters disable the fast
+    # reader
+    if ("pdes" in table.colnames) and (table["pdes"].dtype.kind not in "US"):
+        table["pdes"] = table["pdes"].astype(str)
+    data, masked = _toStructured(table)
+
+    # The catalog directory may be read-only (e.g., a system-wide installation)
+    try:
+        atomicWrite(paths["npy"], lambda f: np.save(f, data), mode="wb")
+        writeMeta(paths["stamp"], {
+            "format": FORMAT_VERSION, "csv_mtime": stamp[0],
+            "signature_version": stamp[1], "masked": masked,
+        })
+        data = np.load(paths["npy"], mmap_mode="r")
+    except OSError:
+        pass
+
+    return data, masked, stamp
+
+
+def _stamp(paths):
+    """
+    Modification times of the CSV and metadata files (cheap staleness check).
+    """
+
+    try:
+        meta_mtime = os.stat(paths["json"]).st_mtime_ns
+    except OSError:
+        meta_mtime = None
+
+    return (os.stat(paths["csv"]).st_mtime_ns, meta_mtime)
+
+
+def readCatalog(catalog_dir, cat_type, copy=True, kind="comet"):
+    """
+    Read a catalog through the binary and in-process caches.
+
+    Parameters
+    ----------
+    catalog_dir : str
+        Path to the directory where the catalogs are stored.
+    cat_type : str
+        Type of catalog.
+    copy : bool, optional
+        If `False`, the columns are read-only views of the memory-mapped file.
+    kind : str, optional
+        "comet" or "asteroid".
+
+    Returns
+    -------
+    catalog : astropy.table.table.Table
+        Catalog (same as `Table.read` of the CSV, with designations as strings).
+    """
+
+    key = (os.path.abspath(catalog_dir), kind, cat_type)
+    paths = catalogPaths(catalog_dir, cat_type, kind=kind)
+
+    with _LOCK:
+        cached = _CATALOGS.get(key)
+    if (cached is None) or (cached[2] != _stamp(paths)):
+        data, masked, _ = _load(paths)
+        cached = (data, masked, _stamp(paths))
+        with _LOCK:
+            _CATALOGS[key] = cached
+
+    data, masked, _ = cached
+
+    return _fromStructured(data, masked, copy=copy)
+
+
+def _rowsByDesignation(text, key="pdes"):
+    """
+    Map designations to their CSV rows (as text).
+    """
+
+    lines = text.splitlines()
+    if not lines:
+        return dict()
+
+    index = next(csv.reader([lines[0]])).index(key)
+
+    return {row[index]: line for row, line in zip(csv.reader(lines[1:]), lines[1:])}
+
+
+def writeCatalog(paths, table, meta, incremental=True):
+    """
+    Write a catalog and record which rows changed.
+
+    The new catalog is compared with the stored one row by row (by `pdes`; a
+    row changes when its `orbit_id` or any other field changes). The CSV is
+    written atomically (temporary file and rename), so readers never see a
+    partial file, and is left untouched if nothing changed in incremental mode.
+    Each changing write increments `meta["revision"]`; `meta["rows"]` and
+    `meta["removed"]` keep the revision at which each row last changed or was
+    removed.
+
+    Parameters
+    ----------
+    paths : dict
+        Paths of the catalog (see `catalogPaths`).
+    table : astropy.table.table.Table
+        New catalog.
+    meta : dict
+        Metadata (updated in place and written).
+    incremental : bool, optional
+        If `False`, rewrite the CSV even if nothing changed.
+
+    Returns
+    -------
+    changes : dict
+        Designations "added", "changed" and "removed" by this write.
+    """
+
+    buffer = io.StringIO()
+    table.write(buffer, format="ascii.csv")
+    text = buffer.getvalue()
+
+    new_rows = _rowsByDesignation(text)
+    if os.path.exists(paths["csv"]):
+        with open(paths["csv"], "r") as f:
+            old_rows = _rowsByDesignation(f.read())
+    else:
+        old_rows = dict()
+
+    changes = {
+        "added": [pdes for pdes in new_rows if pdes not in old_rows],
+        "changed": [
+            pdes for pdes in new_rows if (pdes in old_rows) and (new_rows[pdes] != old_rows[pdes])],
+        "removed": [pdes for pdes in old_rows if pdes not in new_rows],
+    }
+    changed = any(changes.values())
+
+    if changed:
+        revision = meta.get("revision", 0) + 1
+        rows, removed = meta.get("rows", dict()), meta.get("removed", dict())
+        for pdes in changes["added"] + changes["changed"]:
+            rows[pdes] = revision
+            removed.pop(pdes, None)
+        for pdes in changes["removed"]:
+            rows.pop(pdes, None)
+            removed[pdes] = revision
+        meta.update({"revision": revision, "rows": rows, "removed": removed})
+
+    if changed or (not incremental) or (not os.path.exists(paths["csv"])):
+        atomicWrite(paths["csv"], lambda f: f.write(text))
+
+    writeMeta(paths["json"], meta)
+
+    return changes
+
+
+def catalogChanges(meta, since=0):
+    """
+    Rows changed after a revision.
+
+    Parameters
+    ----------
+    meta : dict
+        Metadata of a catalog.
+    since : int, optional
+        Revision.
+
+    Returns
+    -------
+    changes : dict
+        Current "revision", and designations "changed" (added or modified) and 
+        "removed" after `since`.
+    """
+
+    return {
+        "revision": meta.get("revision", 0),
+        "changed": [pdes for pdes, rev in meta.get("rows", dict()).items() if rev > since],
+        "removed": [pdes for pdes, rev in meta.get("removed", dict()).items() if rev > since],
+    }
+
+
+def clearCache():
+    """
+    Clear the in-process catalog cache.
+    """
+
+    with _LOCK:
+        _CATALOGS.clear()
@@ -1,15 +1,22 @@
 """
 """
 
-import os, json
+import os, json, time
+from concurrent.futures import ThreadPoolExecutor
 
 # AstroPy
 from astropy.table import Table
+# requests
+import requests
+from requests.adapters import HTTPAdapter
 
 # astroquery
 from astroquery.query import BaseQuery
 
 from . import conf
+from ..profiling import profiler
+from .cache import catalogPaths, catalogChanges, readCatalog, readMeta, writeCatalog
+from .download import decodeJSONStream
 
 __all__ = ["CometCatalog", "CometCatalogClass"]
 
@@ -20,6 +27,14 @@ class CometCatalogClass(BaseQuery):
     TIMEOUT = conf.timeout
     CATALOG_DIR = conf.catalog_dir
     CATALOG_TYPE = conf.catalog_type
+    RETRIES = conf.retries
+    RETRY_BACKOFF = conf.retry_backoff
+
+    # HTTP status codes worth retrying
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    # Kind of small bodies (prefix of the catalog files)
+    KIND = "comet"
 
 
     def __init__(self):
@@ -28,41 +43,69 @@ class CometCatalogClass(BaseQuery):
         """
         super(CometCatalogClass, self).__init__()
 
+        # Stats of the last update of each catalog type (see `sbplan.profiling`)
+        self.stats = dict()
+        # Connections are pooled (one per catalog type downloaded at once)
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=len(self.CATALOG_TYPE)))
+        self._session.mount("http://", HTTPAdapter(pool_maxsize=len(self.CATALOG_TYPE)))
+
 
-    def get(self, cat_type=CATALOG_TYPE, update=False, verbose=False):
+    def get(self, cat_type=CATALOG_TYPE, update=False, verbose=False, copy=True):
         """
+        Get catalogs.
+
+        Catalogs are read through a binary, memory-mapped copy stored next to 
+        the CSV (rebuilt whenever the CSV or the JPL signature version changes) 
+        and an in-process cache, so repeated calls do not parse the CSV again.
+
+        Parameters
+        ----------
+        cat_type : str or list
+            Type(s) of catalog.
+        update : bool, optional
+            If `True`, download the catalog(s) first.
+        verbose : bool, optional
+            If `True`, print the version of the downloaded catalog(s).
+        copy : bool, optional
+            If `False`, the columns are read-only views of the memory-mapped file.
+
+        Returns
+        -------
+        catalog : astropy.table.table.Table or list
+            Catalog(s).
         """
         
         self._check_cat_type_dtype(cat_type)
 
         if isinstance(cat_type, list):
 
+            # Missing catalogs are downloaded at once
+            self._updateMany(
+                cat_types=[
+                    cat_type_item for cat_type_item in cat_type 
+                    if (not os.path.exists(self._paths(cat_type_item)["csv"])) | update
+                ], 
+                verbose=verbose)
+
             catalog = list()
             for cat_type_item in cat_type:
-
-                catalog_path = os.path.join(self.CATALOG_DIR, f"comet_catalog_{cat_type_item}.csv")
-                if (not os.path.exists(catalog_path)) | update:
-                    self._update(cat_type=cat_type_item, verbose=verbose)
-
-                catalog.append(self._get(cat_type=cat_type_item))
+                catalog.append(self._get(cat_type=cat_type_item, copy=copy))
 
         else:
             
-            catalog_path = os.path.join(self.CATALOG_DIR, f"comet_catalog_{cat_type}.csv")
-            if (not os.path.exists(catalog_path)) | update:
+            if (not os.path.exists(self._paths(cat_type)["csv"])) | update:
                 self._update(cat_type=cat_type, verbose=verbose)
 
-            catalog = self._get(cat_type=cat_type)
+            catalog = self._get(cat_type=cat_type, copy=copy)
 
         return catalog
 
 
-    def _get(self, cat_type):
+    def _get(self, cat_type, copy=True):
         """
         """
             
-        catalog_path = os.path.join(self.CATALOG_DIR, f"comet_catalog_{cat_type}.csv")
-        catalog = Table.read(catalog_path)
+        catalog = readCatalog(self.CATALOG_DIR, cat_type, copy=copy, kind=self.KIND)
 
 #         # Custom defined filters
 #         if cat_type == "obs":
@@ -74,46 +117,174 @@ class CometCatalogClass(BaseQuery):
         return catalog
 
 
-    def update(self, cat_type=CATALOG_TYPE, verbose=False):
+    def update(self, cat_type=CATALOG_TYPE, verbose=False, incremental=True, workers=None):
         """
+        Download catalogs.
+
+        Catalog types are downloaded concurrently over a pooled session, each 
+        response is decoded while it streams in, and failed requests (network 
+        errors, time-outs and 429/5xx responses) are retried `RETRIES` times 
+        with exponential backoff.
+
+        Parameters
+        ----------
+        cat_type : str or list
+            Type(s) of catalog.
+        verbose : bool, optional
+            If `True`, print the version of the catalog(s) and the number of 
+            changed rows.
+        incremental : bool, optional
+            If `True`, the CSV is only rewritten if rows changed. Changed rows 
+            are recorded in either mode (see `changes`).
+        workers : int, optional
+            Number of concurrent downloads (default: one per catalog type).
         """
 
         self._check_cat_type_dtype(cat_type)
 
         if isinstance(cat_type, list):
-            catalog = list()
-            for cat_type_item in cat_type:
-                self._update(cat_type=cat_type_item, verbose=verbose)
+            self._updateMany(
+                cat_types=cat_type, verbose=verbose, incremental=incremental, workers=workers)
 
         else:
-            self._update(cat_type=cat_type, verbose=verbose)
+            self._update(cat_type=cat_type, verbose=verbose, incremental=incremental)
+
+        return None
+
+
+    def changes(self, cat_type, since=0):
+        """
+        Rows changed by updates after a revision.
+
+        Ephemeris caches can store the revision they were built from and only 
+        invalidate the comets returned here.
+
+        Parameters
+        ----------
+        cat_type : str
+            Type of catalog.
+        since : int, optional
+            Revision.
+
+        Returns
+        -------
+        changes : dict
+            Current "revision", and designations "changed" (added or modified) 
+            and "removed" after `since`.
+        """
+
+        self._check_cat_type_dtype(cat_type)
+
+        return catalogChanges(
+            readMeta(self._paths(cat_type)["json"]), since=since)
+
+
+    def _paths(self, cat_type):
+        """
+        Paths to the files of a catalog (see `sbplan.catalog.cache.catalogPaths`).
+        """
+
+        return catalogPaths(self.CATALOG_DIR, cat_type, kind=self.KIND)
+
+
+    def _updateMany(self, cat_types, verbose, incremental=True, workers=None):
+        """
+        Update several catalogs concurrently.
+        """
+
+        if len(cat_types) <= 1:
+            for cat_type in cat_types:
+                self._update(cat_type=cat_type, verbose=verbose, incremental=incremental)
+            return None
+
+        with ThreadPoolExecutor(max_workers=workers or len(cat_types)) as pool:
+            futures = [
+                pool.submit(self._update, cat_type=cat_type, verbose=verbose, 
+                            incremental=incremental)
+                for cat_type in cat_types
+            ]
+            # Re-raise the first error (after all downloads have finished)
+            for future in futures:
+                future.result()
 
         return None
 
 
-    def _update(self, cat_type, verbose):
+    def _update(self, cat_type, verbose, incremental=True):
         """
+        Download, decode and write a catalog. If profiling is enabled, the time 
+        of each step is recorded in `self.stats[cat_type]` (see `sbplan.profiling`).
         """
 
-        # Download
-        payload = self._args_to_payload(cat_type)
-        response = self._request(method="GET",
-                                 url=self.QUERY_URL,
-                                 data=payload,
-                                 timeout=self.TIMEOUT,
-                                 cache=False)
-        # Decode
-        catalog_dict = response.json()
+        profile = profiler(f"catalog.update.{cat_type}")
+
+        # Download and decode (streamed)
+        with profile.stage("download"):
+            catalog_dict, columns = self._download(cat_type)
+        with profile.stage("decode"):
+            if columns:
+                catalog = Table(columns, names=catalog_dict["fields"])
+            else:
+                catalog = Table(names=catalog_dict["fields"], dtype=[str] * len(catalog_dict["fields"]))
         # Check version
         if verbose: print(f"{catalog_dict['signature']['source']} (version {catalog_dict['signature']['version']})")
-        # Save
-        catalog_path = os.path.join(self.CATALOG_DIR, f"comet_catalog_{cat_type}.csv")
-        Table(names=catalog_dict["fields"], 
-              rows=catalog_dict["data"]).write(catalog_path, overwrite=True)
+        # Save (only the changes are recorded)
+        paths = self._paths(cat_type)
+        meta = readMeta(paths["json"])
+        meta["signature"] = catalog_dict["signature"]
+        with profile.stage("write", len(catalog)):
+            changes = writeCatalog(paths, catalog, meta, incremental=incremental)
+        if verbose: print(", ".join(f"{len(value)} {key}" for key, value in changes.items()))
+
+        self.stats[cat_type] = profile.finish()
 
         return None
 
 
+    def _download(self, cat_type):
+        """
+        Download a catalog, decoding the rows as they stream in.
+
+        Returns
+        -------
+        catalog_dict : dict
+            Response without its rows ("signature", "fields", "count").
+        columns : list
+            Columns of the catalog.
+        """
+
+        return self._fetch(self._args_to_payload(cat_type))
+
+
+    def _fetch(self, payload):
+        """
+        Query the SBDB with retries, decoding the rows as they stream in 
+        (see `_download`).
+        """
+
+        for attempt in range(self.RETRIES + 1):
+            try:
+                response = self._request(method="GET",
+                                         url=self.QUERY_URL,
+                                         data=payload,
+                                         timeout=self.TIMEOUT,
+                                         cache=False, 
+                                         stream=True)
+                try:
+                    response.raise_for_status()
+                    return decodeJSONStream(response.iter_content(chunk_size=2**16))
+                finally:
+                    response.close()
+            except (requests.ConnectionError, requests.Timeout, 
+                    requests.exceptions.ChunkedEncodingError, requests.HTTPError) as error:
+                if isinstance(error, requests.HTTPError) and (
+                        error.response.status_code not in self.RETRY_STATUS):
+                    raise
+                if attempt == self.RETRIES:
+                    raise
+                time.sleep(self.RETRY_BACKOFF * 2**attempt)
+
+
     def _check_cat_type_dtype(self, cat_type):
         """
         """
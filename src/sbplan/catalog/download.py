@@ -0,0 +1,137 @@
+"""
+Streamed decoding of SBDB query responses.
+
+The response of the SBDB query API is a JSON object whose "data" member holds
+one array per row. `decodeJSONStream` decodes the response from the chunks
+of a streamed download, row by row, so the raw text of the rows is dropped as
+soon as they are decoded and never held together with the decoded catalog.
+"""
+
+import json, codecs
+
+__all__ = ["decodeJSONStream"]
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader(object):
+    """
+    Text buffer over an iterator of chunks.
+    """
+
+
+    def __init__(self, chunks):
+
+        super(_Reader, self).__init__()
+
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text, self.pos, self.exhausted = "", 0, False
+
+
+    def more(self):
+        """
+        Read the next chunk (drops the consumed text).
+        """
+
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self.text, self.pos = self.text[self.pos:] + chunk, 0
+                return True
+
+        self.text, self.pos = self.text[self.pos:] + self._utf8.decode(b"", final=True), 0
+        self.exhausted = True
+
+        return False
+
+
+    def peek(self):
+        """
+        Next non-whitespace character ("" at the end of the stream).
+        """
+
+        while True:
+            while (self.pos < len(self.text)) and (self.text[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return ""
+
+
+    def expect(self, char):
+
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: '{char}' expected at position {self.pos}.")
+        self.pos += 1
+
+
+    def value(self):
+        """
+        Decode the next JSON value.
+        """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.text, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if (end < len(self.text)) or self.exhausted:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self.more()
+
+
+def decodeJSONStream(chunks, stream_key="data"):
+    """
+    Decode a JSON object from chunks, streaming the rows of one of its arrays.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Chunks (`bytes` in UTF-8, or `str`) of the JSON text, e.g.,
+        `response.iter_content(...)`.
+    stream_key : str, optional
+        Member holding an array of rows.
+
+    Returns
+    -------
+    obj : dict
+        Other members of the object.
+    columns : list
+        Columns of the streamed rows (empty if there are no rows).
+    """
+
+    reader = _Reader(chunks)
+    obj, columns = dict(), list()
+
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if (key == stream_key) and (reader.peek() == "["):
+            reader.expect("[")
+            while reader.peek() != "]":
+                row = reader.value()
+                if not columns:
+                    columns = [list() for _ in row]
+                elif len(row) != len(columns):
+                    raise ValueError("Invalid JSON: rows of different lengths.")
+                for column, item in zip(columns, row):
+                    column.append(item)
+                if reader.peek() == ",":
+                    reader.expect(",")
+            reader.expect("]")
+        else:
+            obj[key] = reader.value()
+        if reader.peek() == ",":
+            reader.expect(",")
+    reader.expect("}")
+
+    return obj, columns
@@ -0,0 +1,80 @@
+"""
+Hashed designation index of a catalog.
+"""
+
+# NumPy
+import numpy as np
+
+__all__ = ["DesignationIndex"]
+
+
+class DesignationIndex(object):
+    """
+    Rows of a catalog by designation, e.g.,
+
+        >>> index = DesignationIndex(catalog)
+        >>> targets = index.select(["1P", "2P", "C/2023 A3"])
+    """
+
+
+    def __init__(self, catalog, column=None):
+        """
+        Build a designation index.
+
+        Parameters
+        ----------
+        catalog : astropy.table.table.Table
+            Catalog.
+        column : str, optional
+            Column of the designations. Defaults to "designation" (`skyfield`
+            format) or "pdes" (JPL format).
+        """
+
+        super(DesignationIndex, self).__init__()
+
+        if column is None:
+            column = "designation" if "designation" in catalog.colnames else "pdes"
+        if column not in catalog.colnames:
+            raise ValueError(f"Column `{column}` not found.")
+
+        self.catalog = catalog
+        self.designation = np.asarray(catalog[column]).astype(str)
+        # Later rows win for duplicate designations
+        self._index = {pdes: k for k, pdes in enumerate(self.designation)}
+
+
+    def __len__(self):
+
+        return len(self._index)
+
+
+    def __contains__(self, pdes):
+
+        return pdes in self._index
+
+
+    def rows(self, designations):
+        """
+        Rows of one or more designations.
+        """
+
+        if isinstance(designations, str):
+            if designations not in self._index:
+                raise LookupError(f"{designations} not found")
+            return self._index[designations]
+
+        missing = [pdes for pdes in designations if pdes not in self._index]
+        if missing:
+            raise LookupError(f"{', '.join(missing)} not found")
+
+        return np.array([self._index[pdes] for pdes in designations], dtype=int)
+
+
+    def select(self, designations):
+        """
+        Sub-catalog of some designations (in the order given).
+        """
+
+        rows = self.rows(designations)
+
+        return self.catalog[[rows] if np.ndim(rows) == 0 else rows]
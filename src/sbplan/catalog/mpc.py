@@ -0,0 +1,175 @@
+"""
+Streaming reader of MPC comet element files (`CometEls.txt`, see
+https://www.minorplanetcenter.net/iau/info/CometOrbitFormat.html).
+
+Lines are read in blocks and sliced as fixed-width byte columns straight into
+a NumPy structured array with the columns of `toSkyfieldFormat(..., "mpc")`.
+Duplicate designations are resolved while reading (the last orbit of each
+comet is kept), so memory is bounded by the number of comets and one block
+of lines. Gzip-compressed files are decompressed on the fly.
+"""
+
+import io, re, gzip
+
+# NumPy
+import numpy as np
+# AstroPy
+from astropy.table import Table
+
+from .utils import catalogOrder, primaryDesignation
+
+__all__ = ["readCometEls"]
+
+# Fixed-width numeric columns (name, start, end, type), as in
+# `skyfield.data.mpc.load_comets_dataframe`
+COMET_COLUMNS = [
+    ("perihelion_year", 14, 18, np.int64),
+    ("perihelion_month", 19, 21, np.int64),
+    ("perihelion_day", 22, 29, np.float64),
+    ("perihelion_distance_au", 30, 39, np.float64),
+    ("eccentricity", 41, 49, np.float64),
+    ("argument_of_perihelion_degrees", 51, 59, np.float64),
+    ("longitude_of_ascending_node_degrees", 61, 69, np.float64),
+    ("inclination_degrees", 71, 79, np.float64),
+    ("magnitude_g", 91, 95, np.float64),
+    ("magnitude_k", 96, 100, np.float64),
+]
+# The name and the reference follow (separated by two or more spaces)
+_TAIL_START = 102
+_TAIL = re.compile(rb"(.*?)  +(.*)")
+
+# Size of the blocks of lines [bytes]
+BLOCK_SIZE = 2**20
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _open(source):
+    """
+    Binary stream of a path or a file object (gzip-compressed or not), and 
+    whether it was opened here.
+    """
+
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        f, opened = open(source, "rb"), True
+    else:
+        f, opened = source, False
+    if not hasattr(f, "peek"):
+        f = io.BufferedReader(f)
+
+    if f.peek(2)[:2] == _GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=f, mode="rb"), f, opened
+
+    return f, f, opened
+
+
+def _parseBlock(lines):
+    """
+    Numeric columns, names and references of a block of lines.
+    """
+
+    lines = [line.rstrip(b"\r\n") for line in lines]
+    lines = [line for line in lines if line.strip()]
+
+    # Fixed-width part as a (n_lines, _TAIL_START) array of bytes
+    chars = np.array([line[:_TAIL_START] for line in lines], dtype=f"S{_TAIL_START}")
+    chars = chars.view("u1").reshape(len(lines), _TAIL_START)
+
+    columns = dict()
+    for name, start, end, dtype in COMET_COLUMNS:
+        field = np.ascontiguousarray(chars[:, start:end]).view(f"S{end - start}")[:, 0]
+        try:
+            try:
+                columns[name] = field.astype(dtype)
+            except ValueError:
+                if dtype is not np.float64:
+                    raise
+                # Blank fields (e.g., magnitudes) are NaN
+                columns[name] = np.where(np.char.strip(field) == b"", b"nan", field).astype(dtype)
+        except ValueError:
+            raise ValueError(f"Invalid `{name}` in MPC comet elements.")
+
+    names, references = list(), list()
+    for line in lines:
+        match = _TAIL.match(line, _TAIL_START)
+        if match is None:
+            name, reference = line[_TAIL_START:], b""
+        else:
+            name, reference = match.groups()
+        names.append(name.decode("ascii", "replace"))
+        references.append(reference.decode("ascii", "replace"))
+
+    return columns, names, references
+
+
+def readCometEls(source, block_size=BLOCK_SIZE):
+    """
+    Read an MPC comet element file into the layout of
+    `toSkyfieldFormat(..., "mpc")`: primary designations, K1 = 2.5 * k, the
+    last orbit of each comet, numbered comets first and interstellar objects
+    last.
+
+    Parameters
+    ----------
+    source : str or file object
+        Path to the file, or binary file object (plain or gzip-compressed).
+    block_size : int, optional
+        Size of the blocks of lines [bytes].
+
+    Returns
+    -------
+    catalog : astropy.table.table.Table
+        Comet catalog in `skyfield` format (columns backed by a structured
+        array).
+    """
+
+    stream, raw, opened = _open(source)
+
+    # - Single pass: the last orbit of each comet (rows in order of first 
+    #   appearance)
+    index = dict()
+    columns = {name: np.empty(0, dtype=dtype) for name, _, _, dtype in COMET_COLUMNS}
+    references, width = list(), 1
+    try:
+        for lines in iter(lambda: stream.readlines(block_size), []):
+            block, block_names, block_references = _parseBlock(lines)
+            if not block_names:
+                continue
+
+            # 1. Rows (new comets are appended)
+            pdes = primaryDesignation(block_names)
+            rows = np.array([index.setdefault(p, len(index)) for p in pdes.tolist()], dtype=int)
+            if len(index) > columns["perihelion_year"].shape[0]:
+                capacity = max(len(index), 2 * columns["perihelion_year"].shape[0])
+                for name in columns:
+                    columns[name] = np.resize(columns[name], capacity)
+                references += [""] * (capacity - len(references))
+
+            # 2. Within a block, the last line of each comet wins
+            last = rows.shape[0] - 1 - np.unique(rows[::-1], return_index=True)[1]
+            for name in columns:
+                columns[name][rows[last]] = block[name][last]
+            for k in last.tolist():
+                references[rows[k]] = block_references[k]
+            # Same width as a table of all rows
+            width = max([width] + [len(reference) for reference in block_references])
+    finally:
+        if opened:
+            raw.close()
+
+    # - Structured array
+    n_rows = len(index)
+    data = np.empty(n_rows, dtype=[(name, dtype) for name, _, _, dtype in COMET_COLUMNS] + [
+        ("designation", f"U{max([1] + [len(p) for p in index])}"), ("reference", f"U{width}")])
+    for name in columns:
+        data[name] = columns[name][:n_rows]
+    # K1 = 2.5 * k (defined by JPL)
+    data["magnitude_k"] *= 2.5
+    data["designation"] = list(index)
+    data["reference"] = references[:n_rows]
+
+    # - Sort: numbered, unnumbered, then interstellar
+    if n_rows > 0:
+        data = data[catalogOrder(data["designation"])]
+
+    return Table(data, copy=False)
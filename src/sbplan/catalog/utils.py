@@ -1,10 +1,64 @@
-import re
-
 # NumPy
 import numpy as np
 # AstroPy
 from astropy.time import Time
-from astropy.table import Table, vstack
+from astropy.table import Table
+
+
+def _numberPrefix(pdes, kind):
+    """
+    Whether designations start with a number followed by `kind` (e.g., "73P-B" 
+    for "P"), and the numbers (as strings, empty if not).
+    """
+
+    pdes = np.asarray(pdes, dtype=str)
+    rest = np.char.lstrip(pdes, "0123456789")
+    length = np.char.str_len(pdes) - np.char.str_len(rest)
+    is_numbered = (length > 0) & np.char.startswith(rest, kind)
+    number = np.where(is_numbered, np.char.partition(pdes, kind)[..., 0], "")
+
+    return is_numbered, number
+
+
+def primaryDesignation(designation):
+    """
+    Primary designations (defined by JPL) of MPC designations, e.g., "73P-B" 
+    for "73P-B/Schwassmann-Wachmann" and "2023 A3" for "C/2023 A3 (Tsuchinshan-ATLAS)".
+    """
+
+    designation = np.asarray(designation, dtype=str)
+    head, slash, tail = np.moveaxis(np.char.partition(designation, "/"), -1, 0)
+    if not np.all(slash == "/"):
+        raise ValueError("Invalid designation(s) in `catalog`.")
+    is_periodic = _numberPrefix(head, "P")[0] | _numberPrefix(head, "I")[0]
+    provisional = np.char.partition(
+        np.char.partition(tail, "/")[..., 0], " (")[..., 0]
+    pdes = np.where(is_periodic, head, provisional)
+    width = int(np.char.str_len(pdes).max(initial=0))
+
+    return pdes.astype(f"U{max(width, 1)}")
+
+
+def catalogOrder(pdes):
+    """
+    Order of (unique) primary designations in a catalog: numbered comets, 
+    unnumbered comets, then interstellar objects. Numbered and interstellar 
+    objects are sorted by their zero-padded designations (e.g., "00000073P-B"), 
+    unnumbered comets by their designations.
+    """
+
+    pdes = np.asarray(pdes, dtype=str)
+    is_numbered, number_p = _numberPrefix(pdes, "P")
+    is_interstellar, number_i = _numberPrefix(pdes, "I")
+    is_interstellar &= ~is_numbered
+    is_prefixed = is_numbered | is_interstellar
+    # (number, rest) sorts as the zero-padded designations
+    number = np.where(is_numbered, number_p, np.where(is_interstellar, number_i, "0"))
+    number = number.astype(np.int64)
+    rest = np.where(is_prefixed, np.char.lstrip(pdes, "0123456789"), "")
+    group = np.where(is_numbered, 0, np.where(is_interstellar, 2, 1))
+
+    return np.lexsort((pdes, rest, number, group))
 
 
 def toSkyfieldFormat(catalog, database):
@@ -19,84 +73,59 @@ def toSkyfieldFormat(catalog, database):
         # Add perihelion year, perihelion month, and perihelion day
         # !!! Note the conversion from TDB to TT !!!
         perihelion_time = Time(catalog["tp"].data, scale="tdb", format="jd").tt.ymdhms
-        catalog["perihelion_year"]  = np.array([time[0] for time in perihelion_time])
-        catalog["perihelion_month"] = np.array([time[1] for time in perihelion_time])
-        catalog["perihelion_day"]   = np.array(
-            [((time[5] / 60 + time[4]) / 60 + time[3]) / 24 + time[2] for time in perihelion_time]
-        )
+        catalog["perihelion_year"]  = np.asarray(perihelion_time["year"])
+        catalog["perihelion_month"] = np.asarray(perihelion_time["month"])
+        catalog["perihelion_day"]   = (
+            (perihelion_time["second"] / 60 + perihelion_time["minute"]) / 60 
+            + perihelion_time["hour"]
+        ) / 24 + perihelion_time["day"]
 
         # Delete perihelion time
         del catalog["tp"]
 
-        # Rename columns
+        # Rename columns (H, G of asteroids instead of M1, K1 of comets)
+        magnitudes = ["H", "G"] if "H" in catalog.colnames else ["M1", "K1"]
+        magnitude_names = (
+            ["magnitude_H", "magnitude_G"] if "H" in catalog.colnames 
+            else ["magnitude_g", "magnitude_k"]
+        )
         catalog.rename_columns(
             names=[
-                "pdes", "q", "e", "w", "om", "i", "M1", "K1", "orbit_id"
+                "pdes", "q", "e", "w", "om", "i", *magnitudes, "orbit_id"
             ], 
             new_names=[
                 "designation", "perihelion_distance_au", "eccentricity", 
                 "argument_of_perihelion_degrees", "longitude_of_ascending_node_degrees", 
-                "inclination_degrees", "magnitude_g", "magnitude_k", "reference"
+                "inclination_degrees", *magnitude_names, "reference"
             ]
         )
 
         # Reorder columns
-        catalog = catalog[
+        catalog = catalog[[
             "designation", "perihelion_year",  "perihelion_month",  "perihelion_day",  
             "perihelion_distance_au",  "eccentricity",  
             "argument_of_perihelion_degrees",  "longitude_of_ascending_node_degrees",  
-            "inclination_degrees",  "magnitude_g",  "magnitude_k",  "reference"
-        ]
+            "inclination_degrees",  *magnitude_names,  "reference"
+        ]]
 
     elif database == "mpc":
 
         # - Columns
         # 1. designation -> primary designation (defined by JPL)
-        pdes_list = list()
-        for designation in catalog["designation"].data:
-            if re.search("^\d+[PI]", designation.split("/")[0]):
-                pdes_list.append(designation.split("/")[0])
-            else:
-                pdes_list.append(designation.split("/")[1].split(" (")[0])
-        catalog["designation"] = pdes_list
+        pdes = primaryDesignation(catalog["designation"].data)
+        catalog["designation"] = pdes if pdes.size else pdes.tolist()
         # 2. K1 = 2.5 * k (defined by JPL)
         catalog["magnitude_k"] *= 2.5
 
-        # - Remove duplicate (keep only the most recent orbit for each comet)
-        catalog.sort("designation")
-        catalog = catalog.group_by(["designation"])
-        catalog = catalog[catalog.groups.indices[1:] - 1]
-
-        # - Sort
-        # 1. Split into numbered, unnumbered, and interstellar catalogs
-        idx_list_numbered = list()
-        idx_list_unnumbered = list()
-        idx_list_interstellar = list()
-        for i, pdes in enumerate(catalog["designation"].data):
-            if re.search("^\d+P", pdes):
-                idx_list_numbered.append(i)
-            elif re.search("^\d+I", pdes):
-                idx_list_interstellar.append(i)
-            else:
-                idx_list_unnumbered.append(i)
-        catalog_numbered = catalog[idx_list_numbered]
-        catalog_unnumbered = catalog[idx_list_unnumbered]
-        catalog_interstellar = catalog[idx_list_interstellar]
-        # 2. Sort numbered and interstellar catalogs (unnumbered catalog is already sorted)
-        pdes_list = list()
-        for pdes in catalog_numbered["designation"].data:
-            number = re.search("^\d+", pdes).group()
-            pdes_list.append(pdes.replace(number, f"{int(number):08d}"))
-            idx_list_sorted = sorted(range(len(pdes_list)), key=pdes_list.__getitem__)
-        catalog_numbered = catalog_numbered[idx_list_sorted]
-        pdes_list = list()
-        for pdes in catalog_interstellar["designation"].data:
-            number = re.search("^\d+", pdes).group()
-            pdes_list.append(pdes.replace(number, f"{int(number):08d}"))
-        idx_list_sorted = sorted(range(len(pdes_list)), key=pdes_list.__getitem__)
-        catalog_interstellar = catalog_interstellar[idx_list_sorted]
-        # 3. Concatenate
-        catalog = vstack([catalog_numbered, catalog_unnumbered, catalog_interstellar])
+        # - Remove duplicate (keep only the most recent orbit, i.e., the last 
+        #   row, of each comet)
+        idx_sorted = np.argsort(pdes, kind="stable")
+        is_last = np.ones(idx_sorted.shape[0], dtype=bool)
+        is_last[:-1] = pdes[idx_sorted[1:]] != pdes[idx_sorted[:-1]]
+        idx_sorted = idx_sorted[is_last]
+
+        # - Sort: numbered, unnumbered, then interstellar
+        catalog = catalog[idx_sorted[catalogOrder(pdes[idx_sorted])]]
 
     else:
         raise ValueError("One of the two databases, `mpc` and `jpl`, is required.")
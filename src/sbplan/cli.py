@@ -0,0 +1,351 @@
+"""
+Command-line entry point (`sbplan`).
+
+    $ sbplan catalog update --type obs
+    $ sbplan catalog changes --type obs --since 3
+    $ sbplan observatories refresh --source ObsCodes.html
+    $ sbplan ephem --site 327 --start 2024-01-01 --stop 2024-01-02 --step 10m \\
+    >     --params EL,Tmag --out run.npz
+    $ sbplan batch jobs.json
+
+Only the standard library is imported at start-up: `sbplan --help` and the
+catalog metadata commands do not pay for `skyfield`, `astroquery` or the
+`astropy` tables, which are imported by the commands that need them.
+
+A batch file is a JSON document holding a list of jobs (or {"defaults": {...},
+"jobs": [...]}). Each job names a "command" (e.g., "catalog update" or
+"ephem") and its options, with the same names as on the command line:
+
+    {
+        "defaults": {"site": "327", "params": ["EL", "Tmag"]},
+        "jobs": [
+            {"command": "catalog update", "type": ["obs"]},
+            {"command": "ephem", "start": "2024-01-01", "stop": "2024-01-02",
+             "step": "10m", "out": "run.npz"}
+        ]
+    }
+"""
+
+import sys, json, argparse
+
+__all__ = ["main"]
+
+# Defaults of the batch jobs only apply to the options of the job's command
+_COMMANDS = {
+    "catalog update": ("type", "workers", "full", "verbose"),
+    "catalog changes": ("type", "since"),
+    "observatories refresh": ("source", ),
+    "ephem": ("site", "start", "stop", "step", "params", "accuracy", "catalog", "designation",
+              "chunk_size", "dtype", "out"),
+}
+
+
+def _splitList(values):
+    """
+    Flatten comma-separated values (e.g., "EL,Tmag" or ["EL", "Tmag"]).
+    """
+
+    return [value for item in values for value in item.split(",") if value]
+
+
+def _siteLocation(site, lib_dir):
+    """
+    Site from an IAU code or "lon,lat[,height]" [deg, deg, m].
+    """
+
+    if "," not in site:
+        from .ephemerides.utils import siteLocation
+        return siteLocation(site, lib_dir=lib_dir)
+
+    # AstroPy
+    import astropy.units as u
+    from astropy.coordinates import EarthLocation
+
+    try:
+        values = [float(value) for value in site.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid site `{site}` (IAU code or lon,lat[,height]).")
+    if len(values) not in (2, 3):
+        raise ValueError(f"Invalid site `{site}` (IAU code or lon,lat[,height]).")
+
+    return EarthLocation.from_geodetic(
+        values[0] * u.deg, values[1] * u.deg, (values[2] if len(values) == 3 else 0) * u.m)
+
+
+def _writeLong(out, results):
+    """
+    Write chunks of columnar ephemerides in long format (one row per epoch
+    and comet). Text output is streamed chunk by chunk; other formats (e.g.,
+    ".ecsv", ".fits" or ".h5") are written at once by `Table.write`.
+    """
+
+    # NumPy
+    import numpy as np
+    # AstroPy
+    from astropy.table import Table, vstack
+
+    tables, f = list(), None
+    streamed = (out is None) or out.endswith(".csv")
+    try:
+        for time_tag, ephemerides in results:
+            n_comets, n_times = ephemerides.shape
+            table = Table(
+                [np.repeat(time_tag.reshape(-1).utc.isot, n_comets),
+                 np.tile(np.asarray(ephemerides.designation).astype(str), n_times)],
+                names=["time", "designation"])
+            for param in ephemerides.params:
+                table[param] = ephemerides[param].T.reshape(-1)
+                table[param].unit = ephemerides.units[param]
+
+            if not streamed:
+                tables.append(table)
+            elif f is None:
+                f = sys.stdout if out is None else open(out, "w")
+                table.write(f, format="ascii.csv")
+            else:
+                # Only the first chunk carries the header
+                table.write(f, format="ascii.no_header", delimiter=",")
+    finally:
+        if (f is not None) and (f is not sys.stdout):
+            f.close()
+
+    if not streamed:
+        if not tables:
+            raise ValueError("No ephemerides to write.")
+        kwargs = {"path": "ephemerides"} if out.endswith((".h5", ".hdf5")) else dict()
+        vstack(tables, metadata_conflicts="silent").write(out, overwrite=True, **kwargs)
+
+
+def _catalogUpdate(args):
+
+    from .catalog import CometCatalog
+
+    CometCatalog.update(
+        cat_type=args.type or CometCatalog.CATALOG_TYPE, verbose=args.verbose,
+        incremental=not args.full, workers=args.workers)
+
+
+def _catalogChanges(args):
+
+    # Metadata only (no `astroquery`)
+    from .catalog import conf
+    from .catalog.cache import catalogPaths, catalogChanges, readMeta
+
+    if args.type not in conf.catalog_type:
+        raise ValueError(f"Unknown catalog type `{args.type}`.")
+
+    changes = catalogChanges(
+        readMeta(catalogPaths(conf.catalog_dir, args.type)["json"]), since=args.since)
+    json.dump(changes, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _observatoriesRefresh(args):
+
+    from .ephemerides import CometEphemerides
+    from .ephemerides.observatories import refreshObservatories
+
+    n_codes = refreshObservatories(source=args.source, lib_dir=CometEphemerides.LIB_DIR)
+    print(f"{n_codes} observatory codes", file=sys.stderr)
+
+
+def _ephem(args):
+
+    # NumPy
+    import numpy as np
+
+    from .catalog import CometCatalog, DesignationIndex
+    from .catalog.utils import toSkyfieldFormat
+    from .ephemerides import CometEphemerides, TimeGrid
+
+    location = _siteLocation(args.site, CometEphemerides.LIB_DIR)
+    time_grid = TimeGrid(args.start, args.stop, args.step)
+    catalog = toSkyfieldFormat(CometCatalog.get(args.catalog), "jpl")
+    if args.designation:
+        catalog = DesignationIndex(catalog).select(_splitList(args.designation))
+
+    ephemerides = CometEphemerides(location=location)
+    params = _splitList(args.params)
+    kwargs = {"accuracy": args.accuracy, "dtype": np.dtype(args.dtype).type}
+
+    if (args.out is not None) and args.out.endswith(".npz"):
+        shape = ephemerides.export(
+            args.out, catalog, params, time_grid=time_grid, chunk_size=args.chunk_size,
+            **kwargs)
+        print(f"{args.out}: {shape[0]} comets x {shape[1]} epochs x {shape[2]} parameters",
+              file=sys.stderr)
+    else:
+        _writeLong(args.out, ephemerides.iter_get(
+            catalog, params, time_grid=time_grid, chunk_size=args.chunk_size, columnar=True,
+            **kwargs))
+
+
+def _jobArgv(job, defaults):
+    """
+    Command line of a batch job.
+    """
+
+    job = dict(job)
+    command = job.pop("command", None)
+    if command not in _COMMANDS:
+        raise ValueError(
+            f"Unknown command `{command}` (one of: {', '.join(sorted(_COMMANDS))}).")
+
+    options = {key: value for key, value in defaults.items() if key in _COMMANDS[command]}
+    options.update(job)
+
+    argv = command.split()
+    for key, value in options.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif (value is False) or (value is None):
+            continue
+        elif isinstance(value, (list, tuple)):
+            argv += [flag] + [str(item) for item in value]
+        else:
+            argv += [flag, str(value)]
+
+    return argv
+
+
+def _batch(args):
+
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    if isinstance(config, list):
+        config = {"jobs": config}
+
+    defaults = config.get("defaults", dict())
+    failed = 0
+    for k, job in enumerate(config.get("jobs", list())):
+        try:
+            argv = _jobArgv(job, defaults)
+            print(f"[{k + 1}] sbplan {' '.join(argv)}", file=sys.stderr)
+            _run(_parser().parse_args(argv))
+        except (Exception, SystemExit) as e:
+            # `SystemExit` of argparse for invalid options
+            failed += 1
+            print(f"[{k + 1}] failed: {'invalid options' if isinstance(e, SystemExit) else e}", 
+                  file=sys.stderr)
+            if not args.keep_going:
+                return 1
+
+    return 1 if failed else 0
+
+
+def _parser():
+
+    parser = argparse.ArgumentParser(
+        prog="sbplan", description="A tool for scheduling observation of small bodies.")
+    parser.add_argument(
+        "--profile", action="store_true", help="print the stage timings to stderr")
+    parser.add_argument(
+        "--version", action="store_true", help="print the version and exit")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    # - Catalog
+    catalog = commands.add_parser("catalog", help="comet catalogs")
+    catalog_commands = catalog.add_subparsers(dest="catalog_command", metavar="command")
+    catalog_commands.required = True
+
+    update = catalog_commands.add_parser("update", help="download the catalogs from JPL")
+    update.add_argument("--type", nargs="+", help="catalog types (default: all types)")
+    update.add_argument("--workers", type=int, help="concurrent downloads")
+    update.add_argument(
+        "--full", action="store_true", help="rewrite the catalogs instead of patching them")
+    update.add_argument("--verbose", action="store_true")
+    update.set_defaults(func=_catalogUpdate)
+
+    changes = catalog_commands.add_parser(
+        "changes", help="designations changed after a revision (JSON)")
+    changes.add_argument("--type", default="obs", help="catalog type (default: obs)")
+    changes.add_argument("--since", type=int, default=0, help="revision (default: 0)")
+    changes.set_defaults(func=_catalogChanges)
+
+    # - Observatories
+    observatories = commands.add_parser("observatories", help="MPC observatory codes")
+    observatories_commands = observatories.add_subparsers(
+        dest="observatories_command", metavar="command")
+    observatories_commands.required = True
+
+    refresh = observatories_commands.add_parser(
+        "refresh", help="rebuild the list of observatory codes (the only command "
+                        "downloading it)")
+    refresh.add_argument(
+        "--source", help="local copy of ObsCodes.html, plain text or obscodes_extended.json "
+                         "(default: download from the MPC)")
+    refresh.set_defaults(func=_observatoriesRefresh)
+
+    # - Ephemerides
+    ephem = commands.add_parser("ephem", help="ephemerides over a time grid")
+    ephem.add_argument(
+        "--site", required=True, help="IAU observatory code or lon,lat[,height] [deg, m]")
+    ephem.add_argument("--start", required=True, help="first epoch (UTC)")
+    ephem.add_argument("--stop", required=True, help="last epoch (UTC)")
+    ephem.add_argument("--step", required=True, help="step (e.g., 10m, 1h or 1d6h)")
+    ephem.add_argument(
+        "--params", nargs="+", default=["RA", "DEC", "EL", "Tmag"],
+        help="parameters, e.g., EL,Tmag (default: RA,DEC,EL,Tmag)")
+    ephem.add_argument(
+        "--accuracy", default="apparent", choices=["apparent", "astrometric", "fast"])
+    ephem.add_argument("--catalog", default="obs", help="catalog type (default: obs)")
+    ephem.add_argument("--designation", nargs="+", help="designations (default: all comets)")
+    ephem.add_argument("--chunk-size", type=int, help="epochs per chunk")
+    ephem.add_argument("--dtype", default="float64", choices=["float64", "float32"])
+    ephem.add_argument(
+        "--out", help="output file: .npz (binary run, see `EphemerisRun`), .csv or any "
+                      "`Table.write` format (default: CSV to stdout)")
+    ephem.set_defaults(func=_ephem)
+
+    # - Batch
+    batch = commands.add_parser("batch", help="run the jobs of a JSON file")
+    batch.add_argument("config", help="JSON file of jobs")
+    batch.add_argument(
+        "--keep-going", action="store_true", help="run the remaining jobs after a failure")
+    batch.set_defaults(func=_batch)
+
+    return parser
+
+
+def _run(args):
+
+    return args.func(args) or 0
+
+
+def main(argv=None):
+    """
+    Run the `sbplan` command line.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Arguments (default: `sys.argv[1:]`).
+
+    Returns
+    -------
+    status : int
+        Exit status.
+    """
+
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.version:
+        from . import __version__
+        print(__version__)
+        return 0
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    if args.profile:
+        from . import profiling
+        profiling.enable()
+        profiling.addHook(lambda stats: print(stats, file=sys.stderr))
+
+    try:
+        return _run(args)
+    except (ValueError, TypeError, LookupError, OSError) as e:
+        print(f"sbplan: error: {e}", file=sys.stderr)
+        return 1
@@ -6,13 +6,12 @@ Ephemerides
 """
 
 import os
+import importlib as _importlib
 
 # AstroPy
-from astropy.config as _config
+import astropy.config as _config
 
-from .core import CometEphemerides, CometEphemeridesClass
-
-__all__ = ['CometEphemerides', 'CometEphemeridesClass', 'conf']
+__all__ = ['CometEphemerides', 'CometEphemeridesClass', 'ColumnarEphemerides', 'SiteEphemerides', 'TimeGrid', 'EphemerisCache', 'SkyIndex', 'EphemerisRun', 'preload', 'close', 'conf']
 
 
 class Conf(_config.ConfigNamespace):
@@ -42,6 +41,43 @@ class Conf(_config.ConfigNamespace):
         )
     )
 
+    accuracy = _config.ConfigItem(
+        ['apparent', 'astrometric', 'fast'], 
+        cfgtype='list', 
+        description=(
+            'Accuracy tiers of the ephemerides.'
+        )
+    )
+
+    observer_cache_size = _config.ConfigItem(
+        8, cfgtype='integer', 
+        description=(
+            'Maximum number of observer states (time grid and site) kept in memory.'
+        )
+    )
+
+    chunk_memory = _config.ConfigItem(
+        256, cfgtype='integer', 
+        description=(
+            'Peak memory [MB] of a chunk of `CometEphemeridesClass.iter_get`.'
+        )
+    )
+
+    cache_dir = _config.ConfigItem(
+        '', cfgtype='string', 
+        description=(
+            'Path to the directory of the ephemeris cache (default: `cache` in the '
+            'directory of library).'
+        )
+    )
+
+    cache_size = _config.ConfigItem(
+        1024, cfgtype='integer', 
+        description=(
+            'Size budget [MB] of the ephemeris cache.'
+        )
+    )
+
     # timeout = _config.ConfigItem(
     #     60, cfgtype='integer', 
     #     descroption=(
@@ -52,4 +88,28 @@ class Conf(_config.ConfigNamespace):
 
 conf = Conf()
 
+# Heavy dependencies (skyfield, astropy tables) are imported on first use
+_LAZY = {
+    'CometEphemerides': 'core', 'CometEphemeridesClass': 'core', 
+    'ColumnarEphemerides': 'result', 'SiteEphemerides': 'result', 'TimeGrid': 'timegrid', 
+    'EphemerisCache': 'cache', 'SkyIndex': 'index', 'EphemerisRun': 'archive', 
+    'preload': 'kernels', 'close': 'kernels', 
+}
+
+
+def __getattr__(name):
+
+    if name in _LAZY:
+        value = getattr(_importlib.import_module(f'.{_LAZY[name]}', __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(_LAZY))
+
+
 del _config
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Binary export of ephemeris runs.
+
+A run is stored in a single uncompressed `.npz` file (readable by `numpy.load`):
+
+- "values.npy": parameters, shape (n_comets, n_times, n_params). The chunks of
+  epochs yielded by `CometEphemeridesClass.iter_get` are spooled to a
+  temporary file, then gathered comet by comet: writing a run needs free space
+  for twice its size in the directory of the file.
+- "designation.npy", "jd1.npy", "jd2.npy": designations and time grid (TT).
+- "meta.json": parameters, units, storage type, site, accuracy and catalog
+  version.
+
+As the members are stored uncompressed, `EphemerisRun` memory-maps
+"values.npy" in place and nothing is loaded when a run is opened. The
+ephemerides of a comet are contiguous, so reading one comet reads
+n_times x n_params values; an epoch or a parameter is a strided slice.
+"""
+
+import os, io, json, struct, zipfile, tempfile
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import Time
+from astropy.table import Table
+from astropy.coordinates import EarthLocation
+
+from ..files import atomicWrite
+
+__all__ = ["EphemerisRun", "writeRun"]
+
+# Version of the layout
+FORMAT_VERSION = 2
+
+# Size [bytes] of the blocks gathered from the spooled chunks
+BLOCK_SIZE = 2**24
+
+
+def _writeArray(archive, name, array):
+
+    with archive.open(name, mode="w", force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _writeValues(archive, shape, dtype):
+    """
+    Open "values.npy" and write its header.
+    """
+
+    member = archive.open("values.npy", mode="w", force_zip64=True)
+    np.lib.format.write_array_header_2_0(
+        member, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                 "fortran_order": False, "shape": shape})
+
+    return member
+
+
+def writeRun(path, results, n_times=None, catalog_version=None, location=None, accuracy=None):
+    """
+    Write a run from chunks of ephemerides.
+
+    The chunks are spooled to a temporary file next to `path` as they come,
+    then the ephemerides of each comet are gathered from all chunks (blocks of
+    comets of up to `BLOCK_SIZE` bytes) and written in one piece. The whole run
+    is spooled before it is gathered, so twice its size is needed on disk
+    while it is written.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file (".npz").
+    results : iterable
+        (time_tag, `ColumnarEphemerides`) chunks in time order, all holding
+        the same comets and parameters (e.g., `CometEphemeridesClass.iter_get`
+        with `columnar=True`).
+    n_times : int, optional
+        Length of the time grid (checked against the chunks if given).
+    catalog_version : str or int, optional
+        Version of the catalog.
+    location : astropy.coordinates.earth.EarthLocation, optional
+        Site location.
+    accuracy : str, optional
+        Accuracy tier.
+
+    Returns
+    -------
+    shape : tuple
+        (n_comets, n_times, n_params) of the run.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    shape = list()
+
+    def write(f):
+        with zipfile.ZipFile(f, mode="w", compression=zipfile.ZIP_STORED) as archive, \
+             tempfile.TemporaryFile(dir=directory) as spool:
+            shape.extend(_writeChunks(
+                archive, spool, results, n_times, {
+                    "catalog_version": catalog_version, "accuracy": accuracy,
+                    "location": None if location is None else [
+                        value.to_value(u.m) for value in location.geocentric],
+                }))
+
+    atomicWrite(path, write, mode="wb")
+
+    return tuple(shape)
+
+
+def _writeChunks(archive, spool, results, n_times, meta):
+    """
+    Spool the chunks of a run, then write its members (see `writeRun`).
+    """
+
+    designation, params, units, dtype = None, None, None, None
+    jd1, jd2, chunks = list(), list(), list()
+
+    # 1. Spool the chunks, each (n_comets, chunk_times, n_params)
+    for time_tag, ephemerides in results:
+        if designation is None:
+            designation, params = ephemerides.designation, ephemerides.params
+            units = {param: str(ephemerides.units[param]) for param in params}
+            dtype = np.dtype(ephemerides.dtype)
+        elif (not np.array_equal(ephemerides.designation, designation)) or (
+                ephemerides.params != params):
+            raise ValueError(
+                "All chunks must hold the same comets and parameters "
+                "(constraints are not supported).")
+        tt = time_tag.reshape(-1).tt
+        jd1.append(tt.jd1)
+        jd2.append(tt.jd2)
+        chunks.append((spool.tell(), tt.shape[0]))
+        block = np.stack([ephemerides[param] for param in params], axis=-1)
+        spool.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
+
+    if designation is None:
+        raise ValueError("No ephemerides to write.")
+    count = sum(length for _, length in chunks)
+    if (n_times is not None) and (count != n_times):
+        raise ValueError(f"{count} epochs written, {n_times} expected.")
+
+    # 2. Gather them comet by comet
+    n_comets, n_params = designation.shape[0], len(params)
+    shape = (n_comets, count, n_params)
+    member = _writeValues(archive, shape, dtype)
+    step = max(BLOCK_SIZE // max(count * n_params * dtype.itemsize, 1), 1)
+    for start in range(0, n_comets, step):
+        stop = min(start + step, n_comets)
+        block = list()
+        for offset, length in chunks:
+            # The rows of comets `start:stop` are contiguous in a chunk
+            row_size = length * n_params * dtype.itemsize
+            spool.seek(offset + start * row_size)
+            block.append(np.frombuffer(
+                spool.read((stop - start) * row_size), dtype=dtype).reshape(
+                    stop - start, length, n_params))
+        member.write(np.concatenate(block, axis=1).tobytes())
+    member.close()
+
+    _writeArray(archive, "designation.npy", np.asarray(designation).astype(str))
+    _writeArray(archive, "jd1.npy", np.concatenate(jd1))
+    _writeArray(archive, "jd2.npy", np.concatenate(jd2))
+
+    archive.writestr("meta.json", json.dumps(dict(
+        meta, format_version=FORMAT_VERSION, params=params, units=units, dtype=dtype.str)))
+
+    return shape
+
+
+class EphemerisRun(object):
+    """
+    Memory-mapped ephemeris run (see `writeRun`).
+
+        >>> run = EphemerisRun("run.npz")
+        >>> run["EL"]          # (n_comets, n_times) view, nothing is read
+        >>> run.comet("1P")    # table of a comet (contiguous read)
+        >>> run.epoch(100)     # table of all comets at an epoch (strided read)
+    """
+
+
+    def __init__(self, path):
+        """
+        Open a run.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+        """
+
+        super(EphemerisRun, self).__init__()
+
+        self.path = path
+        with zipfile.ZipFile(path, mode="r") as archive:
+            self.meta = json.loads(archive.read("meta.json"))
+            if self.meta.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported format version of {path}.")
+            self.designation = self._readArray(archive, "designation.npy")
+            jd1 = self._readArray(archive, "jd1.npy")
+            jd2 = self._readArray(archive, "jd2.npy")
+            offset, shape, dtype = self._memberOffset(archive, "values.npy")
+
+        self.time_tag = Time(jd1, jd2, format="jd", scale="tt")
+        self.params = list(self.meta["params"])
+        self.units = {param: u.Unit(unit) for param, unit in self.meta["units"].items()}
+        # (n_comets, n_times, n_params)
+        self.values = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        self._index = {pdes: k for k, pdes in enumerate(self.designation)}
+        self._columns = {param: k for k, param in enumerate(self.params)}
+
+
+    @staticmethod
+    def _readArray(archive, name):
+
+        with archive.open(name) as f:
+            return np.lib.format.read_array(io.BytesIO(f.read()), allow_pickle=False)
+
+
+    @staticmethod
+    def _memberOffset(archive, name):
+        """
+        Offset of the data of an uncompressed `.npy` member, its shape and type.
+        """
+
+        info = archive.getinfo(name)
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"{name} is compressed and cannot be memory-mapped.")
+
+        # Local file header: the name and extra field lengths are at bytes 26-29
+        archive.fp.seek(info.header_offset)
+        header = archive.fp.read(30)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        start = info.header_offset + 30 + name_length + extra_length
+
+        with archive.open(name) as f:
+            if np.lib.format.read_magic(f) == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            header_length = f.tell()
+        if fortran_order:
+            raise ValueError(f"{name} is not in C order.")
+
+        return start + header_length, shape, dtype
+
+
+    def __len__(self):
+
+        return self.designation.shape[0]
+
+
+    def __contains__(self, pdes):
+
+        return pdes in self._index
+
+
+    def __getitem__(self, param):
+        """
+        Array of a parameter, shape (n_comets, n_times) (memory-mapped view).
+        """
+
+        return self.values[:, :, self._columns[param]]
+
+
+    @property
+    def shape(self):
+        """
+        (n_comets, n_times, n_params) of the run.
+        """
+
+        return self.values.shape
+
+
+    @property
+    def location(self):
+
+        if self.meta["location"] is None:
+            return None
+
+        return EarthLocation.from_geocentric(*self.meta["location"], unit=u.m)
+
+
+    def _table(self, values, names=None):
+
+        table = Table(
+            [values[..., k] for k in range(len(self.params))], names=self.params, copy=False)
+        for param in self.params:
+            table[param].unit = self.units[param]
+
+        return table
+
+
+    def comet(self, pdes, times=slice(None)):
+        """
+        Ephemerides of a comet as a table (one row per epoch).
+        """
+
+        return self._table(np.asarray(self.values[self._index[pdes], times]))
+
+
+    def epoch(self, k):
+        """
+        Ephemerides of all comets at an epoch as a table (one row per comet).
+        """
+
+        table = self._table(np.asarray(self.values[:, k]))
+        table.add_column(self.designation, name="designation", index=0)
+
+        return table
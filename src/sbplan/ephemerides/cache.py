@@ -0,0 +1,272 @@
+"""
+Persistent on-disk cache of ephemeris results.
+
+Results are grouped by run (time grid, site, parameters, accuracy, storage
+type and planetary kernel): each run is one uncompressed `.npz` bundle under
+the cache directory holding, for every cached comet, a key hashed from its
+orbit (all columns of the catalog row, `reference`/`orbit_id` included) and
+its parameters. A rerun with a few changed orbits only computes the comets
+whose keys are missing, and replaces their stale rows in the bundle.
+
+Bundles are written atomically (temporary file, then rename), so readers in
+other processes never see a partial file; concurrent writers of the same run
+may drop each other's new rows, which are then recomputed on the next run.
+The modification time of a bundle is its last use: bundles are evicted least
+recently used first when the cache exceeds its size budget.
+"""
+
+import os, hashlib, zipfile
+
+# NumPy
+import numpy as np
+
+from . import conf
+from ..files import atomicWrite
+
+__all__ = ["EphemerisCache"]
+
+# Version of the bundle layout (part of every run key)
+FORMAT_VERSION = 1
+
+
+def _digest(*chunks):
+
+    digest = hashlib.sha1()
+    for chunk in chunks:
+        digest.update(chunk if isinstance(chunk, bytes) else str(chunk).encode())
+        digest.update(b"\x1f")
+
+    return digest.hexdigest()
+
+
+class EphemerisCache(object):
+    """
+    On-disk cache of ephemerides keyed per comet and run.
+    """
+
+
+    def __init__(self, cache_dir=None, max_size=None):
+        """
+        Initialize an ephemeris cache.
+
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Path to the cache directory. Defaults to `conf.cache_dir`, or
+            `cache` in the directory of library.
+        max_size : float, optional
+            Size budget [MB]. Defaults to `conf.cache_size`.
+        """
+
+        super(EphemerisCache, self).__init__()
+
+        if cache_dir is None:
+            cache_dir = conf.cache_dir or os.path.join(conf.lib_dir, "cache")
+        self.cache_dir = cache_dir
+        self.max_size = conf.cache_size if max_size is None else max_size
+
+
+    @staticmethod
+    def cometKeys(catalog):
+        """
+        Keys of the comets of a catalog (hashed from all columns of each row).
+        """
+
+        numeric, strings = list(), list()
+        for name in catalog.colnames:
+            column = catalog[name]
+            if column.dtype.kind in "iufb":
+                numeric.append(np.ma.filled(np.ma.asarray(column).astype(float), np.nan))
+            else:
+                strings.append(np.asarray(column).astype(str))
+        numeric = np.ascontiguousarray(np.stack(numeric, axis=1)) if numeric else None
+
+        keys = list()
+        for k in range(len(catalog)):
+            keys.append(_digest(
+                *(string[k] for string in strings),
+                numeric[k].tobytes() if numeric is not None else b""))
+
+        return np.array(keys, dtype="U40")
+
+
+    @staticmethod
+    def runKey(t, location, params, accuracy, dtype, kernel_path):
+        """
+        Key of a run.
+
+        Parameters
+        ----------
+        t : skyfield.timelib.Time
+            Time grid.
+        location : astropy.coordinates.earth.EarthLocation
+            Site location.
+        params : list
+            Parameters (in the order of the columns).
+        accuracy : str
+            Accuracy tier.
+        dtype : numpy.dtype
+            Storage type.
+        kernel_path : str
+            Path to the planetary kernel (its name and size are used).
+        """
+
+        whole, fraction = np.atleast_1d(t.whole), np.atleast_1d(t.tt_fraction)
+        xyz = np.array([value.to_value("m") for value in location.geocentric])
+        try:
+            kernel_size = os.path.getsize(kernel_path)
+        except OSError:
+            kernel_size = -1
+
+        return _digest(
+            FORMAT_VERSION, np.shape(t.tt), whole.astype(float).tobytes(),
+            fraction.astype(float).tobytes(), xyz.tobytes(), ",".join(params), accuracy,
+            np.dtype(dtype).str, os.path.basename(kernel_path), kernel_size)
+
+
+    def _path(self, run_key):
+
+        return os.path.join(self.cache_dir, f"{run_key}.npz")
+
+
+    def _read(self, run_key):
+        """
+        Bundle of a run (`None` if missing or unreadable).
+        """
+
+        path = self._path(run_key)
+        try:
+            with np.load(path, allow_pickle=False) as bundle:
+                bundle = {name: bundle[name] for name in bundle.files}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+        try:
+            # Mark as used (for eviction)
+            os.utime(path)
+        except OSError:
+            pass
+
+        return bundle
+
+
+    def lookup(self, run_key, keys):
+        """
+        Cached results of some comets.
+
+        Parameters
+        ----------
+        run_key : str
+            Key of the run.
+        keys : numpy.ndarray
+            Keys of the comets.
+
+        Returns
+        -------
+        hit : numpy.ndarray
+            Whether each comet is cached.
+        values : numpy.ndarray or None
+            Parameters of the cached comets, shape (n_params, n_hits, n_times).
+        """
+
+        bundle = self._read(run_key)
+        if (bundle is None) or (bundle["keys"].shape[0] == 0):
+            return np.zeros(keys.shape[0], dtype=bool), None
+
+        order = np.argsort(bundle["keys"])
+        sorted_keys = bundle["keys"][order]
+        rows = np.minimum(np.searchsorted(sorted_keys, keys), sorted_keys.shape[0] - 1)
+        hit = sorted_keys[rows] == keys
+
+        return hit, bundle["values"][:, order[rows[hit]]]
+
+
+    def store(self, run_key, keys, designation, values):
+        """
+        Add the results of some comets to a run.
+
+        Rows of the same designations with other keys (e.g., older orbits)
+        are replaced.
+
+        Parameters
+        ----------
+        run_key : str
+            Key of the run.
+        keys : numpy.ndarray
+            Keys of the comets.
+        designation : numpy.ndarray
+            Designations of the comets.
+        values : numpy.ndarray
+            Parameters of the comets, shape (n_params, n_comets, n_times).
+        """
+
+        bundle = self._read(run_key)
+        if bundle is not None:
+            keep = (
+                ~np.isin(bundle["keys"], keys) & ~np.isin(bundle["designation"], designation))
+            keys = np.concatenate([bundle["keys"][keep], keys])
+            designation = np.concatenate([bundle["designation"][keep], designation])
+            values = np.concatenate([bundle["values"][:, keep], values], axis=1)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomicWrite(self._path(run_key), lambda f: np.savez(
+            f, keys=np.asarray(keys, dtype="U40"),
+            designation=np.asarray(designation).astype(str), values=values), mode="wb")
+
+        self.evict()
+
+
+    def evict(self):
+        """
+        Remove the least recently used bundles until the cache fits its budget.
+        """
+
+        entries = list()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npz") or name.startswith(".tmp_"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self.max_size * 2**20:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            size -= entry_size
+
+
+    def size(self):
+        """
+        Size of the cache [MB].
+        """
+
+        if not os.path.isdir(self.cache_dir):
+            return 0.0
+
+        return sum(
+            os.path.getsize(os.path.join(self.cache_dir, name))
+            for name in os.listdir(self.cache_dir) if name.endswith(".npz")) / 2**20
+
+
+    def clear(self):
+        """
+        Remove all bundles.
+        """
+
+        if not os.path.isdir(self.cache_dir):
+            return None
+
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+        return None
@@ -0,0 +1,179 @@
+"""
+Cheap culling of comets before the full ephemeris computation.
+
+Constraints are pushed down through stages of increasing cost. Each stage
+only discards comets that provably cannot satisfy the constraints (up to
+the margins below), so the final result is the same as filtering the full
+ephemerides.
+
+1. "elements": lower bound of `Tmag` from q, M1 and K1, or H for asteroids
+   (r >= q and delta >= r - max(earth_to_sun)).
+2. "geometric": geometric positions at the epochs (no light-time,
+   deflection or aberration).
+3. "apparent": full ephemerides, exact constraints.
+"""
+
+# NumPy
+import numpy as np
+# skyfield
+from skyfield.functions import angle_between, length_of, to_spherical
+
+from .utils import magnitudeParameters
+
+__all__ = ["CONSTRAINTS", "constraintParams", "cullElements", "cullGeometric", "satisfies"]
+
+# Constraints and the parameters they need
+CONSTRAINTS = {
+    "max_Tmag": ["Tmag"],
+    "min_EL": ["EL"],
+    "min_elong": ["elong"],
+    "min_lunar_elong": ["lunar_elong"],
+    "region": ["RA", "DEC"],
+}
+
+# Margins of the coarse stages. Neglecting light-time, deflection and aberration
+# shifts positions by less than 0.03 deg and `Tmag` by less than 0.001 mag.
+ANGLE_MARGIN = 0.1 # [deg]
+MAG_MARGIN = 0.01  # [mag]
+
+
+def constraintParams(constraints):
+    """
+    Parameters needed to evaluate the constraints.
+    """
+
+    params = list()
+    for name in constraints:
+        for param in CONSTRAINTS[name]:
+            if param not in params:
+                params.append(param)
+
+    return params
+
+
+def _inRegion(RA, DEC, region, margin=0.0):
+    """
+    Whether (RA, DEC) [deg] is in a region (ra_min, ra_max, dec_min, dec_max) [deg].
+    RA ranges wrap around 360 deg if ra_min > ra_max.
+    """
+
+    ra_min, ra_max, dec_min, dec_max = region
+
+    in_dec = (DEC >= dec_min - margin) & (DEC <= dec_max + margin)
+
+    # RA margin grows towards the poles
+    margin_ra = margin / np.maximum(np.cos(np.radians(np.clip(np.abs(DEC), 0, 89.9))), 1e-3)
+    margin_ra = np.minimum(margin_ra, 180.0)
+    width = ra_max - ra_min if ra_max >= ra_min else ra_max - ra_min + 360.0
+    in_ra = ((RA - ra_min + margin_ra) % 360.0) <= width + 2 * margin_ra
+
+    return in_dec & in_ra
+
+
+def satisfies(columns, constraints, margin=0.0, mag_margin=0.0):
+    """
+    Epochs at which all constraints are satisfied.
+
+    Parameters
+    ----------
+    columns : dict
+        Parameters, each of shape (n_comets, n_times).
+    constraints : dict
+        Constraints.
+    margin, mag_margin : float, optional
+        Margins [deg] and [mag] added in favour of the comets.
+
+    Returns
+    -------
+    mask : numpy.ndarray
+        Boolean array of shape (n_comets, n_times).
+    """
+
+    mask = True
+    if "max_Tmag" in constraints:
+        mask = mask & (columns["Tmag"] <= constraints["max_Tmag"] + mag_margin)
+    if "min_EL" in constraints:
+        mask = mask & (columns["EL"] >= constraints["min_EL"] - margin)
+    if "min_elong" in constraints:
+        mask = mask & (columns["elong"] >= constraints["min_elong"] - margin)
+    if "min_lunar_elong" in constraints:
+        mask = mask & (columns["lunar_elong"] >= constraints["min_lunar_elong"] - margin)
+    if "region" in constraints:
+        mask = mask & _inRegion(columns["RA"], columns["DEC"], constraints["region"], margin)
+
+    return mask
+
+
+def _magnitudeBounds(catalog):
+    """
+    M1 and K1 bounding `Tmag` from below: those of comets, and M1 = H, K1 = 5
+    for asteroids (the phase term of the H, G system is not negative for
+    0 <= G <= 1).
+    """
+
+    magnitudes = magnitudeParameters(catalog)
+    n_rows = len(catalog)
+    M1 = magnitudes.get("M1", np.full(n_rows, np.nan))
+    K1 = magnitudes.get("K1", np.full(n_rows, np.nan))
+    if "H" in magnitudes:
+        asteroid = ~np.isfinite(M1) & np.isfinite(magnitudes["H"])
+        M1 = np.where(asteroid, magnitudes["H"], M1)
+        K1 = np.where(asteroid, 5.0, K1)
+
+    return M1, K1
+
+
+def cullElements(catalog, orbits, state, constraints):
+    """
+    Stage 1: discard comets from their orbital elements only.
+
+    Returns
+    -------
+    keep : numpy.ndarray
+        Boolean array of shape (n_comets,).
+    """
+
+    keep = np.ones(len(orbits), dtype=bool)
+
+    if "max_Tmag" in constraints:
+        M1, K1 = _magnitudeBounds(catalog)
+        # Lower bounds of r and delta (valid for K1 >= 0)
+        delta_min = orbits.q - np.max(state.earth_to_sun)
+        bound = M1 + K1 * np.log10(orbits.q)
+        bound += np.where(delta_min > 0, 5 * np.log10(np.where(delta_min > 0, delta_min, 1)), -np.inf)
+        keep &= ~(bound > constraints["max_Tmag"] + MAG_MARGIN) | (K1 < 0)
+        # `Tmag` cannot be computed without M1 and K1 (or H)
+        keep &= np.isfinite(M1) & np.isfinite(K1)
+
+    return keep
+
+
+def cullGeometric(catalog, orbits, state, constraints):
+    """
+    Stage 2: discard comets from their geometric positions at the epochs.
+
+    Returns
+    -------
+    keep : numpy.ndarray
+        Boolean array of shape (n_comets,).
+    """
+
+    helio = orbits.at(state.tt, tolerance=1e-10)
+    c = state.sun_position + helio - state.position
+
+    columns = dict()
+    if ("max_Tmag" in constraints) or ("region" in constraints):
+        Delta, DEC, RA = to_spherical(c)
+        columns["RA"], columns["DEC"] = np.degrees(RA), np.degrees(DEC)
+    if "max_Tmag" in constraints:
+        M1, K1 = _magnitudeBounds(catalog)
+        columns["Tmag"] = M1[:, None] + 5 * np.log10(Delta) + K1[:, None] * np.log10(length_of(helio))
+    if "min_EL" in constraints:
+        _, EL, _ = to_spherical(np.einsum("ij...,j...->i...", state.rotation, c))
+        columns["EL"] = np.degrees(EL)
+    if "min_elong" in constraints:
+        columns["elong"] = np.degrees(angle_between(c, state.sun_astrometric))
+    if "min_lunar_elong" in constraints:
+        columns["lunar_elong"] = np.degrees(angle_between(c, state.moon_astrometric))
+
+    return satisfies(columns, constraints, margin=ANGLE_MARGIN, mag_margin=MAG_MARGIN).any(axis=1)
@@ -0,0 +1,194 @@
+"""
+Extrema of the parameters (e.g., peak brightness, closest approach, perihelion
+or culmination) by bracketing and refinement.
+
+1. Bracketing: the parameter is evaluated for all comets at once on a coarse
+   grid. The smallest (or largest) value of each comet, or each of its local
+   extrema, brackets an extremum between the neighbouring epochs.
+2. Refinement: all brackets are narrowed at once (comet k at its own epoch,
+   see `ObserverState.diagonal`) by parabolic interpolation, falling back to
+   golden-section steps when the parabola is unreliable or converges slowly
+   (Brent's method), down to `tolerance`.
+
+Extrema narrower than the coarse step may be missed, and for angles the wrap
+at 360 deg (RA, AZ) is not handled.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+from astropy.time import TimeDelta
+from astropy.table import Table
+
+from .orbit import CometOrbits
+from .observer import ObserverState
+
+__all__ = ["EXTREMA", "findExtrema"]
+
+# Kinds of extrema and the sign turning them into minima
+EXTREMA = {"min": 1, "max": -1}
+
+# Golden-section ratio, (3 - sqrt(5)) / 2
+_GOLDEN = 0.3819660112501051
+# A parabolic step must shrink the bracket at least by this factor, otherwise
+# the next step is a golden-section step
+_SHRINK = 0.7
+# Refinement steps are capped (each one shrinks the bracket by 0.618 at worst)
+_MAX_ITER = 100
+
+
+def _values(ephemerides, catalog, state, params, accuracy):
+    """
+    Parameters of all comets at the epochs of a state.
+    """
+
+    return ephemerides._compute(
+        CometOrbits(catalog, ephemerides.ts), state, catalog=catalog, params=list(params),
+        accuracy=accuracy)
+
+
+def _brackets(g, local):
+    """
+    Brackets (row, epoch) of the minima of g, shape (n_comets, n_times).
+    """
+
+    if local:
+        # Interior minima only (ties counted once, on their last epoch)
+        is_min = (g[:, 1:-1] < g[:, :-2]) & (g[:, 1:-1] <= g[:, 2:]) | \
+                 (g[:, 1:-1] <= g[:, :-2]) & (g[:, 1:-1] < g[:, 2:])
+        is_min &= np.isfinite(g[:, 1:-1])
+        rows, cols = np.nonzero(is_min)
+        return rows, cols + 1
+
+    rows = np.nonzero(np.isfinite(g).any(axis=1))[0]
+
+    return rows, np.argmin(g[rows], axis=1)
+
+
+def _parabola(a, b, c, fa, fb, fc):
+    """
+    Vertex of the parabola through three points (NaN if they are aligned).
+    """
+
+    p = (b - a) * (fb - fc)
+    q = (b - c) * (fb - fa)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return b - 0.5 * ((b - a) * p - (b - c) * q) / (p - q)
+
+
+def findExtrema(ephemerides, catalog, param, kind="min", local=False, params=None,
+                tolerance=1.0, accuracy="apparent"):
+    """
+    Find the extrema of a parameter for all comets.
+
+    Parameters
+    ----------
+    ephemerides : sbplan.ephemerides.core.CometEphemeridesClass
+        Ephemerides instance at the coarse time grid (kernel and site already
+        set). It is not modified: the catalog, parameters and accuracy are passed
+        to each evaluation.
+    catalog : astropy.table.table.Table
+        Comet catalog.
+    param : str
+        Parameter.
+    kind : str, optional
+        "min" or "max" (see `EXTREMA`).
+    local : bool, optional
+        If `True`, find all local extrema inside the time grid (e.g., every
+        culmination); otherwise the extremum over the time grid, which may lie
+        at one of its ends.
+    params : list, optional
+        Other parameters to evaluate at the extrema.
+    tolerance : float, optional
+        Tolerance on the time of the extrema [s].
+    accuracy : str, optional
+        Accuracy tier (see `CometEphemeridesClass.get`).
+
+    Returns
+    -------
+    extrema : astropy.table.table.Table
+        One row per extremum: "designation", "time" (`Time`), `param`, the
+        other `params` and "edge" (`True` if the extremum is at an end of the
+        time grid). The number of evaluations (comet-epochs) is stored in
+        `extrema.meta["evaluations"]`.
+    """
+
+    ts, topos, kernel = ephemerides.ts, ephemerides.topos, ephemerides.DE421
+    sign = EXTREMA[kind]
+    params = [name for name in (params or list()) if name != param]
+    tolerance = tolerance / 86400
+
+    # - Bracketing
+    # Offsets [d] from the first epoch, in TT (whole and fraction kept apart)
+    t = ephemerides.t
+    whole, fraction = np.atleast_1d(t.whole), np.atleast_1d(t.tt_fraction)
+    offset = (whole - whole[0]) + (fraction - fraction[0])
+    n_times = offset.shape[0]
+
+    g = sign * _values(ephemerides, catalog, ephemerides.state, [param], accuracy)[param]
+    g = np.where(np.isnan(g), np.inf, g)
+    evaluations = g.size
+
+    rows, cols = _brackets(g, local)
+    left, right = np.maximum(cols - 1, 0), np.minimum(cols + 1, n_times - 1)
+    a, b, c = offset[left], offset[cols], offset[right]
+    fa, fb, fc = g[rows, left], g[rows, cols], g[rows, right]
+
+    # - Refinement
+    subset = catalog[rows]
+    width = np.full(rows.shape[0], np.inf)
+    for _ in range(_MAX_ITER):
+        active = np.nonzero((c - a) > 2 * tolerance)[0]
+        if active.shape[0] == 0:
+            break
+        ka, kb, kc = a[active], b[active], c[active]
+
+        # 1. Parabolic step, if it lands inside the bracket, away from b and
+        #    the previous step shrank the bracket enough
+        u = _parabola(ka, kb, kc, fa[active], fb[active], fc[active])
+        parabolic = np.isfinite(u) & (u > ka + tolerance) & (u < kc - tolerance) & \
+                    (np.abs(u - kb) >= tolerance) & ((kc - ka) <= _SHRINK * width[active])
+        # 2. Golden-section step into the larger segment otherwise
+        golden = np.where(kc - kb > kb - ka, kb + _GOLDEN * (kc - kb), kb - _GOLDEN * (kb - ka))
+        u = np.where(parabolic, u, golden)
+        width[active] = kc - ka
+
+        state = ObserverState(ts.tt_jd(whole[0], fraction[0] + u), topos, kernel).diagonal()
+        fu = sign * _values(ephemerides, subset[active], state, [param], accuracy)[param][:, 0]
+        fu = np.where(np.isnan(fu), np.inf, fu)
+        evaluations += active.shape[0]
+
+        # 3. Keep the best point in the middle of the bracket: a better u 
+        #    replaces b, which becomes the edge on the other side; otherwise u 
+        #    becomes the edge on its side
+        better, above = fu < fb[active], u > kb
+        move_a, move_c = better & above, better & ~above
+        a[active] = np.where(move_a, kb, np.where(~better & ~above, u, ka))
+        fa[active] = np.where(move_a, fb[active], np.where(~better & ~above, fu, fa[active]))
+        c[active] = np.where(move_c, kb, np.where(~better & above, u, kc))
+        fc[active] = np.where(move_c, fb[active], np.where(~better & above, fu, fc[active]))
+        b[active] = np.where(better, u, kb)
+        fb[active] = np.where(better, fu, fb[active])
+
+    # - Extrema
+    if params and (rows.shape[0] > 0):
+        state = ObserverState(ts.tt_jd(whole[0], fraction[0] + b), topos, kernel).diagonal()
+        columns = _values(ephemerides, subset, state, params, accuracy)
+        evaluations += rows.shape[0]
+    else:
+        columns = {name: np.empty((rows.shape[0], 1)) for name in params}
+
+    start = ephemerides.time_tag.reshape(-1)[0].tt
+    extrema = Table(
+        [
+            np.asarray(catalog["designation"]).astype(str)[rows],
+            (start + TimeDelta(b, format="jd")).utc,
+            sign * fb,
+        ] + [columns[name][:, 0] for name in params] + [
+            (b <= offset[0] + tolerance) | (b >= offset[-1] - tolerance),
+        ],
+        names=["designation", "time", param] + params + ["edge"]
+    )
+    extrema.meta["evaluations"] = int(evaluations)
+
+    return extrema
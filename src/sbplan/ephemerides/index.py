@@ -0,0 +1,331 @@
+"""
+Sky index of a catalog over a night, for cone and polygon searches.
+
+Coarse positions of all comets are computed at a few epochs of the night
+("fast" accuracy, topocentric): each comet is indexed by its unit vector at
+mid-night and a padding [deg], the largest separation from it during the
+night plus a margin for the coarse positions. Slow comets are kept in a k-d
+tree on unit vectors; fast movers (padding larger than `SLOW_PAD`) are
+checked one by one. Searches are conservative: all comets that may enter
+the region during the night are returned, and some that do not may be.
+"""
+
+import hashlib, threading
+from collections import OrderedDict
+
+# NumPy
+import numpy as np
+
+__all__ = ["KDTree", "SkyIndex", "catalogVersion"]
+
+# Points per leaf of the k-d tree
+LEAF_SIZE = 32
+# Padding [deg] of the comets kept in the k-d tree
+SLOW_PAD = 1.0
+# Margin [deg] added to the padding (aberration, deflection and sampling)
+MARGIN = 0.05
+
+
+def _unitVector(ra, dec):
+
+    ra, dec = np.radians(ra), np.radians(dec)
+
+    return np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def _chord(angle):
+    """
+    Chord length of an angle [deg] on the unit sphere.
+    """
+
+    return 2 * np.sin(np.radians(np.minimum(angle, 180.0)) / 2)
+
+
+def _angle(a, b):
+    """
+    Angle [deg] between unit vectors (last axis).
+    """
+
+    return np.degrees(2 * np.arcsin(np.clip(np.linalg.norm(a - b, axis=-1) / 2, 0.0, 1.0)))
+
+
+def catalogVersion(catalog):
+    """
+    Digest of the content of a catalog.
+    """
+
+    digest = hashlib.sha1()
+    for name in catalog.colnames:
+        column = np.ma.asarray(catalog[name])
+        if column.dtype.kind in "iufb":
+            column = np.ma.filled(column.astype(float), np.nan)
+        else:
+            column = np.ma.filled(column.astype(str), "")
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(column).tobytes())
+
+    return digest.hexdigest()
+
+
+class KDTree(object):
+    """
+    Static k-d tree over 3-D points, for ball queries.
+    """
+
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        """
+        Build a k-d tree.
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            Points, shape (n_points, 3).
+        leaf_size : int, optional
+            Maximum number of points per leaf.
+        """
+
+        super(KDTree, self).__init__()
+
+        self.points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.leaf_size = leaf_size
+        self.order = np.arange(self.points.shape[0])
+
+        # Nodes: range of `order`, bounding box and children (-1 for leaves)
+        self._start, self._end, self._lo, self._hi, self._children = [], [], [], [], []
+        if self.points.shape[0]:
+            self._build(0, self.points.shape[0])
+        self._lo, self._hi = np.array(self._lo), np.array(self._hi)
+
+
+    def _build(self, start, end):
+
+        node = len(self._start)
+        points = self.points[self.order[start:end]]
+        self._start.append(start)
+        self._end.append(end)
+        self._lo.append(points.min(axis=0))
+        self._hi.append(points.max(axis=0))
+        self._children.append((-1, -1))
+
+        if end - start > self.leaf_size:
+            # Split at the median of the widest axis
+            axis = np.argmax(self._hi[node] - self._lo[node])
+            middle = (end - start) // 2
+            self.order[start:end] = self.order[start:end][
+                np.argpartition(points[:, axis], middle)]
+            self._children[node] = (
+                self._build(start, start + middle), self._build(start + middle, end))
+
+        return node
+
+
+    def __len__(self):
+
+        return self.points.shape[0]
+
+
+    def ball(self, center, radius):
+        """
+        Points within `radius` of `center`.
+
+        Returns
+        -------
+        rows : numpy.ndarray
+            Indices of the points (sorted).
+        """
+
+        center = np.asarray(center, dtype=float)
+        if not len(self):
+            return np.zeros(0, dtype=int)
+
+        found, stack = list(), [0]
+        while stack:
+            node = stack.pop()
+            lo, hi = self._lo[node], self._hi[node]
+            # Closest and farthest points of the bounding box
+            near = np.linalg.norm(np.clip(center, lo, hi) - center)
+            if near > radius:
+                continue
+            far = np.linalg.norm(np.maximum(np.abs(center - lo), np.abs(center - hi)))
+            rows = self.order[self._start[node]:self._end[node]]
+            if far <= radius:
+                found.append(rows)
+            elif self._children[node][0] < 0:
+                found.append(rows[np.linalg.norm(self.points[rows] - center, axis=1) <= radius])
+            else:
+                stack.extend(self._children[node])
+
+        return np.sort(np.concatenate(found)) if found else np.zeros(0, dtype=int)
+
+
+class SkyIndex(object):
+    """
+    Cone and polygon searches over the positions of a catalog during a night.
+    """
+
+
+    def __init__(self, vectors, pad):
+        """
+        Initialize a sky index.
+
+        Parameters
+        ----------
+        vectors : numpy.ndarray
+            Unit vectors of the comets at mid-night, shape (n_comets, 3).
+        pad : numpy.ndarray
+            Padding [deg] of the comets, shape (n_comets,).
+        """
+
+        super(SkyIndex, self).__init__()
+
+        self.vectors = np.asarray(vectors, dtype=float).reshape(-1, 3)
+        self.pad = np.asarray(pad, dtype=float)
+
+        slow = self.pad <= SLOW_PAD
+        self._slow, self._fast = np.nonzero(slow)[0], np.nonzero(~slow)[0]
+        self.tree = KDTree(self.vectors[self._slow])
+
+
+    @classmethod
+    def from_positions(cls, ra, dec):
+        """
+        Build a sky index from coarse positions.
+
+        Parameters
+        ----------
+        ra, dec : numpy.ndarray
+            RA and DEC [deg] of the comets during the night, shape
+            (n_comets, n_epochs). The middle epoch is the indexed position.
+        """
+
+        vectors = _unitVector(np.atleast_2d(ra), np.atleast_2d(dec))
+        middle = vectors[:, vectors.shape[1] // 2]
+        pad = _angle(vectors, middle[:, None]).max(axis=1) + MARGIN
+
+        return cls(middle, pad)
+
+
+    def __len__(self):
+
+        return self.vectors.shape[0]
+
+
+    def cone(self, ra, dec, radius):
+        """
+        Comets that may be within `radius` [deg] of (`ra`, `dec`) [deg].
+
+        Returns
+        -------
+        rows : numpy.ndarray
+            Rows of the comets in the catalog (sorted).
+        """
+
+        center = _unitVector(ra, dec)
+
+        rows = np.concatenate([
+            self._slow[self.tree.ball(center, _chord(radius + SLOW_PAD))], self._fast])
+        rows = rows[_angle(self.vectors[rows], center) <= radius + self.pad[rows]]
+
+        return np.sort(rows)
+
+
+    def polygon(self, vertices):
+        """
+        Comets that may be inside a spherical polygon.
+
+        Parameters
+        ----------
+        vertices : array_like
+            (RA, DEC) [deg] of the vertices in order, shape (n_vertices, 2).
+            Edges are great-circle arcs; the polygon must fit in a hemisphere.
+
+        Returns
+        -------
+        rows : numpy.ndarray
+            Rows of the comets in the catalog (sorted).
+        """
+
+        vertices = np.asarray(vertices, dtype=float)
+        if (vertices.ndim != 2) or (vertices.shape[0] < 3) or (vertices.shape[1] != 2):
+            raise ValueError("At least three (RA, DEC) vertices are required.")
+        a = _unitVector(vertices[:, 0], vertices[:, 1])
+        b = np.roll(a, -1, axis=0)
+
+        # Candidates in the cap around the polygon
+        center = a.sum(axis=0)
+        center /= np.linalg.norm(center)
+        radius = _angle(a, center).max()
+        if radius >= 90:
+            raise ValueError("The polygon must fit in a hemisphere.")
+        ra_c, dec_c = np.degrees(np.arctan2(center[1], center[0])), np.degrees(np.arcsin(center[2]))
+        rows = self.cone(ra_c, dec_c, radius)
+        p = self.vectors[rows]
+
+        # - Inside (ray casting in the gnomonic projection around the center)
+        east = np.cross([0.0, 0.0, 1.0], center)
+        east = east / np.linalg.norm(east) if np.linalg.norm(east) > 1e-12 else np.array([1.0, 0.0, 0.0])
+        north = np.cross(center, east)
+        def project(v):
+            w = v @ center
+            return np.stack([v @ east / w, v @ north / w], axis=-1)
+        pp, pa, pb = project(p), project(a), project(b)
+        x, y = pp[:, None, 0], pp[:, None, 1]
+        crosses = (pa[None, :, 1] > y) != (pb[None, :, 1] > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_edge = pa[None, :, 0] + (y - pa[None, :, 1]) * (
+                pb[None, :, 0] - pa[None, :, 0]) / (pb[None, :, 1] - pa[None, :, 1])
+        # Points behind the projection plane are outside
+        inside = ((crosses & (x < x_edge)).sum(axis=1) % 2 == 1) & (p @ center > 0)
+
+        # - Near an edge (within the padding)
+        normal = np.cross(a, b)
+        normal /= np.linalg.norm(normal, axis=1)[:, None]
+        to_circle = np.degrees(np.arcsin(np.clip(np.abs(p @ normal.T), 0.0, 1.0)))
+        on_arc = (np.einsum("ek,nek->ne", normal, np.cross(a[None], p[:, None])) >= 0) & (
+            np.einsum("ek,nek->ne", normal, np.cross(p[:, None], b[None])) >= 0)
+        to_vertices = np.minimum(_angle(p[:, None], a[None]), _angle(p[:, None], b[None]))
+        distance = np.where(on_arc, to_circle, to_vertices).min(axis=1)
+
+        return rows[inside | (distance <= self.pad[rows])]
+
+
+class SkyIndexCache(object):
+    """
+    In-process cache of sky indexes keyed on (catalog version, night, site).
+    """
+
+
+    def __init__(self, maxsize=8):
+
+        super(SkyIndexCache, self).__init__()
+
+        self.maxsize = maxsize
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, build):
+
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+
+        index = build()
+
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.maxsize:
+                self._indexes.popitem(last=False)
+
+        return index
+
+
+    def clear(self):
+
+        with self._lock:
+            self._indexes.clear()
+
+
+sky_indexes = SkyIndexCache()
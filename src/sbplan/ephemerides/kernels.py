@@ -0,0 +1,120 @@
+"""
+Process-wide registry of loaders, timescales and planetary kernels.
+
+Loading a timescale and opening an SPK kernel dominate the cost of a new
+`CometEphemeridesClass` instance. They are loaded once per path and shared by
+every instance (and thread) of the process. The coefficients of the SPK
+segments are memory-mapped by `jplephem`; `preload` maps them up front, so that
+worker processes forked afterwards share the same pages.
+"""
+
+import os, threading
+
+# skyfield
+from skyfield.api import Loader
+
+from . import conf
+
+__all__ = ["getLoader", "getTimescale", "getKernel", "preload", "close"]
+
+_LOADERS = dict()
+_TIMESCALES = dict()
+_KERNELS = dict()
+_LOCK = threading.RLock()
+
+
+def getLoader(lib_dir=conf.lib_dir):
+    """
+    Shared `skyfield` loader of a directory.
+    """
+
+    key = os.path.abspath(lib_dir)
+
+    with _LOCK:
+        if key not in _LOADERS:
+            _LOADERS[key] = Loader(lib_dir)
+
+        return _LOADERS[key]
+
+
+def getTimescale(lib_dir=conf.lib_dir):
+    """
+    Shared `skyfield` timescale of a directory.
+    """
+
+    key = os.path.abspath(lib_dir)
+
+    with _LOCK:
+        if key not in _TIMESCALES:
+            _TIMESCALES[key] = getLoader(lib_dir).timescale()
+
+        return _TIMESCALES[key]
+
+
+def getKernel(lib_dir=conf.lib_dir, filename="de421.bsp"):
+    """
+    Shared SPK kernel (downloaded into `lib_dir` if missing).
+    """
+
+    key = os.path.abspath(os.path.join(lib_dir, filename))
+
+    with _LOCK:
+        if key not in _KERNELS:
+            _KERNELS[key] = getLoader(lib_dir)(filename)
+
+        return _KERNELS[key]
+
+
+def preload(lib_dir=conf.lib_dir, filename="de421.bsp"):
+    """
+    Load the timescale and a kernel, and memory-map all its segments.
+
+    Call this before forking worker processes (or serving requests) so that
+    the pages are shared and no request pays for the first access.
+
+    Parameters
+    ----------
+    lib_dir : str, optional
+        Path to the directory of library.
+    filename : str, optional
+        Kernel file name.
+
+    Returns
+    -------
+    kernel : skyfield.jpllib.SpiceKernel
+        Kernel.
+    """
+
+    getTimescale(lib_dir)
+    kernel = getKernel(lib_dir, filename)
+
+    with _LOCK:
+        for segment in kernel.segments:
+            # `_data` maps the coefficients (cached on the segment)
+            segment.spk_segment._data
+
+    return kernel
+
+
+def close(lib_dir=None):
+    """
+    Close the kernels and forget loaders and timescales.
+
+    Instances created before are unusable afterwards; new instances reload
+    what they need.
+
+    Parameters
+    ----------
+    lib_dir : str, optional
+        Only close what was loaded from this directory. Defaults to everything.
+    """
+
+    root = None if lib_dir is None else os.path.abspath(lib_dir)
+
+    with _LOCK:
+        for registry in (_KERNELS, _TIMESCALES, _LOADERS):
+            for key in list(registry):
+                if (root is None) or (key == root) or (os.path.dirname(key) == root):
+                    item = registry.pop(key)
+                    if registry is _KERNELS:
+                        item.close()
@@ -0,0 +1,253 @@
+"""
+Offline table of MPC observatory codes.
+
+The MPC list of observatory codes (https://minorplanetcenter.net/iau/lists/ObsCodes.html)
+is read from `observatory_codes.csv` in the directory of library, or from the
+copy bundled with the package (`data/observatory_codes.csv`) if there is none,
+and parsed once per process into an indexed table. Geocentric positions are
+precomputed, so site lookups need no network. Only `refreshObservatories`
+(`sbplan observatories refresh`) reaches the network: it rebuilds the file of
+the directory of library from the MPC or from a local copy of the list.
+
+The bundled copy is the complete list at the release of the package, converted
+by `refreshObservatories` from the MPC `obscodes_extended.json`.
+"""
+
+import os, json, threading
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.table import Table
+from astropy.io.ascii import convert_numpy
+from astropy.coordinates import EarthLocation
+
+from . import conf
+from ..files import atomicWrite
+
+__all__ = ["ObservatoryTable", "observatories", "parseObservatoryCodes", "refreshObservatories"]
+
+# Equatorial radius of the Earth [cm] (the unit of the MPC parallax constants)
+EARTH_RADIUS = 6378137 * 100
+
+# Snapshot shipped with the package
+BUNDLED_PATH = os.path.join(os.path.dirname(__file__), "data", "observatory_codes.csv")
+
+_TABLES = dict()
+_LOCK = threading.Lock()
+
+
+def _observatoryPath(lib_dir):
+
+    return os.path.join(lib_dir, "observatory_codes.csv")
+
+
+def _float(text):
+
+    text = text.strip()
+
+    return float(text) if text else np.nan
+
+
+def parseObservatoryCodes(text):
+    """
+    Parse the MPC list of observatory codes (HTML page, plain text or JSON).
+
+    Parameters
+    ----------
+    text : str
+        Content of `ObsCodes.html`, or of `obscodes_extended.json` (one object
+        per code with "Longitude", "cos", "sin" and "Name").
+
+    Returns
+    -------
+    table : astropy.table.table.Table
+        Columns "code", "longitude" [deg], "rho_cos_phi", "rho_sin_phi" and
+        "name". Parallax constants are NaN for sites that are not on Earth.
+    """
+
+    codes, longitude, rho_cos_phi, rho_sin_phi, names = list(), list(), list(), list(), list()
+    if text.lstrip().startswith("{"):
+        for code, site in json.loads(text).items():
+            codes.append(code)
+            longitude.append(site.get("Longitude", np.nan))
+            rho_cos_phi.append(site.get("cos", np.nan))
+            rho_sin_phi.append(site.get("sin", np.nan))
+            names.append(site.get("Name", "").strip())
+        text = ""
+    for line in text.splitlines():
+        # Fixed-width rows: code, longitude, rho * cos(phi), rho * sin(phi), name
+        if (len(line) < 4) or (line[3] != " ") or line.startswith("Code") or ("<" in line[:4]):
+            continue
+        codes.append(line[0:3])
+        longitude.append(_float(line[4:13]))
+        rho_cos_phi.append(_float(line[13:21]))
+        rho_sin_phi.append(_float(line[21:30]))
+        names.append(line[30:].strip())
+
+    if not codes:
+        raise ValueError("No observatory codes found.")
+
+    return Table(
+        [codes, longitude, rho_cos_phi, rho_sin_phi, names],
+        names=["code", "longitude", "rho_cos_phi", "rho_sin_phi", "name"],
+        dtype=[str, float, float, float, str]
+    )
+
+
+class ObservatoryTable(object):
+    """
+    Indexed table of observatory codes with precomputed `EarthLocation`s.
+    """
+
+
+    def __init__(self, table):
+        """
+        Initialize an observatory table.
+
+        Parameters
+        ----------
+        table : astropy.table.table.Table
+            Observatory codes (see `parseObservatoryCodes`).
+        """
+
+        super(ObservatoryTable, self).__init__()
+
+        order = np.argsort(np.asarray(table["code"]).astype(str), kind="stable")
+        self.code = np.asarray(table["code"]).astype(str)[order]
+        self.longitude = np.asarray(table["longitude"], dtype=float)[order]
+        self.rho_cos_phi = np.asarray(table["rho_cos_phi"], dtype=float)[order]
+        self.rho_sin_phi = np.asarray(table["rho_sin_phi"], dtype=float)[order]
+        self.name = np.asarray(table["name"]).astype(str)[order]
+        self._index = {code: k for k, code in enumerate(self.code)}
+
+        # Geocentric positions [cm] (as in `MPC.get_observatory_location`)
+        lon = self.longitude / 180 * np.pi
+        lat = np.arctan(self.rho_sin_phi / self.rho_cos_phi)
+        r = np.sqrt(self.rho_sin_phi**2 + self.rho_cos_phi**2) * EARTH_RADIUS
+        self.xyz = np.array([
+            r * np.cos(lat) * np.cos(lon), r * np.cos(lat) * np.sin(lon), r * np.sin(lat)])
+        self._locations = dict()
+
+
+    def __len__(self):
+
+        return self.code.shape[0]
+
+
+    def __contains__(self, code):
+
+        return code in self._index
+
+
+    def index(self, codes):
+        """
+        Rows of one or more codes.
+        """
+
+        if isinstance(codes, str):
+            if codes not in self._index:
+                raise LookupError(f"{codes} not found (see `refreshObservatories`)")
+            return self._index[codes]
+
+        codes = np.asarray(codes).astype(str)
+        rows = np.searchsorted(self.code, codes)
+        found = (rows < len(self)) & (self.code[np.minimum(rows, len(self) - 1)] == codes)
+        if not np.all(found):
+            raise LookupError(
+                f"{', '.join(codes[~found])} not found (see `refreshObservatories`)")
+
+        return rows
+
+
+    def lookup(self, codes):
+        """
+        Longitude, parallax constants and name of one or more codes.
+        """
+
+        rows = self.index(codes)
+
+        return (
+            self.longitude[rows] * u.deg, self.rho_cos_phi[rows], self.rho_sin_phi[rows],
+            self.name[rows]
+        )
+
+
+    def location(self, codes):
+        """
+        `EarthLocation` of one code, or array of `EarthLocation`s of a list of codes.
+        """
+
+        rows = self.index(codes)
+        if np.any(np.isnan(self.xyz[:, rows])):
+            raise ValueError("Observatory codes without coordinates (not on Earth).")
+
+        if np.ndim(rows) == 0:
+            if rows not in self._locations:
+                self._locations[rows] = EarthLocation.from_geocentric(
+                    *self.xyz[:, rows], unit=u.Unit("cm"))
+            return self._locations[rows]
+
+        return EarthLocation.from_geocentric(*self.xyz[:, rows], unit=u.Unit("cm"))
+
+
+def observatories(lib_dir=conf.lib_dir):
+    """
+    Observatory table of a directory of library (parsed once per process).
+    The bundled snapshot is used if the directory has no list; nothing is
+    downloaded (see `refreshObservatories`).
+    """
+
+    key = os.path.abspath(lib_dir)
+
+    with _LOCK:
+        if key not in _TABLES:
+            path = _observatoryPath(lib_dir)
+            if not os.path.exists(path):
+                path = BUNDLED_PATH
+            _TABLES[key] = ObservatoryTable(
+                Table.read(path, format="ascii.csv", converters={"code": [convert_numpy(str)]}))
+
+        return _TABLES[key]
+
+
+def refreshObservatories(source=None, lib_dir=conf.lib_dir, reload=True):
+    """
+    Rebuild the observatory table.
+
+    Parameters
+    ----------
+    source : str, optional
+        Path to a local copy of the MPC list (`ObsCodes.html`, plain text or
+        `obscodes_extended.json`).
+        If not given, the list is downloaded from the MPC.
+    lib_dir : str, optional
+        Path to the directory of library.
+    reload : bool, optional
+        If `True`, drop the table parsed in this process.
+
+    Returns
+    -------
+    n_codes : int
+        Number of observatory codes.
+    """
+
+    if source is None:
+        # astroquery
+        from astroquery.mpc import MPC
+        text = MPC.get_observatory_codes_async(cache=False).text
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
+
+    table = parseObservatoryCodes(text)
+
+    os.makedirs(lib_dir, exist_ok=True)
+    atomicWrite(_observatoryPath(lib_dir), lambda f: table.write(f, format="ascii.csv"))
+
+    if reload:
+        with _LOCK:
+            _TABLES.pop(os.path.abspath(lib_dir), None)
+
+    return len(table)
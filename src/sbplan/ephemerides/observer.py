@@ -0,0 +1,192 @@
+"""
+Observer, Sun and Moon state shared by all comets of a time grid and site.
+"""
+
+import copy, threading
+from collections import OrderedDict
+
+# NumPy
+import numpy as np
+# skyfield
+from skyfield.functions import length_of
+
+from . import conf
+
+__all__ = ["ObserverState", "ObserverStateCache", "observer_states"]
+
+# Solar system bodies deflecting light (same as `skyfield`'s `.apparent()`)
+DEFLECTORS = {"sun": "sun", "jupiter": "jupiter barycenter", "saturn": "saturn barycenter"}
+
+
+class ObserverState(object):
+    """
+    State of a site on Earth over a time grid.
+
+    Everything here depends only on the time grid and the site, so it is
+    computed once and shared by every comet and every `get()` call. Vectors
+    are in au (au/d for velocities) and have shape (3, 1, n_times), ready to
+    be broadcast against comet arrays of shape (3, n_comets, n_times).
+    """
+
+
+    def __init__(self, t, topos, ephemeris):
+        """
+        Compute the state of a site.
+
+        Parameters
+        ----------
+        t : skyfield.timelib.Time
+            Time grid.
+        topos : skyfield.toposlib.GeographicPosition
+            Site location.
+        ephemeris : skyfield.jpllib.SpiceKernel
+            Planetary ephemeris (DE421).
+        """
+
+        super(ObserverState, self).__init__()
+
+        self.tt = np.atleast_1d(t.tt)
+
+        # - Observer
+        observer = ephemeris["earth"] + topos
+        o = observer.at(t)
+        self.position = self._reshape(o.xyz.au)
+        self.velocity = self._reshape(o.velocity.au_per_d)
+        self.gcrs = self._reshape(topos.at(t).xyz.au)
+        # GCRS -> horizontal rotation (ITRS -> GCRS rotation and site orientation)
+        self.rotation = topos.rotation_at(t).reshape(3, 3, 1, -1)
+
+        # - Deflectors (barycentric positions and velocities)
+        self.deflectors = dict()
+        for name, target in DEFLECTORS.items():
+            d = ephemeris[target].at(t)
+            self.deflectors[name] = (
+                self._reshape(d.xyz.au), self._reshape(d.velocity.au_per_d))
+        self.sun_position, self.sun_velocity = self.deflectors["sun"]
+
+        # - Sun and Moon (astrometric and apparent)
+        s, m = o.observe(ephemeris["sun"]), o.observe(ephemeris["moon"])
+        self.sun_astrometric = self._reshape(s.xyz.au)
+        self.moon_astrometric = self._reshape(m.xyz.au)
+        self.sun = self._reshape(s.apparent().xyz.au)
+        self.moon = self._reshape(m.apparent().xyz.au)
+        self.earth_to_sun = length_of(self.sun)
+
+
+    def __len__(self):
+
+        return self.tt.shape[-1]
+
+
+    def diagonal(self):
+        """
+        Copy of the state with the epochs moved to the comet axis: vectors of 
+        shape (3, n_times, 1), so that the k-th comet of an array of n_times 
+        comets is evaluated at the k-th epoch only.
+        """
+
+        state = copy.copy(self)
+        for name in ("position", "velocity", "gcrs", "sun_position", "sun_velocity", 
+                     "sun_astrometric", "moon_astrometric", "sun", "moon", "rotation"):
+            setattr(state, name, np.swapaxes(getattr(self, name), -1, -2))
+        state.deflectors = {
+            name: (np.swapaxes(position, -1, -2), np.swapaxes(velocity, -1, -2)) 
+            for name, (position, velocity) in self.deflectors.items()
+        }
+        state.sun_position, state.sun_velocity = state.deflectors["sun"]
+        state.tt = self.tt[:, None]
+        state.earth_to_sun = length_of(state.sun)
+
+        return state
+
+
+    @staticmethod
+    def _reshape(xyz):
+
+        return xyz.reshape(3, 1, -1)
+
+
+class ObserverStateCache(object):
+    """
+    Thread-safe LRU cache of `ObserverState` keyed by (kernel, time grid, site).
+    """
+
+
+    def __init__(self, maxsize=None):
+        """
+        Initialize an observer state cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            Maximum number of states kept. Least recently used states are
+            evicted first. Defaults to `conf.observer_cache_size`, read at
+            each insertion (so that it can be changed at run time).
+        """
+
+        super(ObserverStateCache, self).__init__()
+
+        self.maxsize = maxsize
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+
+        return len(self._states)
+
+
+    def get(self, t, topos, ephemeris, key=None):
+        """
+        Get the state of a site, computing it if not cached.
+
+        Parameters
+        ----------
+        t : skyfield.timelib.Time
+            Time grid.
+        topos : skyfield.toposlib.GeographicPosition
+            Site location.
+        ephemeris : skyfield.jpllib.SpiceKernel
+            Planetary ephemeris.
+        key : hashable, optional
+            Extra key identifying the ephemeris (e.g., its path).
+
+        Returns
+        -------
+        state : ObserverState
+            Observer state.
+        """
+
+        key = (
+            key, np.atleast_1d(t.whole).tobytes(), np.atleast_1d(t.tdb_fraction).tobytes(),
+            topos.latitude.degrees, topos.longitude.degrees, topos.elevation.m
+        )
+
+        with self._lock:
+            if key in self._states:
+                self._states.move_to_end(key)
+                return self._states[key]
+
+        state = ObserverState(t, topos, ephemeris)
+
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            maxsize = conf.observer_cache_size if self.maxsize is None else self.maxsize
+            while len(self._states) > max(maxsize, 0):
+                self._states.popitem(last=False)
+
+        return state
+
+
+    def clear(self):
+        """
+        Remove all cached states.
+        """
+
+        with self._lock:
+            self._states.clear()
+
+
+# Process-wide cache shared by all `CometEphemeridesClass` instances
+observer_states = ObserverStateCache()
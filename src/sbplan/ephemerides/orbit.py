@@ -0,0 +1,235 @@
+"""
+Vectorized two-body propagation of comet orbits.
+"""
+
+# NumPy
+import numpy as np
+# skyfield
+from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.data.spice import inertial_frames
+
+__all__ = ["CometOrbits"]
+
+# Number of terms used in the series expansion of the Stumpff functions
+_STUMPFF_TERMS = 12
+# Maximum number of Laguerre-Conway iterations
+_MAX_ITER = 50
+
+
+def _stumpff(z):
+    """
+    Stumpff functions C(z) and S(z).
+
+    Parameters
+    ----------
+    z : numpy.ndarray
+        Argument, alpha * chi**2.
+
+    Returns
+    -------
+    c, s : numpy.ndarray
+        Stumpff functions C(z) and S(z).
+    """
+
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+
+    # Closed forms (well conditioned for |z| >= 1)
+    pos = z >= 1
+    neg = z <= -1
+    sqz = np.sqrt(z[pos])
+    c[pos] = (1 - np.cos(sqz)) / z[pos]
+    s[pos] = (sqz - np.sin(sqz)) / sqz**3
+    sqz = np.sqrt(-z[neg])
+    c[neg] = (np.cosh(sqz) - 1) / -z[neg]
+    s[neg] = (np.sinh(sqz) - sqz) / sqz**3
+
+    # Series expansion (avoids cancellation near the parabolic case)
+    mid = ~(pos | neg)
+    zm = z[mid]
+    cm, sm = np.zeros_like(zm), np.zeros_like(zm)
+    term_c, term_s = np.full_like(zm, 1 / 2), np.full_like(zm, 1 / 6)
+    for k in range(_STUMPFF_TERMS):
+        cm += term_c
+        sm += term_s
+        term_c = -term_c * zm / ((2 * k + 3) * (2 * k + 4))
+        term_s = -term_s * zm / ((2 * k + 4) * (2 * k + 5))
+    c[mid], s[mid] = cm, sm
+
+    return c, s
+
+
+class CometOrbits(object):
+    """
+    Heliocentric two-body orbits of a whole comet catalog.
+
+    All orbital elements are kept as NumPy arrays and the universal Kepler
+    equation is solved for every comet and every epoch in a single broadcast
+    of shape (n_comets, n_times). Elliptic, parabolic and hyperbolic orbits
+    are handled alike, so the results agree with `skyfield.data.mpc.comet_orbit`
+    to the precision of the Kepler solver (better than 1e-12 au).
+    """
+
+
+    def __init__(self, catalog, ts):
+        """
+        Initialize comet orbits.
+
+        Parameters
+        ----------
+        catalog : astropy.table.table.Table
+            Comet catalog in skyfield format (see `sbplan.catalog.utils.toSkyfieldFormat`).
+        ts : skyfield.timelib.Timescale
+            Timescale used to convert the perihelion time to TT.
+        """
+
+        super(CometOrbits, self).__init__()
+
+        self.designation = np.asarray(catalog["designation"]).astype(str)
+
+        # - Elements
+        self.q = np.asarray(catalog["perihelion_distance_au"], dtype=float)
+        self.e = np.asarray(catalog["eccentricity"], dtype=float)
+        # !!! Perihelion time in TT (same as `skyfield.data.mpc.comet_orbit`) !!!
+        self.tp = np.atleast_1d(
+            ts.tt(
+                np.asarray(catalog["perihelion_year"]),
+                np.asarray(catalog["perihelion_month"]),
+                np.asarray(catalog["perihelion_day"], dtype=float)
+            ).tt
+        )
+        i  = np.radians(np.asarray(catalog["inclination_degrees"], dtype=float))
+        om = np.radians(np.asarray(catalog["longitude_of_ascending_node_degrees"], dtype=float))
+        w  = np.radians(np.asarray(catalog["argument_of_perihelion_degrees"], dtype=float))
+
+        # - Derived quantities
+        # 1. GM of the Sun [au^3/d^2]
+        self.mu = GM_SUN / AU_KM**3 * DAY_S**2
+        # 2. Reciprocal semi-major axis [1/au]
+        self.alpha = (1 - self.e) / self.q
+        # 3. Rotation from the perifocal frame to ICRF, shape (3, 2, n_comets)
+        P = np.array([
+            np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(i),
+            np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(i),
+            np.sin(w) * np.sin(i),
+        ])
+        Q = np.array([
+            - np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(i),
+            - np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(i),
+            np.cos(w) * np.sin(i),
+        ])
+        self.rotation = np.einsum(
+            "ij,jkn->ikn", inertial_frames["ECLIPJ2000"].T, np.stack([P, Q], axis=1))
+
+
+    def __len__(self):
+
+        return self.q.shape[0]
+
+
+    def at(self, tt, tolerance=1e-15, velocity=False):
+        """
+        Heliocentric positions (and velocities).
+
+        Parameters
+        ----------
+        tt : numpy.ndarray
+            TT Julian dates, shape (n_times,) or (n_comets, n_times).
+        tolerance : float, optional
+            Relative tolerance of the universal anomaly.
+        velocity : bool, optional
+            If `True`, also return the velocities.
+
+        Returns
+        -------
+        position : numpy.ndarray
+            Heliocentric ICRF positions [au], shape (3, n_comets, n_times).
+        velocity : numpy.ndarray
+            Heliocentric ICRF velocities [au/d], shape (3, n_comets, n_times). 
+            Only returned if `velocity` is `True`.
+        """
+
+        q, e, alpha = self.q[:, None], self.e[:, None], self.alpha[:, None]
+
+        dt = np.broadcast_to(np.asarray(tt, dtype=float), (len(self), np.shape(tt)[-1]))
+        dt = dt - self.tp[:, None]
+
+        chi = self._solve(dt, tolerance)
+
+        # Perifocal coordinates (Lagrange coefficients written without cancellation)
+        z = alpha * chi**2
+        c, s = _stumpff(z)
+        x = q - chi**2 * c
+        y = chi * (1 - z * s) * np.sqrt(q * (1 + e))
+
+        position = self.rotation[:, 0, :, None] * x + self.rotation[:, 1, :, None] * y
+
+        if not velocity:
+            return position
+
+        # d(chi)/dt = sqrt(mu) / r, with r = q + e * chi**2 * C(z)
+        chi_dot = np.sqrt(self.mu) / (q + e * chi**2 * c)
+        x_dot = - chi * (1 - z * s) * chi_dot
+        y_dot = (1 - z * c) * np.sqrt(q * (1 + e)) * chi_dot
+
+        return position, (
+            self.rotation[:, 0, :, None] * x_dot + self.rotation[:, 1, :, None] * y_dot
+        )
+
+
+    def _solve(self, dt, tolerance=1e-15):
+        """
+        Solve the universal Kepler equation referred to perihelion,
+
+            sqrt(mu) * dt = q * chi + e * chi**3 * S(alpha * chi**2),
+
+        for the universal anomaly chi with the Laguerre-Conway method.
+        """
+
+        q, e, alpha = self.q[:, None], self.e[:, None], self.alpha[:, None]
+        sqrt_mu = np.sqrt(self.mu)
+
+        elliptic = np.broadcast_to(alpha > 0, dt.shape)
+        hyperbolic = np.broadcast_to(alpha < 0, dt.shape)
+        near_parabolic = np.broadcast_to(np.abs(1 - e) < 1e-2, dt.shape)
+        sqrt_abs_alpha = np.broadcast_to(np.sqrt(np.abs(alpha)), dt.shape)
+
+        # Reduce elliptic orbits to within half a period of perihelion
+        n = np.sqrt(self.mu * np.abs(alpha)**3)
+        period = np.broadcast_to(2 * np.pi / np.where(n > 0, n, np.inf), dt.shape)
+        dt = np.where(elliptic, dt - period * np.round(dt / np.where(elliptic, period, 1)), dt)
+
+        # - Initial guess
+        chi = np.zeros_like(dt)
+        M = np.broadcast_to(n, dt.shape) * dt
+        # 1. Elliptic (Danby)
+        chi = np.where(
+            elliptic, (M + 0.85 * np.broadcast_to(e, dt.shape) * np.sign(M))
+            / np.where(elliptic, sqrt_abs_alpha, 1), chi)
+        # 2. Hyperbolic (Danby)
+        chi = np.where(
+            hyperbolic, np.sign(M) * np.log(2 * np.abs(M) / np.broadcast_to(e, dt.shape) + 1.8)
+            / np.where(hyperbolic, sqrt_abs_alpha, 1), chi)
+        # 3. (Near-)parabolic (Barker)
+        W = 3 * np.sqrt(self.mu / (2 * q**3)) * dt
+        y = np.cbrt(W / 2 + np.sqrt(W**2 / 4 + 1))
+        chi = np.where(near_parabolic, np.sqrt(2 * q) * (y - 1 / y), chi)
+
+        # - Laguerre-Conway iteration
+        # Converged elements are frozen, so that the result of each element does 
+        # not depend on the other elements (e.g., on how a catalog is chunked).
+        converged = np.zeros(dt.shape, dtype=bool)
+        for _ in range(_MAX_ITER):
+            z = alpha * chi**2
+            c, s = _stumpff(z)
+            F = q * chi + e * chi**3 * s - sqrt_mu * dt
+            dF = q + e * chi**2 * c
+            ddF = e * chi * (1 - z * s)
+            delta = 5 * F / (dF + np.sqrt(np.abs(16 * dF**2 - 20 * F * ddF)))
+            chi = np.where(converged, chi, chi - delta)
+            converged |= np.abs(delta) <= tolerance * (1 + np.abs(chi))
+            if converged.all():
+                break
+
+        return chi
@@ -0,0 +1,177 @@
+"""
+Multi-process ephemerides with shared-memory output.
+"""
+
+import math, threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy
+import numpy as np
+
+from . import conf
+from .kernels import preload
+
+__all__ = ["computeParallel"]
+
+# Ephemerides instances of a worker process, keyed by (kernel, time grid, site),
+# so that the kernel is loaded and the observer state computed only once per
+# worker (least recently used first out, as the observer states)
+_WORKER_EPHEMERIDES = OrderedDict()
+_WORKER_LOCK = threading.Lock()
+
+
+def _workerEphemerides(cls, lib_dir, time_tag, location):
+    """
+    Ephemerides instance of the current worker process.
+    """
+
+    key = (
+        cls, lib_dir, time_tag.jd1.tobytes(), time_tag.jd2.tobytes(),
+        tuple(location.get_itrs().cartesian.xyz.value)
+    )
+
+    with _WORKER_LOCK:
+        ephemerides = _WORKER_EPHEMERIDES.get(key)
+        if ephemerides is None:
+            ephemerides = cls(time_tag, location, lib_dir=lib_dir)
+            _WORKER_EPHEMERIDES[key] = ephemerides
+        _WORKER_EPHEMERIDES.move_to_end(key)
+        while len(_WORKER_EPHEMERIDES) > max(conf.observer_cache_size, 1):
+            _WORKER_EPHEMERIDES.popitem(last=False)
+
+    return ephemerides
+
+
+def _computeChunk(task):
+    """
+    Compute a chunk (rows of the catalog, columns of the time grid) and write it
+    into the shared output arrays.
+    """
+
+    from multiprocessing import shared_memory
+
+    from .orbit import CometOrbits
+
+    ephemerides = _workerEphemerides(
+        task["cls"], task["lib_dir"], task["time_tag"][task["cols"]], task["location"])
+    # The instance is shared by the tasks of a worker (threads of a
+    # `ThreadPoolExecutor` run them concurrently), so it is not modified
+    columns = ephemerides._compute(
+        CometOrbits(task["catalog"], ephemerides.ts), catalog=task["catalog"],
+        params=task["params"], accuracy=task["accuracy"])
+
+    for param, column in columns.items():
+        # Workers share the resource tracker of the parent process, which owns
+        # (and unlinks) the block
+        shm = shared_memory.SharedMemory(name=task["buffers"][param])
+        try:
+            output = np.ndarray(task["shape"], dtype=task["dtype"], buffer=shm.buf)
+            output[task["rows"], task["cols"]] = column
+            del output
+        finally:
+            shm.close()
+
+    return None
+
+
+def computeParallel(ephemerides, params, workers=None, executor=None, chunk_size=None,
+                    time_chunk_size=None, dtype=np.float64):
+    """
+    Compute ephemerides in a process pool.
+
+    The catalog (and optionally the time grid) is partitioned into chunks. Each
+    worker loads the planetary kernel once and writes its results directly into
+    shared-memory arrays, so nothing but the chunk specification is pickled.
+    The results are identical to the serial path.
+
+    Parameters
+    ----------
+    ephemerides : sbplan.ephemerides.core.CometEphemeridesClass
+        Ephemerides instance (time grid, site, catalog and accuracy already set).
+    params : list
+        List of parameters (in column order).
+    workers : int, optional
+        Number of worker processes. Ignored if `executor` is given.
+    executor : concurrent.futures.Executor, optional
+        Executor to run the chunks (e.g., a shared `ProcessPoolExecutor`, or a
+        `ThreadPoolExecutor`).
+    chunk_size : int, optional
+        Number of comets per chunk. Defaults to about four chunks per worker.
+    time_chunk_size : int, optional
+        Number of epochs per chunk. Defaults to the whole time grid.
+    dtype : numpy.dtype, optional
+        Storage type of the results.
+
+    Returns
+    -------
+    columns : dict
+        Parameters, each of shape (n_comets, n_times).
+    """
+
+    from multiprocessing import shared_memory
+
+    catalog = ephemerides.catalog
+    time_tag = ephemerides.time_tag.reshape(-1)
+    shape = (len(catalog), len(time_tag))
+    dtype = np.dtype(dtype)
+
+    if executor is None:
+        workers = workers or 1
+    else:
+        workers = getattr(executor, "_max_workers", None) or 1
+    if chunk_size is None:
+        chunk_size = max(math.ceil(shape[0] / (4 * workers)), 1)
+    if time_chunk_size is None:
+        time_chunk_size = max(shape[1], 1)
+
+    # Map the kernel before the workers are forked, so that they share its pages
+    preload(ephemerides.LIB_DIR)
+
+    # Shared output arrays (owned by this process)
+    blocks = {
+        param: shared_memory.SharedMemory(
+            create=True, size=max(shape[0] * shape[1] * dtype.itemsize, 1))
+        for param in params
+    }
+
+    try:
+        tasks = list()
+        for start in range(0, shape[0], chunk_size):
+            rows = slice(start, min(start + chunk_size, shape[0]))
+            for time_start in range(0, shape[1], time_chunk_size):
+                cols = slice(time_start, min(time_start + time_chunk_size, shape[1]))
+                tasks.append({
+                    "cls": ephemerides.__class__,
+                    "lib_dir": ephemerides.LIB_DIR,
+                    "time_tag": time_tag,
+                    "location": ephemerides.location,
+                    "catalog": catalog[rows],
+                    "params": params,
+                    "accuracy": ephemerides.accuracy,
+                    "rows": rows,
+                    "cols": cols,
+                    "buffers": {param: block.name for param, block in blocks.items()},
+                    "shape": shape,
+                    "dtype": dtype,
+                })
+
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for _ in pool.map(_computeChunk, tasks):
+                    pass
+        else:
+            for future in [executor.submit(_computeChunk, task) for task in tasks]:
+                future.result()
+
+        columns = {
+            param: np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+            for param, block in blocks.items()
+        }
+
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    return columns
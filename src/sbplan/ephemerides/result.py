@@ -0,0 +1,251 @@
+"""
+Columnar container of ephemerides.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.table import Table
+
+__all__ = ["ColumnarEphemerides", "SiteEphemerides"]
+
+
+class ColumnarEphemerides(object):
+    """
+    Ephemerides of a whole catalog stored as contiguous 2-D arrays.
+
+    Each parameter is a C-contiguous array of shape (n_comets, n_times), rows
+    follow `designation`, and units are stored once in `units`. Filters can
+    then be written as single NumPy expressions, e.g.,
+
+        >>> mask = (ephemerides["EL"] > 30) & (ephemerides["Tmag"] < 16)
+        >>> observable = ephemerides.designation[mask.any(axis=1)]
+    """
+
+    # Stats of the call that produced the results (see `sbplan.profiling`)
+    stats = None
+
+
+    def __init__(self, designation, time_tag, columns, units, dtype=np.float64):
+        """
+        Initialize a columnar ephemerides container.
+
+        Parameters
+        ----------
+        designation : numpy.ndarray
+            Designations of the comets, shape (n_comets,).
+        time_tag : astropy.time.core.Time
+            Time tag, shape (n_times,).
+        columns : dict
+            Parameters, each of shape (n_comets, n_times).
+        units : dict
+            Units of the parameters.
+        dtype : numpy.dtype, optional
+            Storage type (`numpy.float64` or `numpy.float32`).
+        """
+
+        super(ColumnarEphemerides, self).__init__()
+
+        self.designation = np.asarray(designation)
+        self.time_tag = time_tag
+        self.dtype = np.dtype(dtype)
+        self.columns = {
+            param: np.ascontiguousarray(column, dtype=self.dtype)
+            for param, column in columns.items()
+        }
+        self.units = {param: u.Unit(units[param]) for param in self.columns}
+        self._index = {pdes: k for k, pdes in enumerate(self.designation)}
+
+
+    def __len__(self):
+
+        return self.designation.shape[0]
+
+
+    def __contains__(self, pdes):
+
+        return pdes in self._index
+
+
+    def __getitem__(self, param):
+        """
+        Array of a parameter, shape (n_comets, n_times).
+        """
+
+        return self.columns[param]
+
+
+    @property
+    def params(self):
+
+        return list(self.columns)
+
+
+    @property
+    def shape(self):
+
+        return (len(self), len(self.time_tag))
+
+
+    def index(self, pdes):
+        """
+        Row of a comet.
+        """
+
+        return self._index[pdes]
+
+
+    def quantity(self, param):
+        """
+        Parameter as `astropy.units.Quantity` (no copy).
+        """
+
+        return u.Quantity(self.columns[param], self.units[param], copy=False)
+
+
+    def table(self, pdes):
+        """
+        Ephemerides of a comet as `astropy.table.table.Table`. The columns are
+        views of the rows of the stored arrays.
+        """
+
+        k = self._index[pdes]
+        table = Table([self.columns[param][k] for param in self.columns],
+                      names=self.params, copy=False)
+        for param in self.columns:
+            table[param].unit = self.units[param]
+
+        return table
+
+
+    def to_dict(self):
+        """
+        Ephemerides as a dict of tables (same layout as `CometEphemeridesClass.get`).
+        """
+
+        return {pdes: self.table(pdes) for pdes in self.designation}
+
+
+    def select(self, rows):
+        """
+        Subset of comets.
+
+        Parameters
+        ----------
+        rows : array_like
+            Boolean mask of shape (n_comets,), indices, or designations.
+
+        Returns
+        -------
+        ephemerides : ColumnarEphemerides
+            Selected ephemerides.
+        """
+
+        rows = np.asarray(rows)
+        if rows.dtype.kind in "USO":
+            rows = np.array([self._index[pdes] for pdes in rows], dtype=int)
+
+        return self.__class__(
+            designation=self.designation[rows],
+            time_tag=self.time_tag,
+            columns={param: column[rows] for param, column in self.columns.items()},
+            units=self.units,
+            dtype=self.dtype,
+        )
+
+
+class SiteEphemerides(object):
+    """
+    Ephemerides of a whole catalog at several sites, stored as contiguous 3-D 
+    arrays of shape (n_sites, n_comets, n_times).
+
+        >>> observable = (ephemerides["EL"] > 30).any(axis=(0, 2))
+    """
+
+    # Stats of the call that produced the results (see `sbplan.profiling`)
+    stats = None
+
+
+    def __init__(self, sites, designation, time_tag, columns, units, dtype=np.float64):
+        """
+        Initialize a multi-site ephemerides container.
+
+        Parameters
+        ----------
+        sites : list
+            Site keys, shape (n_sites,).
+        designation : numpy.ndarray
+            Designations of the comets, shape (n_comets,).
+        time_tag : astropy.time.core.Time
+            Time tag, shape (n_times,).
+        columns : dict
+            Parameters, each of shape (n_sites, n_comets, n_times).
+        units : dict
+            Units of the parameters.
+        dtype : numpy.dtype, optional
+            Storage type (`numpy.float64` or `numpy.float32`).
+        """
+
+        super(SiteEphemerides, self).__init__()
+
+        self.sites = list(sites)
+        self.designation = np.asarray(designation)
+        self.time_tag = time_tag
+        self.dtype = np.dtype(dtype)
+        self.columns = {
+            param: np.ascontiguousarray(column, dtype=self.dtype)
+            for param, column in columns.items()
+        }
+        self.units = {param: u.Unit(units[param]) for param in self.columns}
+        self._index = {site: k for k, site in enumerate(self.sites)}
+
+
+    def __len__(self):
+
+        return len(self.sites)
+
+
+    def __getitem__(self, param):
+        """
+        Array of a parameter, shape (n_sites, n_comets, n_times).
+        """
+
+        return self.columns[param]
+
+
+    @property
+    def params(self):
+
+        return list(self.columns)
+
+
+    @property
+    def shape(self):
+
+        return (len(self), self.designation.shape[0], len(self.time_tag))
+
+
+    def site(self, site):
+        """
+        Ephemerides of a site as `ColumnarEphemerides` (views of the stored 
+        arrays).
+        """
+
+        k = self._index[site]
+
+        return ColumnarEphemerides(
+            designation=self.designation,
+            time_tag=self.time_tag,
+            columns={param: column[k] for param, column in self.columns.items()},
+            units=self.units,
+            dtype=self.dtype,
+        )
+
+
+    def to_dict(self):
+        """
+        Ephemerides as a dict (sites) of dicts of tables.
+        """
+
+        return {site: self.site(site).to_dict() for site in self.sites}
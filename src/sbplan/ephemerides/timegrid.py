@@ -0,0 +1,159 @@
+"""
+Lazy time grids.
+"""
+
+import re
+import math
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import Time, TimeDelta
+
+__all__ = ["TimeGrid", "parseStep"]
+
+# Units of the step
+STEP_UNITS = {"y": "yr", "d": "d", "h": "h", "m": "min", "s": "s"}
+
+
+def parseStep(step):
+    """
+    Parse a step such as "1d", "30m" or "1d6h" (mixed units are added up).
+
+    Parameters
+    ----------
+    step : str or astropy.time.TimeDelta or astropy.units.Quantity
+        Step. Units are "y" (Julian year), "d", "h", "m" (minute) and "s".
+
+    Returns
+    -------
+    dt : astropy.time.TimeDelta
+        Step.
+    """
+
+    if isinstance(step, TimeDelta):
+        dt = step
+    elif isinstance(step, u.Quantity):
+        dt = TimeDelta(step)
+    elif isinstance(step, str) and re.search(r"^(\d+[ydhms])+$", step):
+        terms = re.findall(r"(\d+)([ydhms])", step)
+        # Single units are converted as before
+        dt = TimeDelta(int(terms[0][0]) * u.Unit(STEP_UNITS[terms[0][1]]))
+        for value, unit in terms[1:]:
+            dt = dt + TimeDelta(int(value) * u.Unit(STEP_UNITS[unit]))
+    else:
+        raise ValueError(
+            "A `str` like \"1d\" or \"1d6h\" (units: y, d, h, m, s) is required for `step`.")
+
+    if not dt.isscalar or dt.sec <= 0:
+        raise ValueError("A positive scalar is required for `step`.")
+
+    return dt
+
+
+class TimeGrid(object):
+    """
+    Evenly spaced epochs from `start` to `stop` (inclusive) that are only
+    materialized on demand, as a whole or in chunks.
+
+        >>> grid = TimeGrid("2024-01-01", "2025-01-01", "1m")
+        >>> len(grid)
+        527041
+        >>> for time_tag in grid.chunks(10000):
+        ...     pass
+    """
+
+
+    def __init__(self, start, stop, step):
+        """
+        Initialize a time grid.
+
+        Parameters
+        ----------
+        start, stop : str or astropy.time.core.Time
+            First and last epochs.
+        step : str or astropy.time.TimeDelta or astropy.units.Quantity
+            Step (see `parseStep`).
+        """
+
+        super(TimeGrid, self).__init__()
+
+        self.start = start if isinstance(start, Time) else Time(start)
+        self.stop = stop if isinstance(stop, Time) else Time(stop)
+        self.step = parseStep(step)
+
+        if not (self.start.isscalar and self.stop.isscalar):
+            raise ValueError("Scalar `start` and `stop` are required.")
+
+        self._length = max(int((self.stop - self.start) / self.step + 1), 0)
+
+
+    @classmethod
+    def from_epoch(cls, epoch):
+        """
+        Time grid from a dict with "start", "stop" and "step".
+        """
+
+        return cls(epoch["start"], epoch["stop"], epoch["step"])
+
+
+    def __len__(self):
+
+        return self._length
+
+
+    def __getitem__(self, item):
+        """
+        Epochs of an index or a slice (as `astropy.time.core.Time`).
+        """
+
+        if isinstance(item, slice):
+            return self.start + np.arange(*item.indices(self._length)) * self.step
+
+        index = int(item)
+        if index < 0:
+            index += self._length
+        if not (0 <= index < self._length):
+            raise IndexError("Time grid index out of range.")
+
+        return self.start + index * self.step
+
+
+    def time(self):
+        """
+        All epochs (as `astropy.time.core.Time`).
+        """
+
+        return self[:]
+
+
+    def chunks(self, size=None):
+        """
+        Yield the epochs in chunks.
+
+        Parameters
+        ----------
+        size : int, optional
+            Number of epochs per chunk. Defaults to the whole grid.
+
+        Yields
+        ------
+        time_tag : astropy.time.core.Time
+            Epochs of a chunk.
+        """
+
+        size = max(self._length, 1) if size is None else int(size)
+        if size <= 0:
+            raise ValueError("A positive `int` is required for `size`.")
+
+        for start in range(0, self._length, size):
+            yield self[start:min(start + size, self._length)]
+
+
+    def n_chunks(self, size):
+        """
+        Number of chunks of `size` epochs.
+        """
+
+        return math.ceil(self._length / size)
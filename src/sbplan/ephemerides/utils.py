@@ -1,21 +1,59 @@
-import re
-
 # NumPy
 import numpy as np
-# AstroPy
-import astropy.units as u
-from astropy.time import Time, TimeDelta
-from astropy.coordinates import EarthLocation
-# Astroquery
-from astroquery.mpc import MPC
 
+from .timegrid import TimeGrid
+from .observatories import observatories
+
+
+# Magnitude parameters and their catalog columns (`skyfield` names)
+MAGNITUDE_COLUMNS = {
+    "M1": "magnitude_g", "K1": "magnitude_k", "H": "magnitude_H", "G": "magnitude_G", 
+}
+
+# Slope parameter of asteroids without one
+DEFAULT_G = 0.15
+
+
+def magnitudeParameters(catalog):
+    """
+    Magnitude parameters (M1, K1 of comets, H, G of asteroids) found in a 
+    catalog, as float arrays (NaN if missing).
+    """
+
+    return {
+        key: np.ma.filled(catalog[name].astype(float), np.nan) 
+        for key, name in MAGNITUDE_COLUMNS.items() if name in catalog.colnames
+    }
 
-def totalMagnitude(Delta, r_h, M1, K1):
+
+def totalMagnitude(Delta, r_h, M1=None, K1=None, H=None, G=None, alpha=None):
     """
-    m1 = M1 + 5 * log10(Delta) + K1 * log10(r_h)
+    m1 = M1 + 5 * log10(Delta) + K1 * log10(r_h)                 (comets)
+    V  = H + 5 * log10(r_h * Delta) - 2.5 * log10(
+             (1 - G) * Phi1 + G * Phi2)                         (asteroids)
+
+    with Phi_i = exp(-A_i * tan(alpha / 2)**B_i), the phase functions of the 
+    H, G system (Bowell et al. 1989). Where both are given, the comet formula 
+    is used if M1 is finite. G defaults to `DEFAULT_G`, and the phase angle 
+    `alpha` [deg] is required with H.
     """
 
-    m1 = M1 + 5 * np.log10(Delta) + K1 * np.log10(r_h)
+    m1 = None
+    if M1 is not None:
+        m1 = M1 + 5 * np.log10(Delta) + K1 * np.log10(r_h)
+
+    if H is not None:
+        if alpha is None:
+            raise ValueError("The phase angle `alpha` is required for H, G magnitudes.")
+        G = DEFAULT_G if G is None else np.where(np.isnan(G), DEFAULT_G, G)
+        tan_half = np.tan(np.radians(alpha) / 2)
+        phi_1 = np.exp(-3.33 * tan_half**0.63)
+        phi_2 = np.exp(-1.87 * tan_half**1.22)
+        V = H + 5 * np.log10(r_h * Delta) - 2.5 * np.log10((1 - G) * phi_1 + G * phi_2)
+        m1 = V if m1 is None else np.where(np.isfinite(M1), m1, V)
+
+    if m1 is None:
+        raise ValueError("M1 and K1, or H (and G) are required.")
 
     return m1
 
@@ -24,38 +62,32 @@ def timeTag(epoch):
     """
     """
 
-    if re.search("^\d+[ydhms]$", epoch["step"]):
-        if epoch["step"][-1] == "y":
-            dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit("yr"))
-        elif epoch["step"][-1] == "d":
-            dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit("d"))
-        elif epoch["step"][-1] == "h":
-            dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit("h"))
-        elif epoch["step"][-1] == "m":
-            dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit("min"))
-        else:
-            dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit("s"))
-    
-    time_tag = Time(epoch["start"]) + np.arange(int((Time(epoch["stop"]) - Time(epoch["start"])) / dt + 1)) * dt
+    # Same epochs as `TimeGrid`, which also accepts mixed units (e.g., "1d6h")
+    time_tag = TimeGrid.from_epoch(epoch).time()
 
     return time_tag
 
 
-def siteLocation(IAU_code):
+def siteLocation(IAU_code, lib_dir=None):
     """
+    Site location(s) of IAU observatory code(s), from the offline table of MPC 
+    observatory codes (see `sbplan.ephemerides.observatories`).
+
+    Parameters
+    ----------
+    IAU_code : str or list
+        IAU observatory code(s).
+    lib_dir : str, optional
+        Path to the directory of library.
+
+    Returns
+    -------
+    site_location : astropy.coordinates.earth.EarthLocation
+        Site location (an array of locations for a list of codes).
     """
 
-    # Get MPC coordinates
-    longitude, rho_cos_phi, rho_sin_phi, name = MPC.get_observatory_location(IAU_code)
-
-    # Convert to longitude, latitude, and radius (in [cm]) refer to geocenter
-    lon = longitude.value / 180 * np.pi
-    lat = np.arctan(rho_sin_phi / rho_cos_phi)
-    r = np.sqrt(rho_sin_phi**2 + rho_cos_phi**2) * 6378137 * 100
-
-    # Convert to Cartesian coordinates in [cm]
-    x, y, z = r * np.cos(lat) * np.cos(lon), r * np.cos(lat) * np.sin(lon), r * np.sin(lat)
+    table = observatories() if lib_dir is None else observatories(lib_dir)
 
-    site_location = EarthLocation.from_geocentric(x, y, z, unit=u.Unit("cm"))
+    site_location = table.location(IAU_code)
 
-    return site_location
\ No newline at end of file
+    return site_location
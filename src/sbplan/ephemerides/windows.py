@@ -0,0 +1,159 @@
+"""
+Observability windows by root finding.
+
+A window is an interval during which all constraints hold. The constraints
+are combined into a single margin [deg],
+
+    f(t) = min(EL - min_EL, max_sun_EL - sun_EL, elong - min_elong,
+               lunar_elong - min_lunar_elong),
+
+which is positive inside the windows.
+
+1. Bracketing: f is evaluated for all comets at once on a coarse grid, and
+   sign changes between consecutive epochs bracket the window edges.
+2. Refinement: all brackets are bisected at once (comet k at its own epoch,
+   see `ObserverState.diagonal`) down to `precision`.
+
+Windows shorter than the coarse step may be missed.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import TimeDelta
+from astropy.table import Table
+# skyfield
+from skyfield.functions import to_spherical
+
+from .orbit import CometOrbits
+from .observer import ObserverState
+
+__all__ = ["WINDOW_CONSTRAINTS", "findWindows"]
+
+# Constraints and the parameters they need
+WINDOW_CONSTRAINTS = {
+    "min_EL": ["EL"],
+    "max_sun_EL": [],
+    "min_elong": ["elong"],
+    "min_lunar_elong": ["lunar_elong"],
+}
+
+# Bisection steps are capped (2**-40 of a day is about 1e-7 s)
+_MAX_ITER = 40
+
+
+def sunAltitude(state):
+    """
+    Apparent altitude of the Sun [deg], shape (1, n_times) (or (n_times, 1) for
+    a diagonal state).
+    """
+
+    _, EL, _ = to_spherical(np.einsum("ij...,j...->i...", state.rotation, state.sun))
+
+    return np.degrees(EL)
+
+
+def _margin(ephemerides, catalog, state, constraints, accuracy):
+    """
+    Margin f [deg] of all comets at the epochs of a state.
+    """
+
+    params = [param for name in constraints for param in WINDOW_CONSTRAINTS[name]]
+
+    if params:
+        columns = ephemerides._compute(
+            CometOrbits(catalog, ephemerides.ts), state, catalog=catalog, params=params,
+            accuracy=accuracy)
+    else:
+        columns = dict()
+
+    margin = np.inf
+    if "min_EL" in constraints:
+        margin = np.minimum(margin, columns["EL"] - constraints["min_EL"])
+    if "max_sun_EL" in constraints:
+        margin = np.minimum(margin, constraints["max_sun_EL"] - sunAltitude(state))
+    if "min_elong" in constraints:
+        margin = np.minimum(margin, columns["elong"] - constraints["min_elong"])
+    if "min_lunar_elong" in constraints:
+        margin = np.minimum(margin, columns["lunar_elong"] - constraints["min_lunar_elong"])
+
+    return np.broadcast_to(margin, (len(catalog), len(state)))
+
+
+def findWindows(ephemerides, catalog, constraints, precision=0.1, accuracy="apparent"):
+    """
+    Find the observability windows of all comets.
+
+    Parameters
+    ----------
+    ephemerides : sbplan.ephemerides.core.CometEphemeridesClass
+        Ephemerides instance at the coarse time grid (kernel and site already
+        set). It is not modified: the catalog, parameters and accuracy are passed
+        to each evaluation.
+    catalog : astropy.table.table.Table
+        Comet catalog.
+    constraints : dict
+        Constraints (see `WINDOW_CONSTRAINTS`) [deg].
+    precision : float, optional
+        Precision of the window edges [s].
+    accuracy : str, optional
+        Accuracy tier (see `CometEphemeridesClass.get`).
+
+    Returns
+    -------
+    windows : astropy.table.table.Table
+        One row per window: "designation", "start" and "end" (`Time`), and
+        "duration" [h]. Windows are cut at the ends of the time grid.
+    """
+
+    ts, topos, kernel = ephemerides.ts, ephemerides.topos, ephemerides.DE421
+
+    # - Bracketing
+    # Offsets [d] from the first epoch, in TT (whole and fraction kept apart)
+    t = ephemerides.t
+    whole, fraction = np.atleast_1d(t.whole), np.atleast_1d(t.tt_fraction)
+    offset = (whole - whole[0]) + (fraction - fraction[0])
+    ok = _margin(ephemerides, catalog, ephemerides.state, constraints, accuracy) >= 0
+    rows, cols = np.nonzero(ok[:, 1:] != ok[:, :-1])
+
+    # - Refinement
+    lo, hi = offset[cols], offset[cols + 1]
+    ok_lo = ok[rows, cols]
+    subset = catalog[rows]
+    for _ in range(_MAX_ITER):
+        if (rows.shape[0] == 0) or (np.max(hi - lo) * 86400 <= precision):
+            break
+        mid = (lo + hi) / 2
+        state = ObserverState(ts.tt_jd(whole[0], fraction[0] + mid), topos, kernel).diagonal()
+        ok_mid = _margin(ephemerides, subset, state, constraints, accuracy)[:, 0] >= 0
+        same = ok_mid == ok_lo
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+
+    # Edges are kept inside the windows
+    edge = np.where(ok_lo, lo, hi)
+
+    # - Windows
+    # Along each comet, window starts (rising edges, or the first epoch) and 
+    # ends (falling edges, or the last epoch) alternate, so they pair up in order
+    first, last = np.nonzero(ok[:, 0])[0], np.nonzero(ok[:, -1])[0]
+    start_rows = np.concatenate([first, rows[~ok_lo]])
+    start_offsets = np.concatenate([np.zeros(first.shape[0]), edge[~ok_lo]])
+    end_rows = np.concatenate([rows[ok_lo], last])
+    end_offsets = np.concatenate([edge[ok_lo], np.full(last.shape[0], offset[-1])])
+    start_order = np.lexsort((start_offsets, start_rows))
+    end_order = np.lexsort((end_offsets, end_rows))
+    starts, ends = start_offsets[start_order], end_offsets[end_order]
+
+    start = ephemerides.time_tag.reshape(-1)[0].tt
+    windows = Table(
+        [
+            np.asarray(catalog["designation"]).astype(str)[start_rows[start_order]],
+            (start + TimeDelta(starts, format="jd")).utc,
+            (start + TimeDelta(ends, format="jd")).utc,
+            (ends - starts) * 24 * u.h,
+        ],
+        names=["designation", "start", "end", "duration"]
+    )
+
+    return windows
@@ -0,0 +1,37 @@
+"""
+Atomic writes of the files shared between processes (catalogs, caches, runs).
+"""
+
+import os, secrets
+
+__all__ = ["atomicWrite"]
+
+
+def atomicWrite(path, write, mode="w"):
+    """
+    Write a file atomically: `write` fills a temporary file in the same
+    directory, which then replaces `path`, so readers never see a partial file.
+
+    The temporary file is created exclusively by `open` (mode "x"), hence with
+    the usual permissions of new files (0666 masked by the umask).
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    write : callable
+        Called with the open temporary file.
+    mode : str, optional
+        "w" (text) or "wb" (binary).
+    """
+
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".tmp_{secrets.token_hex(8)}_{name}")
+    try:
+        with open(tmp_path, mode.replace("w", "x")) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
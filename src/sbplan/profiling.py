@@ -0,0 +1,275 @@
+"""
+Per-stage instrumentation of the catalog and ephemerides pipelines.
+
+Profiling is disabled by default; a disabled stage costs a single `with`
+statement on a shared no-op object. When enabled, each call of an instrumented
+method collects wall time, call counts and object counts per stage in a
+`Stats` object, which is stored on the instance (and on columnar results) as
+`stats` and passed to every registered hook:
+
+    >>> from sbplan import profiling
+    >>> profiling.enable()
+    >>> profiling.addHook(profiling.logHook)  # or any callable taking `Stats`
+    >>> ephemerides = CometEphemerides(time_tag, location)
+    >>> _, results = ephemerides.get(catalog, "RA", columnar=True)
+    >>> print(ephemerides.stats)  # same as `results.stats`
+"""
+
+import time, logging, threading
+from collections import OrderedDict
+
+__all__ = ["Stats", "enable", "disable", "isEnabled", "addHook", "removeHook", "logHook",
+           "profiler"]
+
+logger = logging.getLogger("sbplan.profiling")
+
+_ENABLED = False
+_HOOKS = list()
+_LOCK = threading.Lock()
+
+
+class Stats(object):
+    """
+    Wall time [s], call count and object count of each stage of a call.
+    Stages may nest (e.g., "parallel" includes the work of the workers), so
+    their times do not necessarily add up to `total`.
+    """
+
+
+    def __init__(self, name):
+        """
+        Initialize stats.
+
+        Parameters
+        ----------
+        name : str
+            Name of the instrumented call (e.g., "ephemerides.get").
+        """
+
+        super(Stats, self).__init__()
+
+        self.name = name
+        self.stages = OrderedDict()
+        self.total = 0.0
+
+
+    def add(self, stage, elapsed, objects=0):
+        """
+        Record a run of a stage.
+        """
+
+        record = self.stages.setdefault(stage, {"time": 0.0, "calls": 0, "objects": 0})
+        record["time"] += elapsed
+        record["calls"] += 1
+        record["objects"] += objects
+
+
+    def __getitem__(self, stage):
+
+        return self.stages[stage]
+
+
+    def __contains__(self, stage):
+
+        return stage in self.stages
+
+
+    def to_dict(self):
+        """
+        Stats as a dict (e.g., to export as metrics).
+        """
+
+        return {
+            "name": self.name, "total": self.total,
+            "stages": {stage: dict(record) for stage, record in self.stages.items()},
+        }
+
+
+    def __str__(self):
+
+        lines = [f"{self.name}: {self.total * 1e3:.3f} ms"]
+        for stage, record in self.stages.items():
+            lines.append(
+                f"  {stage:<20s} {record['time'] * 1e3:10.3f} ms {record['calls']:6d} calls "
+                f"{record['objects']:12d} objects")
+
+        return "\n".join(lines)
+
+
+class _Stage(object):
+    """
+    Context manager timing one run of a stage.
+    """
+
+    __slots__ = ("stats", "stage", "objects", "start")
+
+
+    def __init__(self, stats, stage, objects):
+
+        self.stats, self.stage, self.objects = stats, stage, objects
+
+
+    def __enter__(self):
+
+        self.start = time.perf_counter()
+
+        return self
+
+
+    def __exit__(self, *exc_info):
+
+        self.stats.add(self.stage, time.perf_counter() - self.start, self.objects)
+
+        return False
+
+
+class _NullStage(object):
+    """
+    No-op stage of the disabled mode.
+    """
+
+    __slots__ = ()
+
+
+    def __enter__(self):
+
+        return self
+
+
+    def __exit__(self, *exc_info):
+
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler(object):
+    """
+    Collects the stats of one instrumented call.
+    """
+
+
+    def __init__(self, name):
+
+        super(Profiler, self).__init__()
+
+        self.stats = Stats(name)
+        self._start = time.perf_counter()
+
+
+    def stage(self, stage, objects=0):
+        """
+        Context manager timing a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        objects : int, optional
+            Number of objects (e.g., comet-epochs) processed by the stage.
+        """
+
+        return _Stage(self.stats, stage, objects)
+
+
+    def finish(self):
+        """
+        Finish the call and pass the stats to the hooks.
+
+        Returns
+        -------
+        stats : Stats
+            Stats of the call.
+        """
+
+        self.stats.total = time.perf_counter() - self._start
+
+        with _LOCK:
+            hooks = list(_HOOKS)
+        for hook in hooks:
+            hook(self.stats)
+
+        return self.stats
+
+
+class _NullProfiler(object):
+    """
+    Profiler of the disabled mode.
+    """
+
+    stats = None
+
+
+    def stage(self, stage, objects=0):
+
+        return _NULL_STAGE
+
+
+    def finish(self):
+
+        return None
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def profiler(name):
+    """
+    Profiler of an instrumented call (a no-op profiler if profiling is disabled).
+    """
+
+    return Profiler(name) if _ENABLED else NULL_PROFILER
+
+
+def enable():
+    """
+    Enable profiling.
+    """
+
+    global _ENABLED
+
+    _ENABLED = True
+
+
+def disable():
+    """
+    Disable profiling.
+    """
+
+    global _ENABLED
+
+    _ENABLED = False
+
+
+def isEnabled():
+
+    return _ENABLED
+
+
+def addHook(hook):
+    """
+    Register a callable receiving the `Stats` of every instrumented call.
+    """
+
+    with _LOCK:
+        if hook not in _HOOKS:
+            _HOOKS.append(hook)
+
+
+def removeHook(hook):
+    """
+    Unregister a hook.
+    """
+
+    with _LOCK:
+        if hook in _HOOKS:
+            _HOOKS.remove(hook)
+
+
+def logHook(stats):
+    """
+    Hook logging the stats to the "sbplan.profiling" logger (level INFO).
+    """
+
+    logger.info("%s", stats)
@@ -0,0 +1,68 @@
+"""
+Scheduler
+-------
+
+:Author: Ruining ZHAO (rnzhao@nao.cas.cn)
+"""
+
+import importlib as _importlib
+
+# AstroPy
+import astropy.config as _config
+
+__all__ = ['schedule', 'visibilityMatrix', 'visibilityFromWindows', 'SchedulingProblem',
+           'GreedyScheduler', 'PriorityScheduler', 'conf']
+
+
+class Conf(_config.ConfigNamespace):
+    """
+    Configuration parameters for `sbplan.scheduler`.
+    """
+
+    min_EL = _config.ConfigItem(
+        30.0, cfgtype='float',
+        description=(
+            'Default altitude limit [deg] of the targets.'
+        )
+    )
+
+    setup_time = _config.ConfigItem(
+        60.0, cfgtype='float',
+        description=(
+            'Overhead [s] before each exposure (settling, readout, etc.), slew excluded.'
+        )
+    )
+
+    slew_rate = _config.ConfigItem(
+        1.0, cfgtype='float',
+        description=(
+            'Slew rate [deg/s] of the telescope.'
+        )
+    )
+
+
+conf = Conf()
+
+# Heavy dependencies are imported on first use
+_LAZY = {
+    'schedule': 'core', 'visibilityMatrix': 'core', 'visibilityFromWindows': 'core',
+    'SchedulingProblem': 'core', 'GreedyScheduler': 'core', 'PriorityScheduler': 'core',
+}
+
+
+def __getattr__(name):
+
+    if name in _LAZY:
+        value = getattr(_importlib.import_module(f'.{_LAZY[name]}', __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(_LAZY))
+
+
+del _config
@@ -0,0 +1,384 @@
+"""
+Night scheduler.
+
+A night is divided into slots (the steps of the time grid). A target is
+observable at slot t if it is visible (all constraints hold) over its whole
+exposure starting at t; this is computed for all targets and slots at once
+from cumulative sums of the visibility matrix. Schedulers then pick targets
+and start slots:
+
+- `GreedyScheduler` walks through the night and, at each free slot, starts
+  the highest-priority target that is observable after its overhead
+  (setup and slew from the previous target). Ties go to the shortest
+  overhead, then to the target whose visibility ends first.
+- `PriorityScheduler` places targets by decreasing priority, each at the
+  free slot with the best score (e.g., highest mean elevation) reserving
+  a fixed overhead before it.
+
+Schedulers are interchangeable: any object with a `schedule(problem)`
+method returning (rows, starts, overheads) can be passed to `schedule`.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+from astropy.time import Time, TimeDelta
+from astropy.table import Table
+
+from . import conf
+from ..ephemerides.culling import satisfies
+
+__all__ = ["schedule", "visibilityMatrix", "visibilityFromWindows", "SchedulingProblem",
+           "GreedyScheduler", "PriorityScheduler"]
+
+
+def _separation(ra1, dec1, ra2, dec2):
+    """
+    Angular separation [deg] (haversine).
+    """
+
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1, dec1, ra2, dec2))
+    h = np.sin((dec2 - dec1) / 2)**2 + np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2)**2
+
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0))))
+
+
+def visibilityMatrix(ephemerides, min_EL=None, max_Tmag=None, min_elong=None,
+                     min_lunar_elong=None, region=None):
+    """
+    Visibility of all targets at all epochs.
+
+    Parameters
+    ----------
+    ephemerides : sbplan.ephemerides.result.ColumnarEphemerides
+        Ephemerides with the parameters of the constraints.
+    min_EL, max_Tmag, min_elong, min_lunar_elong, region : optional
+        Constraints (see `CometEphemeridesClass.get`). `min_EL` defaults to
+        `conf.min_EL`.
+
+    Returns
+    -------
+    visible : numpy.ndarray
+        Boolean array of shape (n_targets, n_times).
+    """
+
+    constraints = {
+        name: value for name, value in {
+            "min_EL": conf.min_EL if min_EL is None else min_EL, "max_Tmag": max_Tmag,
+            "min_elong": min_elong, "min_lunar_elong": min_lunar_elong, "region": region,
+        }.items() if value is not None
+    }
+    for name, params in [("min_EL", ["EL"]), ("max_Tmag", ["Tmag"]), ("min_elong", ["elong"]),
+                         ("min_lunar_elong", ["lunar_elong"]), ("region", ["RA", "DEC"])]:
+        if (name in constraints) and any(param not in ephemerides.params for param in params):
+            raise ValueError(f"Parameters {params} are required for `{name}`.")
+
+    return np.broadcast_to(
+        satisfies(ephemerides.columns, constraints), ephemerides.shape).copy()
+
+
+def visibilityFromWindows(windows, time_tag):
+    """
+    Visibility matrix from observability windows (see
+    `CometEphemeridesClass.windows`).
+
+    Returns
+    -------
+    designation : numpy.ndarray
+        Designations of the targets, shape (n_targets,).
+    visible : numpy.ndarray
+        Boolean array of shape (n_targets, n_times).
+    """
+
+    designation, rows = np.unique(
+        np.asarray(windows["designation"]).astype(str), return_inverse=True)
+    jd = time_tag.reshape(-1).tt.jd
+    start, end = windows["start"].tt.jd, windows["end"].tt.jd
+
+    inside = (jd[None, :] >= start[:, None]) & (jd[None, :] <= end[:, None])
+    visible = np.zeros((designation.shape[0], jd.shape[0]), dtype=bool)
+    np.logical_or.at(visible, rows, inside)
+
+    return designation, visible
+
+
+class SchedulingProblem(object):
+    """
+    Targets, visibility and overheads of a night.
+    """
+
+
+    def __init__(self, designation, time_tag, visible, exposure, priority=None,
+                 setup=None, slew_rate=None, ra=None, dec=None, score=None):
+        """
+        Initialize a scheduling problem.
+
+        Parameters
+        ----------
+        designation : array_like
+            Designations of the targets, shape (n_targets,).
+        time_tag : astropy.time.core.Time
+            Evenly spaced time grid (one slot per epoch), shape (n_times,).
+        visible : numpy.ndarray
+            Visibility, shape (n_targets, n_times).
+        exposure : float or array_like
+            Exposure time [s] of the targets.
+        priority : array_like, optional
+            Priorities of the targets (higher first). Defaults to 1.
+        setup : float, optional
+            Overhead [s] before each exposure. Defaults to `conf.setup_time`.
+        slew_rate : float, optional
+            Slew rate [deg/s]. Defaults to `conf.slew_rate`.
+        ra, dec : numpy.ndarray, optional
+            Positions [deg] of the targets, shape (n_targets, n_times), for
+            slew times. Slews are free if not given.
+        score : numpy.ndarray, optional
+            Preference of the slots (e.g., elevation), shape
+            (n_targets, n_times).
+        """
+
+        super(SchedulingProblem, self).__init__()
+
+        self.designation = np.asarray(designation).astype(str)
+        self.time_tag = time_tag.reshape(-1)
+        self.visible = np.asarray(visible, dtype=bool)
+        n_targets, n_times = self.visible.shape
+        if (self.designation.shape[0] != n_targets) or (self.time_tag.shape[0] != n_times):
+            raise ValueError("Shapes of `designation`, `time_tag` and `visible` do not match.")
+
+        # Slot length [s]
+        if n_times > 1:
+            steps = np.diff(self.time_tag.tt.jd) * 86400
+            if np.ptp(steps) > 1e-3 * steps[0]:
+                raise ValueError("An evenly spaced `time_tag` is required.")
+            self.step = float(steps.mean())
+        else:
+            self.step = np.inf
+
+        self.exposure = np.broadcast_to(np.asarray(exposure, dtype=float), (n_targets, )).copy()
+        self.duration = np.maximum(np.ceil(self.exposure / self.step - 1e-9), 1).astype(int)
+        self.priority = np.broadcast_to(
+            np.asarray(1.0 if priority is None else priority, dtype=float), (n_targets, ))
+        self.setup = conf.setup_time if setup is None else float(setup)
+        self.slew_rate = conf.slew_rate if slew_rate is None else float(slew_rate)
+        self.ra, self.dec, self.score = ra, dec, score
+
+        # - Observable start slots
+        # window[k, t]: target k is visible from slot t to t + duration[k] - 1
+        counts = np.zeros((n_targets, n_times + 1), dtype=np.int32)
+        np.cumsum(self.visible, axis=1, out=counts[:, 1:])
+        slots = np.arange(n_times)
+        end = slots[None, :] + self.duration[:, None]
+        rows = np.arange(n_targets)[:, None]
+        self.window = (end <= n_times) & (
+            counts[rows, np.minimum(end, n_times)] - counts[:, :-1] == self.duration[:, None])
+        # Last observable start slot (-1 if never)
+        self.last = np.where(
+            self.window.any(axis=1), n_times - 1 - np.argmax(self.window[:, ::-1], axis=1), -1)
+
+
+    def __len__(self):
+
+        return self.designation.shape[0]
+
+
+    @property
+    def n_slots(self):
+
+        return self.visible.shape[1]
+
+
+    def slew(self, k, slot, rows=None):
+        """
+        Slew time [s] from target `k` (at `slot`) to other targets.
+        """
+
+        if (self.ra is None) or (self.dec is None) or (k is None):
+            return np.zeros(len(self) if rows is None else len(rows))
+
+        rows = slice(None) if rows is None else rows
+
+        return _separation(
+            self.ra[k, slot], self.dec[k, slot], self.ra[rows, slot], self.dec[rows, slot]
+        ) / self.slew_rate
+
+
+class GreedyScheduler(object):
+    """
+    Dispatch scheduler: at each free slot, start the best observable target.
+    """
+
+
+    def schedule(self, problem):
+        """
+        Schedule a night.
+
+        Parameters
+        ----------
+        problem : sbplan.scheduler.core.SchedulingProblem
+            Scheduling problem.
+
+        Returns
+        -------
+        rows, starts, overheads : numpy.ndarray
+            Targets, start slots (of the exposures) and overheads [s].
+        """
+
+        n_slots, step = problem.n_slots, problem.step
+        remaining = problem.last >= 0
+        rows, starts, overheads = list(), list(), list()
+
+        slot, previous = 0, None
+        while (slot < n_slots) and remaining.any():
+            candidates = np.nonzero(remaining & (problem.last >= slot))[0]
+            if candidates.shape[0] == 0:
+                break
+            overhead = problem.setup + problem.slew(previous, slot, candidates)
+            start = slot + np.ceil(overhead / step - 1e-9).astype(int)
+            ok = (start < n_slots) & problem.window[candidates, np.minimum(start, n_slots - 1)]
+
+            if ok.any():
+                candidates, start, overhead = candidates[ok], start[ok], overhead[ok]
+                best = np.lexsort(
+                    (problem.last[candidates], overhead, -problem.priority[candidates]))[0]
+                k = candidates[best]
+                rows.append(k)
+                starts.append(start[best])
+                overheads.append(overhead[best])
+                remaining[k] = False
+                previous, slot = k, start[best] + problem.duration[k]
+            else:
+                # Jump to the next slot at which a remaining target becomes observable
+                later = problem.window[candidates, slot + 1:].any(axis=0)
+                if not later.any():
+                    break
+                setup_slots = int(np.ceil(problem.setup / step - 1e-9))
+                slot = max(slot + 1, slot + 1 + int(np.argmax(later)) - setup_slots)
+
+        return np.array(rows, dtype=int), np.array(starts, dtype=int), np.array(overheads)
+
+
+class PriorityScheduler(object):
+    """
+    Priority-first scheduler: place targets by decreasing priority, each at the
+    free slot with the best mean score.
+    """
+
+
+    def __init__(self, slew_reserve=30.0):
+        """
+        Initialize a priority-first scheduler.
+
+        Parameters
+        ----------
+        slew_reserve : float, optional
+            Slew [deg] reserved before each exposure (added to the setup), as
+            the neighbouring targets are not known when a target is placed.
+        """
+
+        super(PriorityScheduler, self).__init__()
+
+        self.slew_reserve = slew_reserve
+
+
+    def schedule(self, problem):
+        """
+        Schedule a night (see `GreedyScheduler.schedule`).
+        """
+
+        n_slots, step = problem.n_slots, problem.step
+        overhead = problem.setup + self.slew_reserve / problem.slew_rate
+        gap = int(np.ceil(overhead / step - 1e-9))
+
+        # Mean score over each exposure
+        if problem.score is not None:
+            score_sum = np.zeros((len(problem), n_slots + 1))
+            np.cumsum(np.nan_to_num(problem.score), axis=1, out=score_sum[:, 1:])
+
+        # By decreasing priority, then fewest observable slots
+        order = np.lexsort((problem.window.sum(axis=1), -problem.priority))
+        busy = np.zeros(n_slots + 1, dtype=np.int32)
+        occupied = np.zeros(n_slots, dtype=bool)
+        rows, starts = list(), list()
+        slots = np.arange(n_slots)
+        for k in order:
+            if problem.last[k] < 0:
+                continue
+            duration = problem.duration[k]
+            # Free from the start of the overhead to the end of the exposure
+            np.cumsum(occupied, out=busy[1:])
+            lo = np.maximum(slots - gap, 0)
+            hi = np.minimum(slots + duration, n_slots)
+            ok = problem.window[k] & (busy[hi] - busy[lo] == 0)
+            if not ok.any():
+                continue
+            if problem.score is None:
+                start = int(np.argmax(ok))
+            else:
+                mean = (score_sum[k, hi] - score_sum[k, slots]) / duration
+                start = int(np.argmax(np.where(ok, mean, -np.inf)))
+            occupied[max(start - gap, 0):start + duration] = True
+            rows.append(k)
+            starts.append(start)
+
+        rows, starts = np.array(rows, dtype=int), np.array(starts, dtype=int)
+        order = np.argsort(starts)
+
+        return rows[order], starts[order], np.full(order.shape[0], overhead)
+
+
+def schedule(ephemerides, exposure, priority=None, scheduler=None, setup=None,
+             slew_rate=None, score="EL", **constraints):
+    """
+    Plan a night from ephemerides.
+
+    Parameters
+    ----------
+    ephemerides : sbplan.ephemerides.result.ColumnarEphemerides or sbplan.scheduler.core.SchedulingProblem
+        Ephemerides over an evenly spaced time grid (e.g., 1-min steps over a
+        night), with "EL" and the parameters of the constraints ("RA" and
+        "DEC" for slew times), or a prepared problem.
+    exposure : float or array_like
+        Exposure time [s] of the targets.
+    priority : array_like, optional
+        Priorities of the targets (higher first).
+    scheduler : object, optional
+        Scheduler (default: `GreedyScheduler()`).
+    setup, slew_rate : float, optional
+        Overhead [s] and slew rate [deg/s] (see `SchedulingProblem`).
+    score : str, optional
+        Parameter preferred high by `PriorityScheduler`.
+    **constraints
+        Constraints (see `visibilityMatrix`).
+
+    Returns
+    -------
+    plan : astropy.table.table.Table
+        One row per exposure in time order: "designation", "start", "end",
+        "exposure" [s], "overhead" [s] and "priority".
+    """
+
+    if isinstance(ephemerides, SchedulingProblem):
+        problem = ephemerides
+    else:
+        columns = ephemerides.columns
+        problem = SchedulingProblem(
+            ephemerides.designation, ephemerides.time_tag,
+            visibilityMatrix(ephemerides, **constraints), exposure, priority=priority,
+            setup=setup, slew_rate=slew_rate, ra=columns.get("RA"), dec=columns.get("DEC"),
+            score=columns.get(score))
+
+    scheduler = GreedyScheduler() if scheduler is None else scheduler
+    rows, starts, overheads = scheduler.schedule(problem)
+
+    start = problem.time_tag[starts] if rows.shape[0] else Time([], format="jd")
+    plan = Table(
+        [
+            problem.designation[rows], start, start + TimeDelta(problem.exposure[rows] * u.s),
+            problem.exposure[rows] * u.s, overheads * u.s, problem.priority[rows],
+        ],
+        names=["designation", "start", "end", "exposure", "overhead", "priority"]
+    )
+
+    return plan
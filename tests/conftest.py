@@ -0,0 +1,141 @@
+"""
+Shared fixtures. The tests run offline: the planetary kernel is the synthetic
+one of the benchmarks (see `benchmarks.common`), and downloads are served by
+local stand-in servers (`StandInServer`).
+"""
+
+import pytest
+
+from benchmarks.common import LOCATION, libDir, syntheticCatalog, timeGrid
+
+
+@pytest.fixture(scope="session")
+def lib_dir():
+
+    from sbplan.ephemerides import CometEphemeridesClass
+
+    CometEphemeridesClass.LIB_DIR = libDir()
+
+    return CometEphemeridesClass.LIB_DIR
+
+
+@pytest.fixture
+def ephemerides(lib_dir):
+
+    from sbplan.ephemerides import CometEphemeridesClass
+
+    return CometEphemeridesClass(timeGrid(13), LOCATION)
+
+
+@pytest.fixture(scope="session")
+def catalog():
+
+    from sbplan.catalog.utils import toSkyfieldFormat
+
+    return toSkyfieldFormat(syntheticCatalog(100, seed=1), "jpl")
+
+
+def sbdbResponse(table, version="1.1"):
+    """
+    SBDB query response (JSON text) of a catalog in JPL format: values as
+    strings, masked values as null.
+    """
+
+    import json
+    # NumPy
+    import numpy as np
+
+    columns = [
+        [None if masked else str(value) for value, masked in zip(
+            np.ma.getdata(table[name]).tolist(), np.ma.getmaskarray(table[name]).tolist())]
+        for name in table.colnames
+    ]
+
+    return json.dumps({
+        "signature": {"source": "NASA/JPL SBDB Query API", "version": version},
+        "count": len(table), "fields": table.colnames, "data": [list(row) for row in zip(*columns)],
+    })
+
+
+class StandInServer(object):
+    """
+    Local HTTP server standing in for the SBDB query API. `respond(query)` 
+    returns (status, body, mode) for each request, with the query decoded from
+    the request body (as sent by `astroquery`) and mode "length" (plain 
+    response), "chunked" (chunked transfer) or "truncated" (connection closed 
+    in the middle of a chunked transfer).
+    """
+
+
+    def __init__(self, respond):
+
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs
+
+        server = self
+        self.respond, self.requests = respond, list()
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                size = int(self.headers.get("Content-Length") or 0)
+                query = {
+                    key: value[0] for key, value in parse_qs(self.rfile.read(size).decode()).items()}
+                server.requests.append(query)
+                status, body, mode = server.respond(query)
+                body = body.encode() if isinstance(body, str) else body
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if mode == "length":
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                # Small chunks, split anywhere (inside numbers and strings)
+                chunks = [body[k:k + 97] for k in range(0, len(body), 97)]
+                if mode == "truncated":
+                    chunks = chunks[:len(chunks) // 2]
+                for chunk in chunks:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                if mode == "truncated":
+                    self.close_connection = True
+                    return
+                self.wfile.write(b"0\r\n\r\n")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+
+    def close(self):
+
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stand_in_server():
+    """
+    Factory of `StandInServer`s (shut down after the test).
+    """
+
+    servers = list()
+
+    def start(respond):
+        servers.append(StandInServer(respond))
+        return servers[-1]
+
+    yield start
+
+    for server in servers:
+        server.close()
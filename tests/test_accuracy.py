@@ -0,0 +1,92 @@
+"""
+Accuracy tiers against "apparent" (bounds documented in
+`CometEphemeridesClass.get`) and "apparent" against the stored `skyfield`
+positions.
+"""
+
+# NumPy
+import numpy as np
+# AstroPy
+from astropy.time import Time
+import pytest
+
+from sbplan.ephemerides import CometEphemeridesClass
+
+from benchmarks.common import LOCATION
+from benchmarks.reference import readReference, referenceCatalog
+
+PARAMS = ["RA", "DEC", "AZ", "EL", "elong", "r", "Tmag"]
+
+# Documented bounds of the reduced tiers: position (on-sky separation) and
+# elongation ["], r [au] and Tmag [mag]
+POSITION, ELONG, R, TMAG = 25.0, 45.0, 2e-4, 1e-3
+
+
+def _separation(lon1, lat1, lon2, lat2):
+    """
+    Angular separation ["] of positions in [deg].
+    """
+
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    hav = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+
+    return np.degrees(2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1)))) * 3600
+
+
+def _angle(a, b):
+    """
+    Difference ["] of angles in [deg] (wrapped at 360 deg).
+    """
+
+    return np.abs((a - b + 180) % 360 - 180) * 3600
+
+
+@pytest.fixture(scope="module")
+def tiers(lib_dir):
+
+    reference = readReference()
+    # 3-day steps through 2024
+    time_tag = Time(reference["epochs_tt"][0], format="jd", scale="tt") + np.arange(0, 366, 3)
+    ephemerides = CometEphemeridesClass(time_tag, LOCATION)
+
+    return {
+        accuracy: ephemerides.get(referenceCatalog(), PARAMS, accuracy=accuracy, columnar=True)[1]
+        for accuracy in ["apparent", "astrometric", "fast"]
+    }
+
+
+@pytest.mark.parametrize("accuracy", ["astrometric", "fast"])
+def test_reduced_tiers(tiers, accuracy):
+
+    apparent, result = tiers["apparent"], tiers[accuracy]
+
+    # On-sky separation (the documented bound)
+    assert np.max(_separation(result["RA"], result["DEC"], apparent["RA"], apparent["DEC"])) < POSITION
+    assert np.max(_separation(result["AZ"], result["EL"], apparent["AZ"], apparent["EL"])) < POSITION
+    assert np.max(_angle(result["DEC"], apparent["DEC"])) < POSITION
+    assert np.max(_angle(result["EL"], apparent["EL"])) < POSITION
+    # RA and AZ scale with 1 / cos(DEC) and 1 / cos(EL)
+    assert np.max(
+        _angle(result["RA"], apparent["RA"]) * np.cos(np.radians(apparent["DEC"]))) < POSITION
+    assert np.max(
+        _angle(result["AZ"], apparent["AZ"]) * np.cos(np.radians(apparent["EL"]))) < POSITION
+
+    assert np.max(_angle(result["elong"], apparent["elong"])) < ELONG
+    assert np.max(np.abs(result["r"] - apparent["r"])) < R
+    assert np.max(np.abs(result["Tmag"] - apparent["Tmag"])) < TMAG
+
+
+def test_apparent(lib_dir):
+
+    reference = readReference()
+    ephemerides = CometEphemeridesClass(
+        Time(reference["epochs_tt"], format="jd", scale="tt"), LOCATION)
+    _, result = ephemerides.get(referenceCatalog(), ["RA", "DEC", "delta"], columnar=True)
+    rows = [result.index(pdes) for pdes in reference["designation"]]
+
+    # 1 mas and 1e-8 au
+    separation = _separation(
+        result["RA"][rows], result["DEC"][rows], np.array(reference["RA"]), 
+        np.array(reference["DEC"]))
+    assert np.max(separation) < 1e-3
+    assert np.max(np.abs(result["delta"][rows] - np.array(reference["delta"]))) < 1e-8
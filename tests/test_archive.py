@@ -0,0 +1,81 @@
+import os, json, zipfile
+
+# NumPy
+import numpy as np
+import pytest
+
+from sbplan.ephemerides import EphemerisRun
+
+PARAMS = ["RA", "DEC", "Tmag"]
+
+
+def _export(ephemerides, catalog, path):
+
+    shape = ephemerides.export(
+        str(path), catalog, PARAMS, time_grid=ephemerides.time_tag, chunk_size=5)
+    _, expected = ephemerides.get(catalog, PARAMS, columnar=True)
+
+    return shape, expected
+
+
+def _assertRun(run, expected):
+
+    n_comets, n_times = expected[PARAMS[0]].shape
+    assert run.shape == (n_comets, n_times, len(PARAMS))
+    for param in PARAMS:
+        np.testing.assert_array_equal(run[param], expected[param])
+    for k in (0, n_comets // 2, n_comets - 1):
+        table = run.comet(expected.designation[k])
+        for param in PARAMS:
+            np.testing.assert_array_equal(table[param], expected[param][k])
+    for k in (0, n_times - 1):
+        table = run.epoch(k)
+        np.testing.assert_array_equal(table["designation"], expected.designation)
+        for param in PARAMS:
+            np.testing.assert_array_equal(table[param], expected[param][:, k])
+
+
+def test_layout(ephemerides, catalog, tmp_path, monkeypatch):
+
+    # Blocks of a few comets gathered from chunks of 5 epochs
+    monkeypatch.setattr("sbplan.ephemerides.archive.BLOCK_SIZE", 1000)
+    shape, expected = _export(ephemerides, catalog, tmp_path / "run.npz")
+    assert shape == (len(catalog), len(ephemerides.time_tag), len(PARAMS))
+
+    run = EphemerisRun(str(tmp_path / "run.npz"))
+    _assertRun(run, expected)
+    # A comet is contiguous
+    assert run.values[len(run) // 2].flags["C_CONTIGUOUS"]
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(tmp_path / "run.npz").st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_format_version(ephemerides, catalog, tmp_path):
+
+    _export(ephemerides, catalog, tmp_path / "run.npz")
+
+    # Runs of another layout are not read
+    with zipfile.ZipFile(tmp_path / "run.npz") as source, \
+         zipfile.ZipFile(tmp_path / "old.npz", mode="w") as archive:
+        for name in source.namelist():
+            if name == "meta.json":
+                meta = json.loads(source.read(name))
+                archive.writestr(name, json.dumps(dict(meta, format_version=1)))
+            else:
+                archive.writestr(name, source.read(name))
+
+    with pytest.raises(ValueError):
+        EphemerisRun(str(tmp_path / "old.npz"))
+
+
+def test_failure(ephemerides, catalog, tmp_path):
+
+    from sbplan.ephemerides.archive import writeRun
+
+    # Neither a partial run nor a spool file is left behind
+    _, results = ephemerides.get(catalog, PARAMS, columnar=True)
+    with pytest.raises(ValueError):
+        writeRun(str(tmp_path / "run.npz"), [(ephemerides.time_tag, results)], n_times=100)
+    assert os.listdir(tmp_path) == list()
@@ -0,0 +1,162 @@
+import os, json
+
+# NumPy
+import numpy as np
+import pytest
+# requests
+import requests
+
+from sbplan.catalog import AsteroidCatalogClass
+from sbplan.catalog.utils import toSkyfieldFormat
+
+from benchmarks.common import syntheticCatalog
+from conftest import sbdbResponse
+
+PAGE_SIZE = 40
+
+
+def _asteroids(n, seed=5):
+    """
+    Asteroid catalog in JPL format (pdes, tp, q, e, w, om, i, H, G, orbit_id):
+    numbered if H < 16 (provisional designations otherwise), G missing for
+    some, and an orbit class per row (not a field).
+    """
+
+    rng = np.random.default_rng(seed)
+
+    catalog = syntheticCatalog(n, seed=seed)
+    catalog.remove_columns(["M1", "K1"])
+    catalog["e"] = rng.uniform(0.0, 0.6, n)
+    H = rng.uniform(10, 22, n)
+    catalog["pdes"] = [
+        str(k + 1) if H[k] < 16 else f"{2000 + k % 25} A{chr(65 + k % 24)}{k}" for k in range(n)]
+    catalog.add_column(H, name="H", index=7)
+    catalog.add_column(
+        np.ma.masked_array(rng.uniform(-0.1, 0.5, n), mask=np.arange(n) % 4 == 0),
+        name="G", index=8)
+
+    return catalog, np.array(["MBA", "APO", "AMO"])[np.arange(n) % 3]
+
+
+def _server(catalog, classes, fail=()):
+    """
+    Paged SBDB responses ("limit", "limit-from", "sb-class" and H limits in
+    "sb-cdata"), failing with HTTP 400 once for the pages in `fail`.
+    """
+
+    fail = set(fail)
+
+    def respond(query):
+        rows = np.ones(len(catalog), dtype=bool)
+        if "sb-class" in query:
+            rows &= np.isin(classes, query["sb-class"].split(","))
+        if "sb-cdata" in query:
+            _, _, max_H = json.loads(query["sb-cdata"])["AND"][0].split("|")
+            rows &= catalog["H"] < float(max_H)
+        start = int(query["limit-from"])
+        if start in fail:
+            fail.remove(start)
+            return 400, "", "length"
+        return 200, sbdbResponse(catalog[rows][start:start + int(query["limit"])]), "chunked"
+
+    return respond
+
+
+def _catalogClass(url, tmp_path):
+
+    asteroid_catalog = AsteroidCatalogClass()
+    asteroid_catalog.QUERY_URL, asteroid_catalog.CATALOG_DIR = url, str(tmp_path)
+    asteroid_catalog.PAGE_SIZE = PAGE_SIZE
+
+    return asteroid_catalog
+
+
+def _assertCatalog(catalog, expected):
+
+    assert catalog.colnames == expected.colnames
+    assert catalog["pdes"].dtype.kind == "U"
+    assert list(catalog["pdes"]) == list(expected["pdes"])
+    for name in ["tp", "q", "e", "w", "om", "i", "H"]:
+        np.testing.assert_array_equal(catalog[name], expected[name])
+    np.testing.assert_array_equal(catalog["G"].mask, expected["G"].mask)
+    np.testing.assert_array_equal(
+        catalog["G"].filled(np.nan), expected["G"].filled(np.nan))
+
+
+@pytest.mark.parametrize("n", [100, 120])
+def test_pages(stand_in_server, tmp_path, n):
+
+    expected, classes = _asteroids(n)
+    server = stand_in_server(_server(expected, classes))
+
+    _assertCatalog(_catalogClass(server.url, tmp_path).get("all"), expected)
+    # A short (or empty) final page ends the download
+    assert [int(query["limit-from"]) for query in server.requests] == list(range(0, n + 1, PAGE_SIZE))
+    assert all(query["sb-kind"] == "a" for query in server.requests)
+    assert not os.path.exists(tmp_path / "asteroid_catalog_all.pages")
+
+
+def test_resume(stand_in_server, tmp_path):
+
+    expected, classes = _asteroids(100)
+    server = stand_in_server(_server(expected, classes, fail=[40]))
+    asteroid_catalog = _catalogClass(server.url, tmp_path)
+
+    with pytest.raises(requests.HTTPError):
+        asteroid_catalog.update("all")
+    # Only the missing pages are fetched again
+    _assertCatalog(asteroid_catalog.get("all"), expected)
+    assert [int(query["limit-from"]) for query in server.requests] == [0, 40, 40, 80]
+
+
+def test_filters(stand_in_server, tmp_path):
+
+    expected, classes = _asteroids(300)
+    server = stand_in_server(_server(expected, classes))
+    asteroid_catalog = _catalogClass(server.url, tmp_path)
+
+    # All designations are numbers
+    bright = (expected["H"] < 16) & np.isin(classes, ["AMO", "APO"])
+    catalog = asteroid_catalog.get("neo", max_H=16, orbit_class=["APO", "AMO"])
+    _assertCatalog(catalog, expected[bright])
+    assert server.requests[0]["sb-class"] == "AMO,APO"
+
+    # Stored filters (no download), then other filters (download)
+    n_requests = len(server.requests)
+    _assertCatalog(asteroid_catalog.get("neo"), expected[bright])
+    assert len(server.requests) == n_requests
+    catalog = asteroid_catalog.get("neo", max_H=18, orbit_class=["APO", "AMO"])
+    _assertCatalog(catalog, expected[(expected["H"] < 18) & np.isin(classes, ["AMO", "APO"])])
+    assert len(server.requests) > n_requests
+
+
+def test_changes(stand_in_server, tmp_path):
+
+    expected, classes = _asteroids(100)
+    server = stand_in_server(_server(expected, classes))
+    asteroid_catalog = _catalogClass(server.url, tmp_path)
+
+    asteroid_catalog.update("all")
+    # Whole-catalog invalidation
+    assert asteroid_catalog.changes("all") == {"revision": 1, "changed": None, "removed": None}
+    assert asteroid_catalog.changes("all", since=1) == {"revision": 1, "changed": [], "removed": []}
+    # Same content, same revision
+    asteroid_catalog.update("all")
+    assert asteroid_catalog.changes("all")["revision"] == 1
+
+
+def test_magnitude(stand_in_server, tmp_path, ephemerides):
+
+    expected, classes = _asteroids(100)
+    server = stand_in_server(_server(expected, classes))
+    catalog = toSkyfieldFormat(_catalogClass(server.url, tmp_path).get("all"), "jpl")
+
+    _, results = ephemerides.get(catalog, ["Tmag", "delta", "r", "alpha"], columnar=True)
+
+    # H, G system, G = 0.15 if missing
+    H = np.asarray(expected["H"])[:, None]
+    G = expected["G"].filled(0.15)[:, None]
+    tan_half = np.tan(np.radians(results["alpha"]) / 2)
+    V = H + 5 * np.log10(results["r"] * results["delta"]) - 2.5 * np.log10(
+        (1 - G) * np.exp(-3.33 * tan_half**0.63) + G * np.exp(-1.87 * tan_half**1.22))
+    np.testing.assert_allclose(results["Tmag"], V, rtol=0, atol=1e-9)
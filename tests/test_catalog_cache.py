@@ -0,0 +1,75 @@
+import os
+
+# NumPy
+import numpy as np
+# AstroPy
+from astropy.table import Table
+
+from sbplan.catalog.cache import (
+    FORMAT_VERSION, catalogPaths, clearCache, readCatalog, readMeta, writeCatalog)
+
+CSV = """pdes,tp,q,M1,number,prefix,orbit_id
+1P,2446470.95,0.57,,1,P,JPL 1
+2P,2460240.54,0.34,14.2,,,
+C/2020 F3,2459034.18,0.29,8.1,3,C,JPL 3
+"""
+
+
+def _assertSame(table, expected):
+
+    assert table.colnames == expected.colnames
+    for name in expected.colnames:
+        assert table[name].dtype == expected[name].dtype, name
+        np.testing.assert_array_equal(
+            np.ma.getmaskarray(table[name]), np.ma.getmaskarray(expected[name]))
+        np.testing.assert_array_equal(
+            np.ma.filled(table[name]), np.ma.filled(expected[name]))
+
+
+def test_masked_columns(tmp_path):
+
+    paths = catalogPaths(str(tmp_path), "obs")
+    with open(paths["csv"], "w") as f:
+        f.write(CSV)
+    expected = Table.read(paths["csv"], format="ascii.csv")
+    # Masked float, int and string columns
+    assert {name for name in expected.colnames if np.ma.getmaskarray(expected[name]).any()} == {
+        "M1", "number", "prefix", "orbit_id"}
+
+    clearCache()
+    # Built from the CSV, then memory-mapped from the binary cache
+    for copy in [True, False]:
+        _assertSame(readCatalog(str(tmp_path), "obs", copy=copy), expected)
+    clearCache()
+    assert os.path.exists(paths["npy"])
+    _assertSame(readCatalog(str(tmp_path), "obs", copy=False), expected)
+
+
+def test_permissions(tmp_path):
+
+    paths = catalogPaths(str(tmp_path), "obs")
+    writeCatalog(paths, Table.read(CSV, format="ascii.csv"), dict())
+    clearCache()
+    readCatalog(str(tmp_path), "obs")
+
+    # Shared catalog directories: modes follow the umask (not 0600)
+    umask = os.umask(0)
+    os.umask(umask)
+    for key in ["csv", "npy", "json", "stamp"]:
+        assert os.stat(paths[key]).st_mode & 0o777 == 0o666 & ~umask, key
+
+
+def test_read_leaves_metadata(tmp_path):
+
+    paths = catalogPaths(str(tmp_path), "obs")
+    writeCatalog(paths, Table.read(CSV, format="ascii.csv"), dict())
+    with open(paths["json"], "r") as f:
+        meta = f.read()
+
+    # Building the binary cache must not rewrite the metadata of a concurrent
+    # update
+    clearCache()
+    readCatalog(str(tmp_path), "obs")
+    with open(paths["json"], "r") as f:
+        assert f.read() == meta
+    assert readMeta(paths["stamp"])["format"] == FORMAT_VERSION
@@ -0,0 +1,118 @@
+import json
+
+# NumPy
+import numpy as np
+import pytest
+# requests
+import requests
+
+from sbplan.catalog import CometCatalogClass
+from sbplan.catalog.download import decodeJSONStream
+
+from benchmarks.common import syntheticCatalog
+from conftest import sbdbResponse
+
+# Multi-byte characters and a null, split across chunks
+CATALOG = syntheticCatalog(300, seed=3)
+CATALOG["pdes"][1] = "C/2001 é漢"
+CATALOG["orbit_id"] = np.ma.masked_array(CATALOG["orbit_id"], mask=np.arange(300) % 7 == 0)
+RESPONSE = sbdbResponse(CATALOG)
+
+
+def _catalogClass(url, tmp_path):
+
+    comet_catalog = CometCatalogClass()
+    comet_catalog.QUERY_URL, comet_catalog.CATALOG_DIR = url, str(tmp_path)
+    comet_catalog.RETRY_BACKOFF = 0.01
+
+    return comet_catalog
+
+
+def _script(*responses):
+    """
+    Respond with `responses` in turn, then with the last one.
+    """
+
+    responses = list(responses)
+
+    return lambda query: responses.pop(0) if len(responses) > 1 else responses[0]
+
+
+def _assertCatalog(catalog_dict, columns):
+
+    expected = json.loads(RESPONSE)
+    assert catalog_dict == {key: value for key, value in expected.items() if key != "data"}
+    assert [list(row) for row in zip(*columns)] == expected["data"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_decode_stream(chunk_size):
+
+    body = RESPONSE.encode()
+    _assertCatalog(*decodeJSONStream(body[k:k + chunk_size] for k in range(0, len(body), chunk_size)))
+
+
+def test_decode_truncated():
+
+    with pytest.raises(ValueError):
+        decodeJSONStream([RESPONSE[:len(RESPONSE) // 2].encode()])
+
+
+def test_stream(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script((200, RESPONSE, "chunked")))
+    _assertCatalog(*_catalogClass(server.url, tmp_path)._download("obs"))
+
+    # The catalog type sets the query
+    assert server.requests[0]["sb-kind"] == "c"
+    assert "sb-cdata" in server.requests[0]
+
+
+def test_retry_unavailable(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script(
+        (503, "", "length"), (503, "", "length"), (200, RESPONSE, "chunked")))
+    _assertCatalog(*_catalogClass(server.url, tmp_path)._download("obs"))
+
+    assert len(server.requests) == 3
+
+
+def test_retry_truncated(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script((200, RESPONSE, "truncated"), (200, RESPONSE, "chunked")))
+    _assertCatalog(*_catalogClass(server.url, tmp_path)._download("obs"))
+
+    assert len(server.requests) == 2
+
+
+def test_give_up(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script((503, "", "length")))
+    comet_catalog = _catalogClass(server.url, tmp_path)
+    comet_catalog.RETRIES = 2
+
+    with pytest.raises(requests.HTTPError):
+        comet_catalog._download("obs")
+    assert len(server.requests) == 3
+
+
+def test_no_retry(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script((400, "", "length")))
+
+    with pytest.raises(requests.HTTPError):
+        _catalogClass(server.url, tmp_path)._download("obs")
+    assert len(server.requests) == 1
+
+
+def test_update(stand_in_server, tmp_path):
+
+    server = stand_in_server(_script((503, "", "length"), (200, RESPONSE, "chunked")))
+    comet_catalog = _catalogClass(server.url, tmp_path)
+
+    catalog = comet_catalog.get("obs")
+    assert list(catalog["pdes"]) == list(CATALOG["pdes"])
+    assert catalog["orbit_id"].mask.sum() == CATALOG["orbit_id"].mask.sum()
+    # The concurrent path (one download per catalog type)
+    comet_catalog.update(["obs", "all"], workers=2)
+    assert len(server.requests) == 4
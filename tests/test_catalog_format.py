@@ -0,0 +1,156 @@
+"""
+`toSkyfieldFormat` and `readCometEls` against the original implementation on
+the pandas path (`skyfield.data.mpc.load_comets_dataframe`).
+"""
+
+import io, re, gzip
+
+# NumPy
+import numpy as np
+import pytest
+# AstroPy
+from astropy.time import Time
+from astropy.table import Table, vstack
+# Skyfield
+from skyfield.data.mpc import load_comets_dataframe
+
+from sbplan.catalog.mpc import readCometEls
+from sbplan.catalog.utils import toSkyfieldFormat
+
+from benchmarks.bench_catalog import cometEls, mpcCatalog
+from benchmarks.common import syntheticCatalog
+
+DESIGNATIONS = [
+    "100P/Hartley", "9P/Tempel", "73P-C/Schwassmann-Wachmann", "10P/Tempel",
+    "73P-B/Schwassmann-Wachmann", "2I/Borisov", "1I/'Oumuamua", "C/2023 A3 (Tsuchinshan-ATLAS)",
+    "P/2010 H2 (Vales)", "C/2020 F3 (NEOWISE)", "D/1993 F2-A (Shoemaker-Levy 9)", "1P/Halley",
+]
+# Rows repeated later in the file with other orbits
+DUPLICATES = [0, 2, 5, 7, 7, 11]
+
+
+def _toSkyfieldFormat(catalog, database):
+    """
+    Original `toSkyfieldFormat`, except for the stable sort of the MPC path:
+    the last orbit of each comet is kept (the original unstable sort kept an
+    arbitrary one).
+    """
+
+    if database == "jpl":
+        perihelion_time = Time(catalog["tp"].data, scale="tdb", format="jd").tt.ymdhms
+        catalog["perihelion_year"]  = np.array([time[0] for time in perihelion_time])
+        catalog["perihelion_month"] = np.array([time[1] for time in perihelion_time])
+        catalog["perihelion_day"]   = np.array(
+            [((time[5] / 60 + time[4]) / 60 + time[3]) / 24 + time[2] for time in perihelion_time]
+        )
+        del catalog["tp"]
+        catalog.rename_columns(
+            names=["pdes", "q", "e", "w", "om", "i", "M1", "K1", "orbit_id"],
+            new_names=[
+                "designation", "perihelion_distance_au", "eccentricity",
+                "argument_of_perihelion_degrees", "longitude_of_ascending_node_degrees",
+                "inclination_degrees", "magnitude_g", "magnitude_k", "reference"
+            ]
+        )
+        return catalog[
+            "designation", "perihelion_year", "perihelion_month", "perihelion_day",
+            "perihelion_distance_au", "eccentricity",
+            "argument_of_perihelion_degrees", "longitude_of_ascending_node_degrees",
+            "inclination_degrees", "magnitude_g", "magnitude_k", "reference"
+        ]
+
+    pdes_list = list()
+    for designation in catalog["designation"].data:
+        if re.search(r"^\d+[PI]", designation.split("/")[0]):
+            pdes_list.append(designation.split("/")[0])
+        else:
+            pdes_list.append(designation.split("/")[1].split(" (")[0])
+    catalog["designation"] = pdes_list
+    catalog["magnitude_k"] *= 2.5
+
+    catalog.sort("designation", kind="stable")
+    catalog = catalog.group_by(["designation"])
+    catalog = catalog[catalog.groups.indices[1:] - 1]
+
+    idx_numbered, idx_unnumbered, idx_interstellar = list(), list(), list()
+    for i, pdes in enumerate(catalog["designation"].data):
+        if re.search(r"^\d+P", pdes):
+            idx_numbered.append(i)
+        elif re.search(r"^\d+I", pdes):
+            idx_interstellar.append(i)
+        else:
+            idx_unnumbered.append(i)
+
+    def padded(sub):
+        pdes_list = list()
+        for pdes in sub["designation"].data:
+            number = re.search(r"^\d+", pdes).group()
+            pdes_list.append(pdes.replace(number, f"{int(number):08d}"))
+        return sub[sorted(range(len(pdes_list)), key=pdes_list.__getitem__)]
+
+    return vstack([
+        padded(catalog[idx_numbered]), catalog[idx_unnumbered],
+        padded(catalog[idx_interstellar])])
+
+
+@pytest.fixture(scope="module")
+def text():
+    """
+    `CometEls.txt` of a few comets, some of them repeated with other orbits.
+    """
+
+    catalog = mpcCatalog(len(DESIGNATIONS))[:len(DESIGNATIONS)]
+    catalog["designation"] = DESIGNATIONS
+    duplicates = catalog[DUPLICATES]
+    duplicates["perihelion_distance_au"] += 0.1 * (1 + np.arange(len(DUPLICATES)))
+
+    return cometEls(vstack([catalog, duplicates]))
+
+
+def _expected(text):
+
+    return _toSkyfieldFormat(Table.from_pandas(load_comets_dataframe(io.BytesIO(text))), "mpc")
+
+
+def _assertCatalog(catalog, expected):
+
+    assert catalog.colnames == expected.colnames
+    for name in catalog.colnames:
+        assert catalog[name].dtype.kind == expected[name].dtype.kind
+        np.testing.assert_array_equal(catalog[name], expected[name])
+
+
+def test_mpc(text):
+
+    expected = _expected(text)
+    assert len(expected) == len(DESIGNATIONS)
+    # Numbered comets first, interstellar objects last, last orbits kept
+    assert list(expected["designation"][:6]) == ["1P", "9P", "10P", "73P-B", "73P-C", "100P"]
+    assert list(expected["designation"][-2:]) == ["1I", "2I"]
+    lines = load_comets_dataframe(io.BytesIO(text))
+    for designation, pdes in [("100P/Hartley", "100P"), ("73P-C/Schwassmann-Wachmann", "73P-C"),
+                              ("2I/Borisov", "2I"), ("C/2023 A3 (Tsuchinshan-ATLAS)", "2023 A3"),
+                              ("1P/Halley", "1P")]:
+        q = lines["perihelion_distance_au"][lines["designation"] == designation]
+        assert q.nunique() > 1
+        assert expected["perihelion_distance_au"][expected["designation"] == pdes] == q.iloc[-1]
+
+    _assertCatalog(toSkyfieldFormat(
+        Table.from_pandas(load_comets_dataframe(io.BytesIO(text))), "mpc"), expected)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+@pytest.mark.parametrize("block_size", [256, 2**20])
+def test_read(text, compressed, block_size):
+
+    source = io.BytesIO(gzip.compress(text) if compressed else text)
+
+    _assertCatalog(readCometEls(source, block_size=block_size), _expected(text))
+
+
+def test_jpl():
+
+    catalog = syntheticCatalog(50, seed=3)
+
+    _assertCatalog(
+        toSkyfieldFormat(catalog.copy(), "jpl"), _toSkyfieldFormat(catalog.copy(), "jpl"))
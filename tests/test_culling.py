@@ -0,0 +1,10 @@
+def test_counts_reset(ephemerides, catalog):
+
+    ephemerides.get(catalog, ["Tmag"], max_Tmag=10, min_EL=30)
+    assert set(ephemerides.culled) == {"elements", "geometric", "apparent"}
+    assert sum(ephemerides.culled.values()) + len(ephemerides.catalog) == len(catalog)
+
+    # A later call without constraints does not report the previous counts
+    ephemerides.get(catalog, ["Tmag"])
+    assert ephemerides.culled == dict()
+    assert len(ephemerides.catalog) == len(catalog)
@@ -0,0 +1,28 @@
+import os
+
+# NumPy
+import numpy as np
+
+from sbplan.ephemerides import EphemerisCache
+
+PARAMS = ["RA", "DEC", "Tmag"]
+
+
+def test_cached_rerun(ephemerides, catalog, tmp_path):
+
+    cache = EphemerisCache(str(tmp_path))
+    _, expected = ephemerides.get(catalog, PARAMS, columnar=True)
+    _, first = ephemerides.get(catalog, PARAMS, columnar=True, cache=cache)
+    _, second = ephemerides.get(catalog, PARAMS, columnar=True, cache=cache)
+
+    for param in PARAMS:
+        np.testing.assert_array_equal(first[param], expected[param])
+        np.testing.assert_array_equal(second[param], expected[param])
+
+    # Bundles of a shared cache directory are readable by the other users
+    umask = os.umask(0)
+    os.umask(umask)
+    bundles = [name for name in os.listdir(tmp_path) if name.endswith(".npz")]
+    assert bundles
+    for name in bundles:
+        assert os.stat(tmp_path / name).st_mode & 0o777 == 0o666 & ~umask
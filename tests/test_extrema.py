@@ -0,0 +1,25 @@
+# NumPy
+import numpy as np
+
+from sbplan.ephemerides import CometEphemeridesClass
+
+from benchmarks.common import LOCATION, timeGrid
+
+
+def test_instance_unchanged(ephemerides, catalog):
+
+    ephemerides.get(catalog[:10], ["RA", "DEC"], accuracy="fast")
+    extrema = ephemerides.extrema(catalog, "EL", "max", params=["Tmag"])
+
+    # `extrema` leaves the state of the last `get` as it was
+    assert len(ephemerides.catalog) == 10
+    assert list(ephemerides.catalog["designation"]) == list(catalog["designation"][:10])
+    assert ephemerides.params == ["RA", "DEC"]
+    assert ephemerides.accuracy == "fast"
+
+    # Same extrema as a fresh instance
+    expected = CometEphemeridesClass(timeGrid(13), LOCATION).extrema(
+        catalog, "EL", "max", params=["Tmag"])
+    assert len(extrema) == len(catalog)
+    for name in ["EL", "Tmag"]:
+        np.testing.assert_array_equal(extrema[name], expected[name])
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from sbplan.files import atomicWrite
+
+
+@pytest.fixture
+def umask():
+
+    previous = os.umask(0o027)
+    yield 0o027
+    os.umask(previous)
+
+
+def test_permissions(tmp_path, umask):
+
+    atomicWrite(str(tmp_path / "a.txt"), lambda f: f.write("a"))
+    atomicWrite(str(tmp_path / "b.bin"), lambda f: f.write(b"b"), mode="wb")
+
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert (tmp_path / "b.bin").read_bytes() == b"b"
+    for name in ["a.txt", "b.bin"]:
+        assert os.stat(tmp_path / name).st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_failure(tmp_path):
+
+    atomicWrite(str(tmp_path / "a.txt"), lambda f: f.write("old"))
+
+    def write(f):
+        f.write("new")
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        atomicWrite(str(tmp_path / "a.txt"), write)
+    # The old file is left as it was, and no temporary file
+    assert os.listdir(tmp_path) == ["a.txt"]
+    assert (tmp_path / "a.txt").read_text() == "old"
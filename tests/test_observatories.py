@@ -0,0 +1,114 @@
+import os, json
+
+# NumPy
+import numpy as np
+# AstroPy
+import astropy.units as u
+import pytest
+
+from sbplan.ephemerides.observatories import observatories, refreshObservatories
+
+# Plain-text copy of the MPC list (fixed-width columns)
+OBS_CODES = """Code  Long.   cos      sin    Name
+000   0.0000 0.62411 +0.77873 Greenwich
+250                           Hubble Space Telescope
+Z99 117.5750 0.76278 +0.64470 Test Station
+"""
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+
+    # astroquery
+    from astroquery.mpc import MPC
+
+    def download(*args, **kwargs):
+        raise AssertionError("The observatory list must not be downloaded.")
+
+    monkeypatch.setattr(MPC, "get_observatory_codes_async", download)
+
+
+@pytest.mark.parametrize("code, lat, lon, height", [
+    ("327", 40.39, 117.58, 900),
+    ("703", 32.42, -110.73, 2500),
+    ("W84", -30.17, -70.81, 2200),
+    ("I11", -30.24, -70.74, 2700),
+    ("M22", -32.38, 20.81, 1800),
+    ("044", 40.86, 14.26, 150),
+])
+def test_bundled(tmp_path, no_network, code, lat, lon, height):
+
+    # No list in the directory of library: the bundled copy of the full list
+    table = observatories(str(tmp_path))
+    assert len(table) == 2732
+    assert os.listdir(tmp_path) == list()
+
+    location = table.location(code)
+    assert location.lat.to_value(u.deg) == pytest.approx(lat, abs=0.01)
+    assert location.lon.to_value(u.deg) == pytest.approx(lon, abs=0.01)
+    assert location.height.to_value(u.m) == pytest.approx(height, abs=50)
+
+
+def test_bundled_missing(tmp_path, no_network):
+
+    table = observatories(str(tmp_path))
+
+    with pytest.raises(LookupError):
+        table.location("ZZZ")
+    # Not on Earth
+    for code in ["250", "C51"]:
+        with pytest.raises(ValueError):
+            table.location(code)
+
+
+def test_refresh_from_source(tmp_path, no_network):
+
+    source = tmp_path / "ObsCodes.txt"
+    source.write_text(OBS_CODES)
+    lib_dir = tmp_path / "lib"
+
+    observatories(str(lib_dir))
+    assert refreshObservatories(source=str(source), lib_dir=str(lib_dir)) == 3
+
+    # The refreshed list replaces the bundled one
+    table = observatories(str(lib_dir))
+    assert len(table) == 3
+    assert "327" not in table
+    np.testing.assert_allclose(
+        table.location("Z99").get_itrs().cartesian.xyz.to_value(u.m),
+        observatories(str(tmp_path / "empty")).location("327").get_itrs().cartesian.xyz.to_value(u.m))
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(lib_dir / "observatory_codes.csv").st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_refresh_command(tmp_path, monkeypatch, no_network):
+
+    from sbplan.cli import main
+    from sbplan.ephemerides import CometEphemeridesClass
+
+    source = tmp_path / "ObsCodes.txt"
+    source.write_text(OBS_CODES)
+    monkeypatch.setattr(CometEphemeridesClass, "LIB_DIR", str(tmp_path))
+
+    assert main(["observatories", "refresh", "--source", str(source)]) == 0
+    assert len(observatories(str(tmp_path))) == 3
+
+
+def test_refresh_from_json(tmp_path, no_network):
+
+    # `obscodes_extended.json` of the MPC
+    source = tmp_path / "obscodes_extended.json"
+    source.write_text(json.dumps({
+        "000": {"Longitude": 0.0, "cos": 0.62411, "sin": 0.77873, "Name": "Greenwich"},
+        "250": {"Name": "Hubble Space Telescope"},
+        "Z99": {"Longitude": 117.575, "cos": 0.76278, "sin": 0.6447, "Name": "Test Station"},
+    }))
+    plain = tmp_path / "ObsCodes.txt"
+    plain.write_text(OBS_CODES)
+
+    assert refreshObservatories(source=str(source), lib_dir=str(tmp_path / "json")) == 3
+    assert refreshObservatories(source=str(plain), lib_dir=str(tmp_path / "plain")) == 3
+    assert (tmp_path / "json" / "observatory_codes.csv").read_text() ==\
+        (tmp_path / "plain" / "observatory_codes.csv").read_text()
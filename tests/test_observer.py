@@ -0,0 +1,24 @@
+from sbplan.ephemerides import CometEphemeridesClass, conf
+from sbplan.ephemerides.observer import observer_states
+
+from benchmarks.common import LOCATION, timeGrid
+
+
+def test_cache_size(lib_dir):
+
+    observer_states.clear()
+    instances = [CometEphemeridesClass(timeGrid(n), LOCATION) for n in (2, 3, 4)]
+
+    # The size is read at each insertion, not when the cache is created
+    with conf.set_temp("observer_cache_size", 2):
+        states = [ephemerides.state for ephemerides in instances]
+        assert len(observer_states) == 2
+        # Least recently used state evicted first
+        assert instances[2].state is states[2]
+        assert instances[0].state is not states[0]
+
+    with conf.set_temp("observer_cache_size", 1):
+        instances[1].state
+        assert len(observer_states) == 1
+
+    observer_states.clear()
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# NumPy
+import numpy as np
+
+PARAMS = ["RA", "DEC", "EL", "Tmag"]
+
+
+def test_thread_executor(ephemerides, catalog):
+
+    _, serial = ephemerides.get(catalog, PARAMS, columnar=True)
+    # Concurrent chunks of different sizes share the worker instance
+    with ThreadPoolExecutor(4) as executor:
+        _, threaded = ephemerides.get(
+            catalog, PARAMS, columnar=True, executor=executor, chunk_size=9)
+
+    for param in PARAMS:
+        np.testing.assert_array_equal(threaded[param], serial[param])
+
+
+def test_process_pool(ephemerides, catalog):
+
+    _, serial = ephemerides.get(catalog, PARAMS, columnar=True)
+    _, parallel = ephemerides.get(catalog, PARAMS, columnar=True, workers=2, time_chunk_size=5)
+
+    for param in PARAMS:
+        np.testing.assert_array_equal(parallel[param], serial[param])
+
+
+def test_worker_instances(lib_dir, catalog, monkeypatch):
+
+    from sbplan.ephemerides import CometEphemeridesClass
+    from sbplan.ephemerides import parallel
+
+    from benchmarks.common import LOCATION, timeGrid
+
+    # The instance has its own directory of library; the class keeps its own
+    monkeypatch.setattr(CometEphemeridesClass, "LIB_DIR", "/nonexistent")
+    ephemerides = CometEphemeridesClass(timeGrid(13), LOCATION, lib_dir=lib_dir)
+    _, serial = ephemerides.get(catalog, PARAMS, columnar=True)
+
+    parallel._WORKER_EPHEMERIDES.clear()
+    with ThreadPoolExecutor(2) as executor:
+        _, threaded = ephemerides.get(
+            catalog, PARAMS, columnar=True, executor=executor, chunk_size=30, time_chunk_size=5)
+    assert CometEphemeridesClass.LIB_DIR == "/nonexistent"
+    for param in PARAMS:
+        np.testing.assert_array_equal(threaded[param], serial[param])
+
+    # One instance per time chunk, kept across chunks (and reused by a rerun)
+    instances = list(parallel._WORKER_EPHEMERIDES.values())
+    assert len(instances) == 3
+    assert all(instance.LIB_DIR == lib_dir for instance in instances)
+    with ThreadPoolExecutor(2) as executor:
+        ephemerides.get(
+            catalog, PARAMS, columnar=True, executor=executor, chunk_size=30, time_chunk_size=5)
+    assert list(parallel._WORKER_EPHEMERIDES.values()) == instances
@@ -0,0 +1,32 @@
+import pytest
+
+from sbplan import profiling
+
+
+@pytest.fixture
+def enabled():
+
+    profiling.enable()
+    yield
+    profiling.disable()
+
+
+def test_parameter_stages(ephemerides, catalog, enabled):
+
+    ephemerides.get(catalog, ["RA", "EL", "lunar_elong", "Tmag"], columnar=True)
+    stats = ephemerides.stats
+
+    objects = len(catalog) * 13
+    for stage in ["radec", "altaz", "elongation", "magnitude"]:
+        assert stats[stage]["objects"] >= objects, stage
+    # Nested in "parameters"
+    assert sum(stats[stage]["time"] for stage in ["radec", "altaz", "elongation", "magnitude"]) <= \
+        stats["parameters"]["time"]
+
+
+def test_parameter_stages_subset(ephemerides, catalog, enabled):
+
+    ephemerides.get(catalog, ["EL"], columnar=True)
+
+    assert "altaz" in ephemerides.stats
+    assert "magnitude" not in ephemerides.stats
@@ -0,0 +1,82 @@
+"""
+Public names of `sbplan.scheduler` and plans of a night on the synthetic
+kernel.
+"""
+
+import importlib
+
+# NumPy
+import numpy as np
+import pytest
+# AstroPy
+import astropy.units as u
+from astropy.time import Time
+
+import sbplan.scheduler
+from sbplan.ephemerides import CometEphemeridesClass
+from sbplan.scheduler import (
+    schedule, visibilityMatrix, visibilityFromWindows, GreedyScheduler, PriorityScheduler)
+
+from benchmarks.common import LOCATION, START
+
+# 10-min slots over a day
+STEP = 600
+
+
+@pytest.fixture(scope="module")
+def night(lib_dir, catalog):
+
+    ephemerides = CometEphemeridesClass(Time(START) + np.arange(145) * STEP * u.s, LOCATION)
+    _, results = ephemerides.get(catalog, ["RA", "DEC", "EL", "Tmag"], columnar=True)
+
+    return ephemerides, results
+
+
+def test_exports():
+
+    core = importlib.import_module("sbplan.scheduler.core")
+    for name in core.__all__:
+        assert name in sbplan.scheduler.__all__
+        assert getattr(sbplan.scheduler, name) is getattr(core, name)
+
+
+def test_visibility_from_windows(night, catalog):
+
+    ephemerides, results = night
+    visible = visibilityMatrix(results, min_EL=30)
+    designation, from_windows = visibilityFromWindows(
+        ephemerides.windows(catalog, min_EL=30), ephemerides.time_tag)
+
+    # Targets with a window, then targets never visible
+    rows = [list(results.designation).index(pdes) for pdes in designation]
+    assert visible[rows].any()
+    np.testing.assert_array_equal(from_windows, visible[rows])
+    assert not np.delete(visible, rows, axis=0).any()
+
+
+@pytest.mark.parametrize("scheduler", [GreedyScheduler(), PriorityScheduler()])
+def test_plan(night, scheduler):
+
+    _, results = night
+    n = len(results.designation)
+    exposure = STEP * (1 + np.arange(n) % 3)
+    visible = visibilityMatrix(results, min_EL=30)
+
+    plan = schedule(
+        results, exposure, priority=np.arange(n) % 4, scheduler=scheduler, min_EL=30)
+    assert len(plan) > 10
+
+    # No duplicates
+    assert len(set(plan["designation"])) == len(plan)
+
+    # No overlaps (overheads included)
+    start, end = plan["start"].tt.jd * 86400, plan["end"].tt.jd * 86400
+    assert np.all(np.diff(start) > 0)
+    assert np.all(end[:-1] + np.asarray(plan["overhead"][1:]) <= start[1:] + 1e-3)
+
+    # Visible over the whole exposure
+    t0 = results.time_tag[0].tt.jd * 86400
+    for row, slot in zip(plan, np.rint((start - t0) / STEP).astype(int)):
+        k = list(results.designation).index(row["designation"])
+        assert row["exposure"] == exposure[k]
+        assert visible[k, slot:slot + exposure[k] // STEP].all()
@@ -0,0 +1,89 @@
+"""
+Time grids (`timeTag`, `TimeGrid`) against the epochs of the original
+`timeTag` and known epochs.
+"""
+
+import re
+
+# NumPy
+import numpy as np
+import pytest
+# AstroPy
+import astropy.units as u
+from astropy.time import Time, TimeDelta
+
+from sbplan.ephemerides import TimeGrid
+from sbplan.ephemerides.utils import timeTag
+
+
+def _timeTag(epoch):
+    """
+    Original `timeTag` (single units only).
+    """
+
+    assert re.search(r"^\d+[ydhms]$", epoch["step"])
+    unit = {"y": "yr", "d": "d", "h": "h", "m": "min", "s": "s"}[epoch["step"][-1]]
+    dt = TimeDelta(int(epoch["step"][:-1]) * u.Unit(unit))
+
+    return Time(epoch["start"]) + np.arange(
+        int((Time(epoch["stop"]) - Time(epoch["start"])) / dt + 1)) * dt
+
+
+@pytest.mark.parametrize("start, stop, step", [
+    ("2024-01-01", "2034-01-01", "1y"),
+    ("2024-01-01", "2024-03-01", "3d"),
+    ("2024-01-01", "2024-01-02 12:00", "7h"),
+    ("2024-01-01 18:00", "2024-01-02 06:00", "10m"),
+    ("2024-01-01", "2024-01-01 00:10", "45s"),
+    ("2024-01-01", "2023-12-31", "1d"),
+])
+def test_original(start, stop, step):
+
+    epoch = {"start": start, "stop": stop, "step": step}
+    time_tag, expected = timeTag(epoch), _timeTag(epoch)
+
+    assert time_tag.shape == expected.shape
+    np.testing.assert_array_equal(time_tag.jd1, expected.jd1)
+    np.testing.assert_array_equal(time_tag.jd2, expected.jd2)
+
+
+@pytest.mark.parametrize("start, stop, step, expected", [
+    ("2024-01-01", "2024-01-06", "1d6h", [
+        "2024-01-01T00:00:00", "2024-01-02T06:00:00", "2024-01-03T12:00:00",
+        "2024-01-04T18:00:00", "2024-01-06T00:00:00"]),
+    ("2024-01-01", "2024-01-01 05:00", "1h30m", [
+        "2024-01-01T00:00:00", "2024-01-01T01:30:00", "2024-01-01T03:00:00",
+        "2024-01-01T04:30:00"]),
+    ("2024-01-01", "2024-01-01 00:03", "1m15s", [
+        "2024-01-01T00:00:00", "2024-01-01T00:01:15", "2024-01-01T00:02:30"]),
+    ("2024-01-01", "2026-01-01", "1y", [
+        "2024-01-01T00:00:00", "2024-12-31T06:00:00", "2025-12-31T12:00:00"]),
+])
+def test_known_epochs(start, stop, step, expected):
+
+    time_tag = timeTag({"start": start, "stop": stop, "step": step})
+    assert list(time_tag.utc.isot) == [f"{epoch}.000" for epoch in expected]
+
+    grid = TimeGrid(start, stop, step)
+    assert len(grid) == len(expected)
+    assert grid[-1].utc.isot == f"{expected[-1]}.000"
+    assert list(grid[1::2].utc.isot) == [f"{epoch}.000" for epoch in expected[1::2]]
+
+
+def test_chunks():
+
+    grid = TimeGrid("2024-01-01", "2024-01-11", "1d6h")
+    time_tag = grid.time()
+
+    assert grid.n_chunks(3) == 3
+    chunks = list(grid.chunks(3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3]
+    np.testing.assert_array_equal(
+        np.concatenate([chunk.jd2 for chunk in chunks]), time_tag.jd2)
+
+
+@pytest.mark.parametrize("step", ["1x", "d1", "1.5d", "0d", ""])
+def test_invalid_step(step):
+
+    with pytest.raises(ValueError):
+        TimeGrid("2024-01-01", "2024-01-02", step)
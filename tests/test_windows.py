@@ -0,0 +1,24 @@
+# NumPy
+import numpy as np
+
+from sbplan.ephemerides import CometEphemeridesClass
+
+from benchmarks.common import LOCATION, timeGrid
+
+
+def test_instance_unchanged(ephemerides, catalog):
+
+    ephemerides.get(catalog[:10], ["RA", "DEC"], accuracy="fast")
+    windows = ephemerides.windows(catalog, min_EL=20, min_elong=30)
+
+    # `windows` leaves the state of the last `get` as it was
+    assert len(ephemerides.catalog) == 10
+    assert ephemerides.params == ["RA", "DEC"]
+    assert ephemerides.accuracy == "fast"
+
+    # Same windows as a fresh instance
+    expected = CometEphemeridesClass(timeGrid(13), LOCATION).windows(
+        catalog, min_EL=20, min_elong=30)
+    assert len(windows) > 0
+    assert list(windows["designation"]) == list(expected["designation"])
+    np.testing.assert_array_equal(windows["duration"], expected["duration"])